@@ -0,0 +1,84 @@
+"""
+Benchmark : prédiction unitaire vs batch sur l'API TDAH.
+
+Compare le débit (employés/s) de /api/v1/predict/adhd appelé ligne par
+ligne et de /api/v1/predict/adhd/batch, sur une forêt de même taille que
+models/random_forest.pkl (200 arbres, profondeur 10).
+
+Usage :
+    python benchmarks/bench_batch_predict.py --rows 40000 --single-rows 300
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+from fastapi.testclient import TestClient
+from sklearn.ensemble import RandomForestClassifier
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.api.endpoints import app  # noqa: E402
+
+def build_model(seed: int = 42) -> RandomForestClassifier:
+    """Forêt comparable au modèle de production."""
+    rng = np.random.RandomState(seed)
+    X = np.column_stack([rng.uniform(0, 100, 5000), rng.randint(1, 11, 5000)])
+    y = ((X[:, 0] > 70) & (X[:, 1] > 5) | (rng.rand(5000) < 0.1)).astype(int)
+    
+    model = RandomForestClassifier(
+        n_estimators=200, max_depth=10, min_samples_split=5,
+        min_samples_leaf=2, class_weight='balanced', random_state=seed
+    )
+    return model.fit(X, y)
+
+def build_records(n_rows: int, seed: int = 0) -> list:
+    """Employés synthétiques valides."""
+    rng = np.random.RandomState(seed)
+    return [
+        {
+            "employee_id": f"E{i:06d}",
+            "creative_score": float(rng.uniform(0, 100)),
+            "burnout_scale": int(rng.randint(1, 11))
+        }
+        for i in range(n_rows)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=40000, help="Taille du batch")
+    parser.add_argument("--single-rows", type=int, default=300,
+                        help="Nombre d'appels unitaires mesurés")
+    args = parser.parse_args()
+    
+    client = TestClient(app)
+    records = build_records(args.rows)
+    
+    with patch('src.api.endpoints.model', build_model()):
+        # Chauffe
+        client.post("/api/v1/predict/adhd", json=records[0])
+        client.post("/api/v1/predict/adhd/batch", json=records[:100])
+        
+        start = time.perf_counter()
+        for record in records[:args.single_rows]:
+            response = client.post("/api/v1/predict/adhd", json=record)
+            response.raise_for_status()
+        single_elapsed = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        response = client.post("/api/v1/predict/adhd/batch", json=records)
+        response.raise_for_status()
+        batch_elapsed = time.perf_counter() - start
+    
+    single_rate = args.single_rows / single_elapsed
+    batch_rate = args.rows / batch_elapsed
+    
+    print(f"Unitaire : {single_rate:10.1f} employés/s ({args.single_rows} appels en {single_elapsed:.2f}s)")
+    print(f"Batch    : {batch_rate:10.1f} employés/s ({args.rows} lignes en {batch_elapsed:.2f}s)")
+    print(f"Gain     : x{batch_rate / single_rate:.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark : mémoire de pointe du pipeline ETL, en mémoire vs par chunks.
+
+Génère employees.csv / assessments.csv / performance.csv puis extrait et
+transforme les données avec UbisoftETLPipeline dans les deux modes en
+mesurant le pic d'allocation (tracemalloc).
+
+Usage :
+    python benchmarks/bench_chunked_etl.py --rows 200000 --batch-size 10000
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.etl import ETLConfig, UbisoftETLPipeline  # noqa: E402
+
+def write_sources(raw_dir: Path, n_rows: int, seed: int = 0):
+    """Écrire trois fichiers CSV sources de ``n_rows`` employés."""
+    rng = np.random.RandomState(seed)
+    ids = np.array([f"E{i:07d}" for i in range(n_rows)])
+
+    pd.DataFrame({
+        'employee_id': ids,
+        'department': rng.choice(['Design', 'Programming', 'QA', 'Art', 'Production'], n_rows),
+        'hire_date': pd.Timestamp('2015-01-01') + pd.to_timedelta(rng.randint(0, 3000, n_rows), unit='D'),
+        'status': 'active'
+    }).to_csv(raw_dir / 'employees.csv', index=False)
+    pd.DataFrame({
+        'employee_id': rng.permutation(ids),
+        'creative_score': rng.uniform(0, 100, n_rows).round(1),
+        'burnout_scale': rng.randint(1, 11, n_rows),
+        'communication_style': rng.choice(['visual', 'analytical', 'social'], n_rows)
+    }).to_csv(raw_dir / 'assessments.csv', index=False)
+    pd.DataFrame({
+        'employee_id': rng.permutation(ids),
+        'productivity_score': rng.uniform(0, 100, n_rows).round(1),
+        'innovation_index': rng.uniform(0, 10, n_rows).round(2)
+    }).to_csv(raw_dir / 'performance.csv', index=False)
+
+def run(work_dir: Path, batch_size: int, chunked: bool, trace: bool) -> float:
+    """Extraire et transformer les données.
+
+    Renvoie la durée en secondes, ou le pic mémoire en MB si ``trace``
+    (tracemalloc ralentit fortement le mode chunks, d'où deux passes). Le
+    chargement n'est pas mesuré : seul le flux extraction/transformation
+    change entre les deux modes.
+    """
+    config = ETLConfig(
+        database_url="sqlite://",
+        raw_data_path=work_dir / "raw",
+        processed_data_path=work_dir / "processed",
+        batch_size=batch_size,
+        backup_enabled=False,
+        chunked=chunked
+    )
+    pipeline = UbisoftETLPipeline(config)
+
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    if chunked:
+        for _ in pipeline.transform_chunks(pipeline.iter_hr_data_chunks("csv")):
+            pass
+    else:
+        pipeline.transform_employee_data(pipeline.extract_hr_data("csv"))
+    elapsed = time.perf_counter() - start
+
+    if trace:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return peak / 1024**2
+
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        work_dir = Path(temp_dir)
+        (work_dir / "raw").mkdir()
+        write_sources(work_dir / "raw", args.rows)
+        input_mb = sum(p.stat().st_size for p in (work_dir / "raw").glob("*.csv")) / 1024**2
+        print(f"{args.rows} employés, {input_mb:.1f} MB de CSV")
+
+        for chunked in (False, True):
+            elapsed = run(work_dir, args.batch_size, chunked, trace=False)
+            peak_mb = run(work_dir, args.batch_size, chunked, trace=True)
+            label = f"chunks de {args.batch_size}" if chunked else "en mémoire"
+            print(f"{label:>20} : {elapsed:7.2f} s, pic mémoire {peak_mb:8.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark : latence de predict_proba, scikit-learn vs forêt compilée.
+
+Mesure la latence médiane pour des batchs de 1 à 4096 lignes sur une forêt
+de 200 arbres de profondeur 10 et vérifie la parité des probabilités.
+
+Usage :
+    python benchmarks/bench_compiled_forest.py --repeat 50
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_batch_predict import build_model  # noqa: E402
+from src.inference import CompiledForest  # noqa: E402
+
+def median_latency_ms(predict_fn, X: np.ndarray, repeat: int) -> float:
+    """Latence médiane d'un appel en millisecondes."""
+    predict_fn(X)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        predict_fn(X)
+        timings.append(time.perf_counter() - start)
+
+    return float(np.median(timings) * 1000)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    model = build_model()
+    compiled = CompiledForest.from_sklearn(model)
+    rng = np.random.RandomState(1)
+
+    print(f"{'lignes':>7} {'sklearn (ms)':>13} {'compilé (ms)':>13} {'gain':>7}  parité")
+    for n_rows in (1, 8, 64, 512, 4096):
+        X = np.column_stack([rng.uniform(0, 100, n_rows), rng.randint(1, 11, n_rows)])
+        sklearn_ms = median_latency_ms(model.predict_proba, X, args.repeat)
+        compiled_ms = median_latency_ms(compiled.predict_proba, X, args.repeat)
+        parity = np.array_equal(model.predict_proba(X), compiled.predict_proba(X))
+        print(f"{n_rows:>7} {sklearn_ms:>13.3f} {compiled_ms:>13.3f} "
+              f"{sklearn_ms / compiled_ms:>6.1f}x  {parity}")
+
+if __name__ == "__main__":
+    main()
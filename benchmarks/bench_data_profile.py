@@ -0,0 +1,85 @@
+"""
+Benchmark : profil et qualité des données, scans pandas vs une passe.
+
+Compare les scans colonne par colonne de pandas (``duplicated``,
+``isnull``, ``nunique``, ``mode``, ``value_counts``, ``memory_usage``) au
+``DataProfile`` en une passe, recalculé, servi par le cache ou fusionné
+chunk par chunk.
+
+Usage :
+    python benchmarks/bench_data_profile.py --rows 100000 1000000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils.quality import DataProfile, clear_profile_cache, profile_data  # noqa: E402
+
+DEPARTMENTS = ['design', 'programming', 'qa', 'art', 'production', None]
+
+def make_frame(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Données brutes d'employés avec doublons et valeurs manquantes."""
+    rng = np.random.RandomState(seed)
+    df = pd.DataFrame({
+        'employee_id': [f"E{i:07d}" for i in rng.randint(0, n_rows, n_rows)],
+        'department': rng.choice(DEPARTMENTS, n_rows),
+        'communication_style': rng.choice(['visual', 'social', 'written'], n_rows),
+        'creative_score': np.where(rng.rand(n_rows) < 0.05, np.nan, rng.uniform(0, 100, n_rows).round(1)),
+        'burnout_scale': rng.randint(1, 11, n_rows),
+        'productivity_score': rng.uniform(0, 100, n_rows)
+    })
+    return pd.concat([df, df.iloc[:n_rows // 50]], ignore_index=True)
+
+def pandas_scans(df: pd.DataFrame):
+    """Ancienne implémentation : un scan par statistique et par colonne."""
+    df.isnull().sum().sum()
+    df.duplicated().sum()
+    df.duplicated().sum()
+    df.memory_usage(deep=True).sum()
+    for col in df.columns:
+        df[col].count(), df[col].isnull().sum(), df[col].isnull().sum()
+        df[col].nunique(), df[col].nunique()
+        if df[col].dtype in ['int64', 'float64']:
+            df[col].mean(), df[col].median(), df[col].std(), df[col].min(), df[col].max()
+            df[col].skew(), df[col].kurtosis()
+        else:
+            df[col].mode(), df[col].mode(), df[col].value_counts(), df[col].value_counts()
+
+def timed(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument("--chunks", type=int, default=10)
+    args = parser.parse_args()
+
+    for n_rows in args.rows:
+        df = make_frame(n_rows)
+        clear_profile_cache()
+
+        scans = timed(lambda: pandas_scans(df))
+        one_pass = timed(lambda: profile_data(df))
+        cached = timed(lambda: profile_data(df))
+
+        def chunked():
+            profile = DataProfile()
+            for part in np.array_split(np.arange(len(df)), args.chunks):
+                profile.merge(DataProfile().update(df.iloc[part]))
+            return profile
+        merged = timed(chunked)
+
+        print(f"{len(df):>9} lignes : scans pandas {scans:6.2f} s | une passe {one_pass:6.2f} s | "
+              f"cache {cached:6.3f} s | {args.chunks} chunks fusionnés {merged:6.2f} s")
+
+if __name__ == "__main__":
+    main()
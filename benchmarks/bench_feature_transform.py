@@ -0,0 +1,89 @@
+"""
+Benchmark : préprocessing à l'inférence, chaîne pandas vs artefact figé.
+
+Entraîne la chaîne ``DataProcessor.prepare_ml_dataset`` sur un jeu brut
+synthétique, exporte l'artefact ``FeatureTransform`` puis compare, pour
+une ligne et pour un lot, la chaîne pandas (statistiques figées) à
+``FeatureTransform.transform`` sur des dicts.
+
+Usage :
+    python benchmarks/bench_feature_transform.py --rows 20000 --batch 1000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils.data_processing import DataProcessor  # noqa: E402
+
+DEPARTMENTS = ['design', 'programming', 'qa', 'art', 'production']
+
+def make_raw(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Données brutes d'employés avec 5 % de valeurs manquantes."""
+    rng = np.random.RandomState(seed)
+    df = pd.DataFrame({
+        'employee_id': [f"E{i:07d}" for i in range(n_rows)],
+        'department': rng.choice(DEPARTMENTS, n_rows),
+        'hire_date': (pd.Timestamp('2015-01-01')
+                      + pd.to_timedelta(rng.randint(0, 3000, n_rows), unit='D')).strftime('%Y-%m-%d'),
+        'creative_score': rng.uniform(0, 100, n_rows),
+        'burnout_scale': rng.randint(1, 11, n_rows).astype(float),
+        'productivity_score': rng.uniform(0, 100, n_rows)
+    })
+    for col in ['creative_score', 'burnout_scale', 'productivity_score']:
+        df.loc[rng.rand(n_rows) < 0.05, col] = np.nan
+    df['adhd_risk'] = rng.randint(0, 2, n_rows)
+    return df
+
+def timed(function, repeat: int) -> float:
+    """Meilleur temps de ``repeat`` appels, en secondes."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def pandas_chain(processor: DataProcessor, df: pd.DataFrame, features) -> np.ndarray:
+    """Chaîne de prepare_ml_dataset avec les statistiques et le scaler figés."""
+    df = processor.clean_employee_data(df)
+    df = processor.handle_missing_values(df)
+    df = processor.engineer_features(df)
+    df = processor.encode_categorical_variables(df)
+    scaler = processor.scalers['standard']
+    df[scaler.feature_names_in_] = scaler.transform(df[scaler.feature_names_in_])
+    return df[features].to_numpy(dtype=np.float64)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    raw = make_raw(args.rows)
+    processor = DataProcessor()
+    X, _ = processor.prepare_ml_dataset(raw, 'adhd_risk')
+    features = X.select_dtypes(include=[np.number]).columns.tolist()
+    transform = processor.export_transform(features)
+
+    inputs = raw.drop(columns='adhd_risk').iloc[:args.batch]
+    records = inputs.to_dict('records')
+    np.testing.assert_allclose(transform.transform(records), X[features].to_numpy()[:args.batch], rtol=1e-9)
+
+    print(f"entraînement {args.rows} lignes, {len(features)} features")
+    for label, frame, data in [("1 ligne", inputs.iloc[:1], records[0]),
+                               (f"lot de {args.batch}", inputs, records)]:
+        chain = timed(lambda: pandas_chain(processor, frame, features), args.repeat)
+        frozen = timed(lambda: transform.transform(data), args.repeat)
+        print(f"{label:>14} : chaîne pandas {chain * 1000:8.2f} ms | artefact figé {frozen * 1000:8.2f} ms "
+              f"(x{chain / frozen:.1f})")
+
+if __name__ == "__main__":
+    main()
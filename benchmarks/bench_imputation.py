@@ -0,0 +1,83 @@
+"""
+Benchmark : coût de l'imputation numérique selon le volume.
+
+Compare ``KNNImputer`` (distances deux à deux) à ``NeighborImputer``
+(KD-tree sur un échantillon de donneurs), ajusté en une fois ou chunk par
+chunk, en durée et en pic d'allocation (tracemalloc).
+
+Usage :
+    python benchmarks/bench_imputation.py --rows 1000 10000 100000 500000
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.impute import KNNImputer
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils.imputation import NeighborImputer  # noqa: E402
+
+# Au-delà, KNNImputer devient trop lent pour être mesuré
+KNN_MAX_ROWS = 20000
+
+def make_frame(n_rows: int, seed: int = 0):
+    """Colonnes numériques d'employés avec 5 % de valeurs manquantes."""
+    rng = np.random.RandomState(seed)
+    creative = rng.normal(60, 20, n_rows)
+    df = pd.DataFrame({
+        'creative_score': creative,
+        'burnout_scale': rng.randint(1, 11, n_rows).astype(float),
+        'productivity_score': 0.5 * creative + rng.normal(20, 10, n_rows),
+        'innovation_index': rng.uniform(0, 10, n_rows)
+    })
+    keys = pd.Series([f"E{i:07d}" for i in range(n_rows)])
+    return df.mask(rng.rand(*df.shape) < 0.05), keys
+
+def measure(function):
+    """Durée en secondes et pic d'allocation en MB."""
+    start = time.perf_counter()
+    function()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return elapsed, peak / 1024**2
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000, 500000])
+    parser.add_argument("--chunk-size", type=int, default=50000)
+    args = parser.parse_args()
+
+    for n_rows in args.rows:
+        df, keys = make_frame(n_rows)
+
+        def chunked():
+            imputer = NeighborImputer()
+            for start in range(0, n_rows, args.chunk_size):
+                imputer.partial_fit(df.iloc[start:start + args.chunk_size], keys.iloc[start:start + args.chunk_size])
+            for start in range(0, n_rows, args.chunk_size):
+                imputer.transform(df.iloc[start:start + args.chunk_size])
+
+        candidates = {
+            'NeighborImputer': lambda: NeighborImputer().fit(df, keys).transform(df),
+            'NeighborImputer (chunks)': chunked
+        }
+        if n_rows <= KNN_MAX_ROWS:
+            candidates['KNNImputer'] = lambda: KNNImputer(n_neighbors=5).fit_transform(df)
+
+        for label, function in candidates.items():
+            elapsed, peak_mb = measure(function)
+            print(f"{n_rows:>9} lignes {label:>26} : {elapsed:7.2f} s, pic {peak_mb:8.1f} MB")
+
+if __name__ == "__main__":
+    main()
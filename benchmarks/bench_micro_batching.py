@@ -0,0 +1,71 @@
+"""
+Benchmark : micro-batching de /api/v1/predict/adhd sous charge concurrente.
+
+Simule ``--clients`` outils RH qui envoient chacun ``--requests`` prédictions
+unitaires en parallèle, avec et sans micro-batching, et rapporte le débit
+ainsi que les latences p50/p99.
+
+Usage :
+    python benchmarks/bench_micro_batching.py --clients 64 --requests 20
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import httpx
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_batch_predict import build_model, build_records  # noqa: E402
+from src.api import endpoints  # noqa: E402
+
+async def run_load(clients: int, requests_per_client: int) -> dict:
+    """Lancer la charge et mesurer les latences."""
+    records = build_records(clients * requests_per_client)
+    latencies = []
+    transport = httpx.ASGITransport(app=endpoints.app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker(offset: int):
+            for record in records[offset::clients]:
+                start = time.perf_counter()
+                response = await client.post("/api/v1/predict/adhd", json=record)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(clients)))
+        elapsed = time.perf_counter() - start
+
+    await endpoints.micro_batcher.stop()
+    latencies_ms = np.array(latencies) * 1000
+
+    return {
+        'throughput': len(latencies) / elapsed,
+        'p50_ms': float(np.percentile(latencies_ms, 50)),
+        'p99_ms': float(np.percentile(latencies_ms, 99))
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    with patch.object(endpoints, 'model', build_model()):
+        for enabled in (False, True):
+            with patch.object(endpoints, 'MICRO_BATCH_ENABLED', enabled):
+                result = asyncio.run(run_load(args.clients, args.requests))
+            label = "micro-batch" if enabled else "direct     "
+            print(f"{label} : {result['throughput']:8.1f} req/s  "
+                  f"p50 {result['p50_ms']:7.1f} ms  p99 {result['p99_ms']:7.1f} ms")
+
+    print(endpoints.micro_batcher.get_stats()['batch_size'])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark : temps de chargement du modèle, pickle vs artefact .npy mappé.
+
+Sauvegarde une forêt de 200 arbres avec ModelTrainer.save_best_model puis
+mesure le chargement par joblib.load et par np.load(mmap_mode="r").
+
+Usage :
+    python benchmarks/bench_model_loading.py --repeat 5
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_batch_predict import build_model  # noqa: E402
+from src.inference import load_forest_model  # noqa: E402
+from src.model import ModelTrainer  # noqa: E402
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    model = build_model()
+    model_result = {
+        'model': model,
+        'scaler': None,
+        'feature_names': ['creative_score', 'burnout_scale'],
+        'best_params': {},
+        'test_metrics': {},
+        'cv_scores': np.array([0.0])
+    }
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        model_dir = ModelTrainer().save_best_model(model_result, Path(temp_dir))
+        with open(model_dir / "model_metadata.json") as f:
+            metadata = json.load(f)
+
+        timings = {'pickle': [], 'mmap': []}
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            joblib.load(model_dir / "random_forest.pkl")
+            timings['pickle'].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            load_forest_model(model_dir, metadata, engine='auto')
+            timings['mmap'].append(time.perf_counter() - start)
+
+        pickle_size = (model_dir / "random_forest.pkl").stat().st_size
+        npy_size = sum(p.stat().st_size for p in (model_dir / "forest").glob("*.npy"))
+
+    print(f"pickle : {np.median(timings['pickle']) * 1000:8.2f} ms ({pickle_size / 1024**2:.1f} MB)")
+    print(f"mmap   : {np.median(timings['mmap']) * 1000:8.2f} ms ({npy_size / 1024**2:.1f} MB partagés)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark : outliers, boucle pandas par colonne vs moteur vectorisé.
+
+Compare l'ancienne détection (quantiles pandas colonne par colonne, listes
+d'index) suivie du plafonnement aux 1er/99e percentiles à
+``DataProcessor.handle_outliers`` (un ``np.nanquantile`` sur la matrice
+numérique, masques booléens), pour les méthodes ``iqr``, ``zscore`` et
+``mad``.
+
+Usage :
+    python benchmarks/bench_outliers.py --rows 100000 1000000 --columns 20
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils.data_processing import OUTLIER_CAPPING_MAX_SHARE, DataProcessor  # noqa: E402
+
+def make_frame(n_rows: int, n_columns: int, seed: int = 0) -> pd.DataFrame:
+    """Features numériques (normales, queues épaisses, entiers) avec 5 % de NaN."""
+    rng = np.random.RandomState(seed)
+    data = {}
+    for j in range(n_columns):
+        if j % 3 == 0:
+            values = rng.normal(50, 10, n_rows)
+        elif j % 3 == 1:
+            values = rng.standard_t(3, n_rows)
+        else:
+            values = rng.randint(0, 100, n_rows).astype(float)
+        values[rng.rand(n_rows) < 0.05] = np.nan
+        data[f"feature_{j}"] = values
+    data['department'] = rng.choice(['design', 'programming', 'qa'], n_rows)
+    return pd.DataFrame(data)
+
+def pandas_outliers(df: pd.DataFrame) -> pd.DataFrame:
+    """Ancienne implémentation iqr : listes d'index puis clip colonne par colonne."""
+    outliers = {}
+    for col in df.select_dtypes(include=[np.number]).columns:
+        q1, q3 = df[col].quantile(0.25), df[col].quantile(0.75)
+        iqr = q3 - q1
+        indices = df[(df[col] < q1 - 1.5 * iqr) | (df[col] > q3 + 1.5 * iqr)].index.tolist()
+        if indices:
+            outliers[col] = indices
+    for col, indices in outliers.items():
+        if len(indices) < len(df) * OUTLIER_CAPPING_MAX_SHARE:
+            df[col] = df[col].clip(df[col].quantile(0.01), df[col].quantile(0.99))
+    return df
+
+def timed(function) -> float:
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument("--columns", type=int, default=20)
+    args = parser.parse_args()
+
+    processor = DataProcessor()
+    for n_rows in args.rows:
+        df = make_frame(n_rows, args.columns)
+
+        expected = pandas_outliers(df.copy())
+        capped, _ = processor.handle_outliers(df.copy())
+        pd.testing.assert_frame_equal(capped, expected)
+
+        scans = timed(lambda: pandas_outliers(df.copy()))
+        engine = {method: timed(lambda: processor.handle_outliers(df.copy(), method))
+                  for method in ['iqr', 'zscore', 'mad']}
+        print(f"{n_rows:>9} lignes x {args.columns} colonnes : pandas iqr {scans:6.2f} s | "
+              + " | ".join(f"{method} {elapsed:6.2f} s" for method, elapsed in engine.items()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark : durée de transform_employee_data selon le nombre de processus.
+
+Transforme un jeu de données brut synthétique en série puis avec
+``transform_workers`` processus (partitions par département) et affiche
+l'accélération obtenue. L'ajustement exact des statistiques et la détection
+des valeurs aberrantes restent dans le processus principal : ils bornent
+l'accélération atteignable.
+
+Usage :
+    python benchmarks/bench_parallel_transform.py --rows 1000000 --workers 1 4 16 32
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.etl import ETLConfig, UbisoftETLPipeline  # noqa: E402
+
+def make_raw_frame(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """DataFrame au format de la sortie de extract_hr_data."""
+    rng = np.random.RandomState(seed)
+    creative = rng.normal(60, 20, n_rows).round(1)
+    creative[rng.rand(n_rows) < 0.05] = np.nan
+
+    return pd.DataFrame({
+        'employee_id': [f"E{i:07d}" for i in range(n_rows)],
+        'department': rng.choice(['Design', 'Programming', 'QA', 'Art', 'Production'], n_rows),
+        'hire_date': pd.Timestamp('2015-01-01') + pd.to_timedelta(rng.randint(0, 3000, n_rows), unit='D'),
+        'status': 'active',
+        'creative_score': creative,
+        'burnout_scale': rng.randint(1, 11, n_rows).astype(float),
+        'communication_style': rng.choice(['visual', 'analytical', 'social'], n_rows),
+        'productivity_score': rng.uniform(0, 100, n_rows).round(1),
+        'innovation_index': rng.uniform(0, 10, n_rows).round(2)
+    })
+
+def measure(df: pd.DataFrame, workers: int) -> float:
+    pipeline = UbisoftETLPipeline(ETLConfig(
+        database_url="sqlite://",
+        raw_data_path=Path("raw"),
+        processed_data_path=Path("processed"),
+        transform_workers=workers,
+        parallel_transform_min_rows=0
+    ))
+    start = time.perf_counter()
+    pipeline.transform_employee_data(df)
+
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    df = make_raw_frame(args.rows)
+    baseline = None
+    for workers in args.workers:
+        elapsed = measure(df, workers)
+        baseline = baseline or elapsed
+        print(f"{workers:>3} processus : {elapsed:7.2f} s (x{baseline / elapsed:.1f})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark : taille et temps de lecture des sorties ETL, CSV vs Parquet.
+
+Écrit un jeu de données transformé synthétique en CSV, en Parquet (fichier
+unique) et en Parquet partitionné par run_date/department, puis mesure la
+lecture complète, la lecture de trois colonnes et la lecture d'un seul
+département.
+
+Usage :
+    python benchmarks/bench_parquet_io.py --rows 1000000
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.loaders import CsvChecksumWriter, ParquetChunkWriter  # noqa: E402
+
+DEPARTMENTS = ['design', 'programming', 'qa', 'art', 'production']
+COLUMNS = ['employee_id', 'creative_score', 'burnout_scale']
+
+def make_frame(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """DataFrame au format de la sortie de transform_employee_data."""
+    rng = np.random.RandomState(seed)
+    creative = rng.uniform(0, 100, n_rows).round(1)
+    burnout = rng.randint(1, 11, n_rows)
+
+    return pd.DataFrame({
+        'employee_id': [f"E{i:07d}" for i in range(n_rows)],
+        'department': rng.choice(DEPARTMENTS, n_rows),
+        'hire_date': pd.Timestamp('2015-01-01') + pd.to_timedelta(rng.randint(0, 3000, n_rows), unit='D'),
+        'creative_score': creative,
+        'burnout_scale': burnout,
+        'productivity_score': rng.uniform(0, 100, n_rows).round(1),
+        'innovation_index': rng.uniform(0, 10, n_rows).round(2),
+        'creativity_burnout_ratio': creative / (burnout + 1),
+        'creative_score_high': (creative > 75).astype(int),
+        'burnout_scale_high': (burnout > 7).astype(int),
+        'tenure_years': rng.uniform(0, 10, n_rows),
+        'department_encoded': rng.randint(0, 5, n_rows),
+        'run_date': '2025-01-15'
+    })
+
+def timed(function, repeat: int = 3) -> float:
+    """Meilleur temps de ``repeat`` appels, en secondes."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def size_mb(path: Path) -> float:
+    files = [path] if path.is_file() else [p for p in path.rglob('*') if p.is_file()]
+    return sum(p.stat().st_size for p in files) / 1024**2
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = make_frame(args.rows)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        work_dir = Path(temp_dir)
+        csv_path = work_dir / "out.csv"
+        parquet_path = work_dir / "out.parquet"
+        dataset_path = work_dir / "dataset"
+
+        start = time.perf_counter()
+        with CsvChecksumWriter(csv_path) as writer:
+            writer.write(df.drop(columns='run_date'))
+        csv_write = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ParquetChunkWriter(parquet_path) as writer:
+            writer.write(df.drop(columns='run_date'))
+        parquet_write = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ParquetChunkWriter(dataset_path, ['run_date', 'department']) as writer:
+            writer.write(df)
+        dataset_write = time.perf_counter() - start
+
+        one_department = [('department', '==', 'qa')]
+        results = {
+            'csv': (csv_path, csv_write, {
+                'complète': lambda: pd.read_csv(csv_path),
+                '3 colonnes': lambda: pd.read_csv(csv_path, usecols=COLUMNS),
+                '1 département': lambda: pd.read_csv(csv_path).query("department == 'qa'")
+            }),
+            'parquet': (parquet_path, parquet_write, {
+                'complète': lambda: pd.read_parquet(parquet_path),
+                '3 colonnes': lambda: pd.read_parquet(parquet_path, columns=COLUMNS),
+                '1 département': lambda: pd.read_parquet(parquet_path, filters=one_department)
+            }),
+            'parquet partitionné': (dataset_path, dataset_write, {
+                'complète': lambda: pd.read_parquet(dataset_path),
+                '3 colonnes': lambda: pd.read_parquet(dataset_path, columns=COLUMNS),
+                '1 département': lambda: pd.read_parquet(dataset_path, filters=one_department)
+            })
+        }
+
+        print(f"{args.rows} lignes, {len(df.columns)} colonnes")
+        for label, (path, write_time, reads) in results.items():
+            timings = ", ".join(f"{name} {timed(read, args.repeat):.3f} s" for name, read in reads.items())
+            print(f"{label:>20} : {size_mb(path):7.1f} MB, écriture {write_time:.2f} s | lecture {timings}")
+
+if __name__ == "__main__":
+    main()
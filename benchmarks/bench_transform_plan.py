@@ -0,0 +1,83 @@
+"""
+Benchmark : prepare_ml_dataset complet vs plan limité aux features du modèle.
+
+Lit un CSV large (colonnes texte et numériques inutiles au modèle) puis
+compare la lecture complète suivie de la chaîne complète à la lecture des
+seules ``TransformPlan.source_columns`` suivie des étapes du plan, pour
+les six features d'un modèle (distances du ``NeighborImputer`` limitées
+aux colonnes numériques du modèle).
+
+Usage :
+    python benchmarks/bench_transform_plan.py --rows 100000 1000000 --extra-columns 10
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils.data_processing import DataProcessor, plan_transform  # noqa: E402
+
+FEATURES = ['creative_score', 'creativity_burnout_ratio', 'burnout_scale_high',
+            'creativity_vs_dept_avg', 'tenure_years', 'department_encoded']
+
+def make_frame(n_rows: int, n_extra: int, seed: int = 0) -> pd.DataFrame:
+    """Données brutes d'employés avec ``n_extra`` colonnes texte et
+    ``n_extra`` colonnes numériques absentes des features du modèle."""
+    rng = np.random.RandomState(seed)
+    df = pd.DataFrame({
+        'employee_id': [f"E{i:07d}" for i in range(n_rows)],
+        'department': rng.choice(['design', 'programming', 'qa', 'art', None], n_rows),
+        'creative_score': np.where(rng.rand(n_rows) < 0.05, np.nan, rng.uniform(0, 100, n_rows).round(1)),
+        'burnout_scale': rng.randint(1, 11, n_rows).astype(float),
+        'hire_date': (pd.Timestamp('2015-01-01')
+                      + pd.to_timedelta(rng.randint(0, 3000, n_rows), unit='D')).strftime('%Y-%m-%d'),
+        'adhd_risk': rng.randint(0, 2, n_rows)
+    })
+    for j in range(n_extra):
+        df[f"text_{j}"] = rng.choice([f"valeur {k}" for k in range(20)], n_rows)
+        df[f"metric_{j}"] = rng.uniform(0, 1, n_rows).round(3)
+    return df
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument("--extra-columns", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in args.rows:
+            path = Path(tmp) / f"employees_{n_rows}.csv"
+            make_frame(n_rows, args.extra_columns).to_csv(path, index=False)
+
+            def full():
+                X, _ = DataProcessor().prepare_ml_dataset(pd.read_csv(path), 'adhd_risk')
+                return X[FEATURES]
+
+            def planned():
+                plan = plan_transform(FEATURES, pd.read_csv(path, nrows=1000).dtypes, 'adhd_risk')
+                X, _ = DataProcessor().prepare_ml_dataset(
+                    pd.read_csv(path, usecols=plan.source_columns), 'adhd_risk', feature_names=FEATURES
+                )
+                return X
+
+            full_time, expected = timed(full)
+            plan_time, result = timed(planned)
+            assert list(result.columns) == FEATURES and len(result) == len(expected)
+
+            print(f"{n_rows:>9} lignes : chaîne complète {full_time:6.2f} s | plan ({len(FEATURES)} features) "
+                  f"{plan_time:6.2f} s | x{full_time / plan_time:.1f}")
+
+if __name__ == "__main__":
+    main()
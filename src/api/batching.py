@@ -0,0 +1,212 @@
+"""
+Micro-batching des prédictions pour l'API.
+
+Les requêtes concurrentes sont mises en file, regroupées pendant au plus
+``max_wait_ms`` millisecondes ou ``max_batch_size`` lignes, puis scorées
+en un seul appel sur un thread de travail. Chaque requête récupère ensuite
+sa propre tranche de résultats.
+
+Un micro-batch n'associe que des requêtes de même contexte de scoring
+(par ex. la version du modèle qui a construit leurs features) et de même
+largeur : une erreur ne fait échouer que les requêtes de son groupe.
+"""
+
+import asyncio
+import logging
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class Histogram:
+    """Histogramme cumulatif à buckets fixes (format proche de Prometheus)."""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        """Enregistrer une observation."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Compteurs cumulés par borne supérieure."""
+        cumulative = np.cumsum(self.counts).tolist()
+        buckets = {str(bound): count for bound, count in zip(self.buckets, cumulative)}
+        buckets['+Inf'] = cumulative[-1]
+
+        return {
+            'buckets': buckets,
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.sum / self.count if self.count else 0.0
+        }
+
+class MicroBatcher:
+    """Regroupe les requêtes de prédiction concurrentes en micro-batchs.
+
+    ``score_fn(features)`` score les requêtes soumises sans contexte,
+    ``score_fn(features, context)`` celles soumises avec un contexte.
+    """
+
+    def __init__(self, score_fn: Callable[..., np.ndarray],
+                 max_batch_size: int = 64,
+                 max_wait_ms: float = 5.0,
+                 max_queue_size: int = 10000):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size doit être >= 1")
+
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.max_queue_size = max_queue_size
+
+        self.batch_size_histogram = Histogram([1, 2, 4, 8, 16, 32, 64, 128, 256, 512])
+        self.queue_depth_histogram = Histogram([0, 1, 4, 16, 64, 256, 1024, 4096])
+        self.latency_ms_histogram = Histogram([1, 2, 5, 10, 25, 50, 100, 250, 500, 1000])
+        self.batches_processed = 0
+        self.rows_processed = 0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def submit(self, features: np.ndarray, context: Any = None) -> np.ndarray:
+        """Scorer ``features`` au sein du prochain micro-batch.
+
+        ``context`` (par ex. le modèle à utiliser) est transmis à
+        ``score_fn`` ; seules les requêtes de même contexte (identité) sont
+        scorées ensemble. Lève ``asyncio.QueueFull`` si la file d'attente
+        est saturée.
+        """
+        self._ensure_started()
+
+        future = self._loop.create_future()
+        self._queue.put_nowait((features, context, future, time.perf_counter()))
+
+        return await future
+
+    async def stop(self):
+        """Arrêter le worker et faire échouer les requêtes en attente."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+
+        if self._queue is not None:
+            self._fail_pending(self._queue, RuntimeError("Micro-batcher arrêté"))
+
+        self._loop = self._queue = self._worker = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Statistiques du micro-batcher."""
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait_ms,
+            'queue_depth': self._queue.qsize() if self._queue is not None else 0,
+            'batches_processed': self.batches_processed,
+            'rows_processed': self.rows_processed,
+            'batch_size': self.batch_size_histogram.snapshot(),
+            'queue_depth_at_dispatch': self.queue_depth_histogram.snapshot(),
+            'latency_ms': self.latency_ms_histogram.snapshot()
+        }
+
+    def _ensure_started(self):
+        """Démarrer le worker sur la boucle courante (une par boucle).
+
+        Sur la même boucle, un worker redémarré reprend la file existante ;
+        sur une nouvelle boucle, les requêtes de l'ancienne file échouent.
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._worker is not None and not self._worker.done():
+            return
+
+        if self._loop is not loop:
+            if self._queue is not None:
+                self._fail_pending(self._queue, RuntimeError("Boucle d'événements du micro-batcher remplacée"))
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        elif self._worker is not None and self._worker.done() and not self._worker.cancelled():
+            logger.error(f"Worker du micro-batcher arrêté: {self._worker.exception()}")
+
+        self._loop = loop
+        self._worker = loop.create_task(self._run())
+
+    @staticmethod
+    def _fail_pending(queue: asyncio.Queue, error: Exception):
+        """Faire échouer les requêtes encore en file."""
+        while not queue.empty():
+            future = queue.get_nowait()[2]
+            if not future.done() and not future.get_loop().is_closed():
+                future.set_exception(error)
+
+    async def _run(self):
+        """Boucle de collecte et de scoring des micro-batchs."""
+        while True:
+            batch = [await self._queue.get()]
+            rows = len(batch[0][0])
+            deadline = self._loop.time() + self.max_wait_ms / 1000
+
+            while rows < self.max_batch_size:
+                if self._queue.empty():
+                    timeout = deadline - self._loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = self._queue.get_nowait()
+
+                batch.append(item)
+                rows += len(item[0])
+
+            self.queue_depth_histogram.observe(self._queue.qsize())
+            self.batch_size_histogram.observe(rows)
+
+            await self._score(batch)
+
+    async def _score(self, batch: List[Tuple[np.ndarray, Any, asyncio.Future, float]]):
+        """Scorer un micro-batch, groupe par groupe, et résoudre chaque future.
+
+        Un groupe réunit les requêtes de même contexte et de même largeur ;
+        toute erreur (empilement compris) fait échouer les futures de son
+        groupe sans arrêter le worker.
+        """
+        groups: Dict[Tuple, List[Tuple[np.ndarray, Any, asyncio.Future, float]]] = {}
+        for item in batch:
+            groups.setdefault((id(item[1]), np.shape(item[0])[1:]), []).append(item)
+
+        for group in groups.values():
+            context = group[0][1]
+            try:
+                features = np.vstack([item[0] for item in group])
+                args = (features,) if context is None else (features, context)
+                results = await self._loop.run_in_executor(None, self.score_fn, *args)
+            except Exception as e:
+                logger.error(f"Erreur scoring micro-batch ({len(group)} requêtes): {e}")
+                for _, _, future, _ in group:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches_processed += 1
+            self.rows_processed += len(features)
+
+            now = time.perf_counter()
+            offset = 0
+            for item_features, _, future, enqueued_at in group:
+                n_rows = len(item_features)
+                if not future.done():
+                    future.set_result(results[offset:offset + n_rows])
+                offset += n_rows
+                self.latency_ms_histogram.observe((now - enqueued_at) * 1000)
@@ -0,0 +1,168 @@
+"""
+Cache des probabilités de risque, indexé par vecteur de features.
+
+La clé est un hash stable du vecteur de features prétraité et de la
+version du modèle. Un premier niveau LRU en mémoire (avec TTL) évite
+tout aller-retour réseau ; un second niveau Redis, optionnel, est
+partagé entre workers et pods.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+class PredictionCache:
+    """Cache LRU + TTL avec niveau Redis optionnel."""
+
+    def __init__(self, max_size: int = 100000, ttl_seconds: float = 3600,
+                 redis_url: Optional[str] = None, namespace: str = "adhd_risk",
+                 redis_retry_seconds: float = 30):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.namespace = namespace
+        self.redis_retry_seconds = redis_retry_seconds
+
+        self.hits = 0
+        self.redis_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.redis_errors = 0
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._redis = None
+        self._redis_disabled_until = 0.0
+
+        if redis_url:
+            if redis is None:
+                logger.warning("REDIS_URL défini mais le paquet redis est absent - cache local seul")
+            else:
+                self._redis = redis.Redis.from_url(redis_url, socket_timeout=0.2)
+
+    @property
+    def redis_enabled(self) -> bool:
+        return self._redis is not None
+
+    def make_keys(self, features: np.ndarray, model_version: str) -> List[str]:
+        """Clés stables : hash du vecteur float64 et de la version du modèle."""
+        rows = np.ascontiguousarray(features, dtype=np.float64)
+        prefix = f"{self.namespace}:{model_version}:"
+
+        return [
+            prefix + hashlib.blake2b(row.tobytes(), digest_size=16).hexdigest()
+            for row in rows
+        ]
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[float]]:
+        """Valeurs en cache (``None`` pour un défaut)."""
+        now = time.monotonic()
+        values: List[Optional[float]] = [None] * len(keys)
+        missing = []
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None and entry[1] > now:
+                    self._entries.move_to_end(key)
+                    values[i] = entry[0]
+                else:
+                    if entry is not None:
+                        del self._entries[key]
+                    missing.append(i)
+            self.hits += len(keys) - len(missing)
+
+        if missing and self._redis_available():
+            try:
+                remote = self._redis.mget([keys[i] for i in missing])
+            except Exception as e:
+                self._on_redis_error(e)
+                remote = [None] * len(missing)
+
+            found = {}
+            for i, value in zip(missing, remote):
+                if value is not None:
+                    values[i] = float(value)
+                    found[keys[i]] = values[i]
+            if found:
+                self._store_local(found)
+                self.redis_hits += len(found)
+                missing = [i for i in missing if values[i] is None]
+
+        self.misses += len(missing)
+
+        return values
+
+    def set_many(self, keys: Sequence[str], values: Sequence[float]):
+        """Mémoriser des valeurs dans les deux niveaux."""
+        items = dict(zip(keys, (float(v) for v in values)))
+        self._store_local(items)
+
+        if items and self._redis_available():
+            try:
+                pipeline = self._redis.pipeline(transaction=False)
+                for key, value in items.items():
+                    pipeline.set(key, value, ex=max(1, int(self.ttl_seconds)))
+                pipeline.execute()
+            except Exception as e:
+                self._on_redis_error(e)
+
+    def invalidate(self):
+        """Vider le niveau local (changement de modèle).
+
+        Les clés Redis contiennent la version du modèle : celles de
+        l'ancienne version ne sont plus lues et expirent par TTL.
+        """
+        with self._lock:
+            self._entries.clear()
+        self.invalidations += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Compteurs du cache."""
+        lookups = self.hits + self.redis_hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_size': self.max_size,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'redis_hits': self.redis_hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits + self.redis_hits) / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'redis_enabled': self.redis_enabled,
+            'redis_errors': self.redis_errors
+        }
+
+    def _store_local(self, items: Dict[str, float]):
+        """Insérer dans le LRU en évinçant les entrées les plus anciennes."""
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            for key, value in items.items():
+                self._entries[key] = (value, expires_at)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _redis_available(self) -> bool:
+        return self._redis is not None and time.monotonic() >= self._redis_disabled_until
+
+    def _on_redis_error(self, error: Exception):
+        """Redis indisponible : continuer en local pendant un moment."""
+        self.redis_errors += 1
+        self._redis_disabled_until = time.monotonic() + self.redis_retry_seconds
+        logger.warning(f"Cache Redis indisponible ({error}), niveau local seul "
+                       f"pendant {self.redis_retry_seconds}s")
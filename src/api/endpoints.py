@@ -2,17 +2,32 @@
 API endpoints pour Ubisoft People Analytics.
 """
 
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
-import joblib
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+from typing import List, Dict, Any, Optional, Tuple
+from dataclasses import dataclass
 import pandas as pd
 import numpy as np
 from pathlib import Path
 import json
 import logging
+import asyncio
 from datetime import datetime
+import sqlalchemy as sa
+
+from src.api.batching import MicroBatcher
+from src.api.cache import PredictionCache
+from src.api.registry import ModelRegistry, ModelVersion
+from src.config import (
+    API_PREFIX, BATCH_CHUNK_SIZE, BATCH_MAX_RECORDS, PREDICTION_THRESHOLD, INFERENCE_ENGINE,
+    MICRO_BATCH_ENABLED, MICRO_BATCH_MAX_SIZE, MICRO_BATCH_MAX_WAIT_MS,
+    MICRO_BATCH_MAX_QUEUE, MODEL_WATCH_INTERVAL_SECONDS, MODEL_DRAIN_SECONDS,
+    PREDICTION_CACHE_ENABLED, PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL_SECONDS, REDIS_URL,
+    DATABASE_URL, STREAM_SOURCE_TABLE, STREAM_CHUNK_SIZE
+)
 
 # Configuration logging
 logging.basicConfig(level=logging.INFO)
@@ -40,19 +55,42 @@ app.add_middleware(
 MODEL_DIR = Path("models")
 model = None
 metadata = None
+# Transformation figée des données brutes, si sauvegardée avec le modèle
+preprocessor = None
+
+def activate_model_version(version: ModelVersion):
+    """Publier une nouvelle version de modèle pour les handlers."""
+    global model, metadata, preprocessor
+    model = version.model
+    metadata = version.metadata
+    preprocessor = version.preprocessor
+    prediction_cache.invalidate()
+
+model_registry = ModelRegistry(
+    MODEL_DIR,
+    engine=INFERENCE_ENGINE,
+    on_swap=activate_model_version,
+    drain_seconds=MODEL_DRAIN_SECONDS
+)
 
 @app.on_event("startup")
 async def load_model():
     """Charger le modèle au démarrage de l'API."""
-    global model, metadata
     try:
-        model = joblib.load(MODEL_DIR / "random_forest.pkl")
-        with open(MODEL_DIR / "model_metadata.json", 'r') as f:
-            metadata = json.load(f)
+        # Artefact .npy mappé (pages partagées entre workers) si disponible
+        await run_in_threadpool(model_registry.reload, True)
         logger.info("Modèle chargé avec succès")
     except Exception as e:
         logger.error(f"Erreur chargement modèle: {e}")
         raise
+    
+    model_registry.start_watching(MODEL_WATCH_INTERVAL_SECONDS)
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    """Arrêter le micro-batcher et la surveillance du modèle."""
+    await micro_batcher.stop()
+    await model_registry.stop_watching()
 
 # Modèles Pydantic
 class EmployeeData(BaseModel):
@@ -81,6 +119,20 @@ class TeamAnalytics(BaseModel):
     retention_rate: float
     risk_factors: List[str]
 
+class BatchPredictionItem(BaseModel):
+    """Résultat d'une ligne d'un batch de prédiction."""
+    index: int
+    employee_id: Optional[str] = None
+    prediction: Optional[PredictionResponse] = None
+    errors: List[str] = []
+
+class BatchPredictionResponse(BaseModel):
+    """Réponse de prédiction batch, dans l'ordre des entrées."""
+    total: int
+    scored: int
+    failed: int
+    results: List[BatchPredictionItem]
+
 class HealthResponse(BaseModel):
     """Réponse health check."""
     status: str
@@ -101,6 +153,533 @@ async def health_check():
     )
 
 @app.get("/model/info")
+@app.get(f"{API_PREFIX}/model/info")
 async def get_model_info():
     """Informations sur le modèle chargé."""
-    if metadata
+    if metadata is None:
+        raise HTTPException(status_code=503, detail="Modèle non chargé")
+    
+    return {**metadata, 'registry': model_registry.get_info()}
+
+@app.post(f"{API_PREFIX}/admin/model/reload")
+async def reload_model(force: bool = False):
+    """Recharger le modèle depuis le disque sans redémarrer l'API.
+    
+    La nouvelle version est chargée et chauffée hors de la boucle
+    d'événements puis échangée atomiquement ; l'ancienne est drainée.
+    """
+    try:
+        version = await run_in_threadpool(model_registry.reload, force)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Échec du rechargement: {e}")
+    
+    model_registry.release_drained()
+    
+    return {
+        'reloaded': version is not None,
+        **model_registry.get_info()
+    }
+
+@app.post(f"{API_PREFIX}/predict/adhd", response_model=PredictionResponse)
+async def predict_adhd(employee: EmployeeData):
+    """Prédire le risque TDAH pour un employé.
+    
+    Les requêtes concurrentes sont regroupées par le micro-batcher et
+    scorées en un seul appel predict_proba hors de la boucle d'événements.
+    Les vecteurs déjà scorés par la même version du modèle sont servis
+    depuis le cache.
+    """
+    snapshot = serving_snapshot()
+    if snapshot.model is None:
+        raise HTTPException(status_code=503, detail="Modèle non chargé")
+    
+    try:
+        features = build_feature_matrix([employee], snapshot.preprocessor)
+        probabilities = await score_with_cache(features, score_single, snapshot)
+        probability = float(probabilities[0])
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="File de prédiction saturée")
+    except Exception as e:
+        logger.error(f"Erreur prédiction {employee.employee_id}: {e}")
+        raise HTTPException(status_code=500, detail=f"Erreur de prédiction: {e}")
+    
+    prediction = int(probability > PREDICTION_THRESHOLD)
+    return build_prediction_response(employee.employee_id, prediction, probability)
+
+@app.post(f"{API_PREFIX}/predict/adhd/batch", response_model=BatchPredictionResponse)
+async def predict_adhd_batch(request: Request):
+    """Prédire le risque TDAH pour un lot d'employés.
+    
+    Le corps est un tableau JSON ou du NDJSON (un employé par ligne).
+    Les lignes invalides sont signalées individuellement sans faire
+    échouer le lot.
+    """
+    snapshot = serving_snapshot()
+    if snapshot.model is None:
+        raise HTTPException(status_code=503, detail="Modèle non chargé")
+    
+    body = await request.body()
+    # Décodage, validation et matrice de features sur un thread de travail
+    results, valid_indices, valid_employees, features = await run_in_threadpool(
+        prepare_batch, body, request.headers.get("content-type", ""), snapshot.preprocessor
+    )
+    
+    # Scoring vectorisé des défauts de cache, un appel au modèle par chunk
+    if valid_employees:
+        try:
+            probabilities = await score_with_cache(features, score_batch, snapshot)
+        except Exception as e:
+            logger.error(f"Erreur prédiction batch: {e}")
+            raise HTTPException(status_code=500, detail=f"Erreur de prédiction: {e}")
+        
+        predictions = (probabilities > PREDICTION_THRESHOLD).astype(int)
+        timestamp = datetime.now()
+        for i, employee, prediction, probability in zip(
+            valid_indices, valid_employees, predictions.tolist(), probabilities.tolist()
+        ):
+            results[i].prediction = build_prediction_response(
+                employee.employee_id, prediction, probability, timestamp
+            )
+    
+    scored = len(valid_indices)
+    logger.info(f"Batch de {len(results)} employés: {scored} prédits, {len(results) - scored} rejetés")
+    
+    return BatchPredictionResponse(
+        total=len(results),
+        scored=scored,
+        failed=len(results) - scored,
+        results=results
+    )
+
+@app.get(f"{API_PREFIX}/predict/adhd/stream")
+async def stream_adhd_predictions(
+    department: Optional[List[str]] = Query(None, description="Départements à inclure"),
+    cursor: Optional[str] = Query(None, description="Dernier employee_id reçu (reprise)"),
+    limit: Optional[int] = Query(None, ge=1, description="Nombre maximal d'employés"),
+    table: str = Query(STREAM_SOURCE_TABLE, description="Table de sortie de l'ETL"),
+    chunk_size: int = Query(STREAM_CHUNK_SIZE, ge=1, le=50000)
+):
+    """Exporter les scores de risque de toute l'organisation en NDJSON.
+    
+    Les employés sont lus depuis la table de l'ETL par pagination sur
+    ``employee_id`` et scorés chunk par chunk : la mémoire reste constante
+    quelle que soit la taille de l'export. La dernière ligne
+    (``{"summary": ...}``) indique le curseur de reprise si l'export a été
+    tronqué par ``limit``. Avec un préprocesseur, les colonnes lues sont
+    ses ``input_columns`` et chaque chunk passe par sa transformation.
+    """
+    # Même version du modèle (et du préprocesseur) pour tout l'export
+    snapshot = serving_snapshot()
+    if snapshot.model is None:
+        raise HTTPException(status_code=503, detail="Modèle non chargé")
+    if table not in STREAM_SOURCE_TABLES:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Table non supportée: {table} (attendu: {', '.join(STREAM_SOURCE_TABLES)})"
+        )
+    
+    engine = get_analytics_engine()
+    try:
+        source = await run_in_threadpool(reflect_stream_source, engine, table, snapshot.preprocessor)
+    except sa.exc.NoSuchTableError:
+        raise HTTPException(status_code=404, detail=f"Table {table} introuvable")
+    
+    if department and 'department' not in source.c:
+        raise HTTPException(status_code=422, detail=f"La table {table} n'a pas de colonne department")
+    
+    start_after = parse_stream_cursor(source, cursor)
+    
+    async def generate():
+        after = start_after
+        remaining = limit
+        streamed = 0
+        while remaining is None or remaining > 0:
+            size = chunk_size if remaining is None else min(chunk_size, remaining)
+            chunk = await run_in_threadpool(
+                fetch_employee_chunk, engine, source, after, department, size
+            )
+            if chunk.empty:
+                break
+            
+            lines = await run_in_threadpool(score_stream_chunk, snapshot, chunk)
+            yield lines
+            
+            after = chunk['employee_id'].iloc[-1]
+            streamed += len(chunk)
+            if remaining is not None:
+                remaining -= len(chunk)
+            if len(chunk) < size:
+                after = None
+                break
+        else:
+            # Limite atteinte : vérifier s'il reste des lignes
+            more = await run_in_threadpool(fetch_employee_chunk, engine, source, after, department, 1)
+            if more.empty:
+                after = None
+        
+        summary = {'rows': streamed, 'next_cursor': to_json_value(after)}
+        yield json.dumps({'summary': summary}) + "\n"
+        logger.info(f"Export NDJSON de {table}: {streamed} employés")
+    
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+@app.get(f"{API_PREFIX}/metrics")
+async def get_metrics():
+    """Métriques de fonctionnement de l'API."""
+    return {
+        'micro_batching': {
+            'enabled': MICRO_BATCH_ENABLED,
+            **micro_batcher.get_stats()
+        },
+        'prediction_cache': {
+            'enabled': PREDICTION_CACHE_ENABLED,
+            **prediction_cache.get_stats()
+        },
+        'timestamp': datetime.now().isoformat()
+    }
+
+@app.exception_handler(HTTPException)
+async def http_exception_handler(request: Request, exc: HTTPException):
+    """Formater les erreurs HTTP de l'API."""
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={
+            "error": exc.detail,
+            "status_code": exc.status_code,
+            "timestamp": datetime.now().isoformat()
+        }
+    )
+
+# Fonctions utilitaires
+
+FEATURE_COLUMNS = ['creative_score', 'burnout_scale']
+
+@dataclass(frozen=True)
+class ServingSnapshot:
+    """Modèle, préprocesseur et version de cache servis à une requête.
+    
+    Lus ensemble à l'arrivée de la requête : les features construites
+    avec ``preprocessor`` sont scorées par ``model`` et mises en cache
+    sous ``cache_token``, même si un rechargement intervient entre-temps.
+    """
+    model: Any
+    preprocessor: Any
+    cache_token: Optional[str]
+
+def serving_snapshot() -> ServingSnapshot:
+    """Version servie, lue d'un bloc sur le registre si c'est elle qui est
+    activée (sans version de cache sinon)."""
+    active = model_registry.active
+    if active is not None and active.model is model:
+        return ServingSnapshot(active.model, active.preprocessor, active.cache_token)
+    
+    return ServingSnapshot(model, preprocessor, None)
+
+def build_feature_matrix(employees: List[EmployeeData], transform: Any) -> np.ndarray:
+    """Construire la matrice de features (une ligne par employé).
+    
+    Avec un préprocesseur ``transform``, les champs bruts passent par la
+    même transformation qu'à l'entraînement.
+    """
+    if transform is not None:
+        return transform.transform([employee.model_dump() for employee in employees])
+    
+    features = np.empty((len(employees), len(FEATURE_COLUMNS)), dtype=np.float64)
+    for i, employee in enumerate(employees):
+        features[i, 0] = employee.creative_score
+        features[i, 1] = employee.burnout_scale
+    
+    return features
+
+def predict_risk_probabilities(predictor: Any, features: np.ndarray,
+                               chunk_size: int = BATCH_CHUNK_SIZE) -> np.ndarray:
+    """Probabilités de risque TDAH, un appel predict_proba par chunk."""
+    probabilities = np.empty(len(features), dtype=np.float64)
+    for start in range(0, len(features), chunk_size):
+        chunk_proba = np.asarray(predictor.predict_proba(features[start:start + chunk_size]))
+        probabilities[start:start + chunk_size] = chunk_proba[:, 1]
+    
+    return probabilities
+
+def score_model(features: np.ndarray, predictor: Any) -> np.ndarray:
+    """Scorer avec ``predictor`` (contexte d'un micro-batch)."""
+    return predict_risk_probabilities(predictor, features)
+
+micro_batcher = MicroBatcher(
+    score_model,
+    max_batch_size=MICRO_BATCH_MAX_SIZE,
+    max_wait_ms=MICRO_BATCH_MAX_WAIT_MS,
+    max_queue_size=MICRO_BATCH_MAX_QUEUE
+)
+
+prediction_cache = PredictionCache(
+    max_size=PREDICTION_CACHE_SIZE,
+    ttl_seconds=PREDICTION_CACHE_TTL_SECONDS,
+    redis_url=REDIS_URL
+)
+
+async def score_single(features: np.ndarray, snapshot: ServingSnapshot) -> np.ndarray:
+    """Scorer une requête unitaire (micro-batch si activé, regroupée avec
+    les requêtes du même modèle)."""
+    if MICRO_BATCH_ENABLED:
+        return await micro_batcher.submit(features, snapshot.model)
+    
+    return await run_in_threadpool(score_model, features, snapshot.model)
+
+async def score_batch(features: np.ndarray, snapshot: ServingSnapshot) -> np.ndarray:
+    """Scorer un lot par chunks sur un thread de travail."""
+    return await run_in_threadpool(predict_risk_probabilities, snapshot.model, features, BATCH_CHUNK_SIZE)
+
+async def score_with_cache(features: np.ndarray, score: Any, snapshot: ServingSnapshot) -> np.ndarray:
+    """Probabilités de risque, en ne scorant que les défauts de cache."""
+    version = snapshot.cache_token if PREDICTION_CACHE_ENABLED else None
+    if version is None:
+        return np.asarray(await score(features, snapshot), dtype=np.float64)
+    
+    keys = prediction_cache.make_keys(features, version)
+    if prediction_cache.redis_enabled:
+        cached = await run_in_threadpool(prediction_cache.get_many, keys)
+    else:
+        cached = prediction_cache.get_many(keys)
+    
+    probabilities = np.array([np.nan if v is None else v for v in cached], dtype=np.float64)
+    missing = np.flatnonzero(np.isnan(probabilities))
+    if len(missing):
+        probabilities[missing] = await score(features[missing], snapshot)
+        missing_keys = [keys[i] for i in missing]
+        if prediction_cache.redis_enabled:
+            await run_in_threadpool(prediction_cache.set_many, missing_keys, probabilities[missing])
+        else:
+            prediction_cache.set_many(missing_keys, probabilities[missing])
+    
+    return probabilities
+
+STREAM_SOURCE_TABLES = ('daily_employee_analytics', 'processed_employee_data')
+
+_analytics_engine = None
+
+def get_analytics_engine() -> sa.engine.Engine:
+    """Connexion (partagée) à la base alimentée par l'ETL."""
+    global _analytics_engine
+    if _analytics_engine is None:
+        _analytics_engine = sa.create_engine(DATABASE_URL, pool_pre_ping=True)
+    
+    return _analytics_engine
+
+def reflect_stream_source(engine: sa.engine.Engine, table: str,
+                          transform: Any = None) -> sa.Table:
+    """Colonnes utiles de la table source de l'export.
+    
+    Avec un préprocesseur ``transform``, ce sont ses ``input_columns`` :
+    celles absentes de la table sont imputées comme des valeurs manquantes.
+    """
+    columns = {col['name']: col['type'] for col in sa.inspect(engine).get_columns(table)}
+    if not columns:
+        raise sa.exc.NoSuchTableError(table)
+    
+    if transform is not None:
+        inputs = [name for name in transform.input_columns if name not in ('employee_id', 'department')]
+        required = ['employee_id']
+        absent = [name for name in inputs if name not in columns]
+        if absent:
+            logger.warning(f"Colonnes du préprocesseur absentes de {table}, imputées: {absent}")
+    else:
+        inputs = FEATURE_COLUMNS
+        required = ['employee_id'] + FEATURE_COLUMNS
+    
+    wanted = ['employee_id', 'department'] + inputs
+    missing = [name for name in required if name not in columns]
+    if missing:
+        raise HTTPException(status_code=422, detail=f"Colonnes manquantes dans {table}: {missing}")
+    
+    return sa.Table(
+        table, sa.MetaData(),
+        *(sa.Column(name, columns[name]) for name in wanted if name in columns)
+    )
+
+def parse_stream_cursor(source: sa.Table, cursor: Optional[str]) -> Any:
+    """Convertir le curseur au type de la colonne employee_id."""
+    if cursor is None:
+        return None
+    
+    if isinstance(source.c.employee_id.type, sa.Integer):
+        try:
+            return int(cursor)
+        except ValueError:
+            raise HTTPException(status_code=422, detail=f"Curseur invalide: {cursor}")
+    
+    return cursor
+
+def fetch_employee_chunk(engine: sa.engine.Engine, source: sa.Table, after: Any,
+                         departments: Optional[List[str]], size: int) -> pd.DataFrame:
+    """Chunk suivant, par pagination sur employee_id (keyset)."""
+    query = sa.select(source).order_by(source.c.employee_id).limit(size)
+    if after is not None:
+        query = query.where(source.c.employee_id > after)
+    if departments:
+        query = query.where(source.c.department.in_(departments))
+    
+    with engine.connect() as conn:
+        result = conn.execute(query)
+        return pd.DataFrame(result.fetchall(), columns=list(result.keys()))
+
+def to_json_value(value: Any) -> Any:
+    """Convertir un scalaire numpy/pandas en valeur JSON."""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    
+    return value.item() if isinstance(value, np.generic) else value
+
+def score_stream_chunk(snapshot: ServingSnapshot, chunk: pd.DataFrame) -> str:
+    """Scorer un chunk et le sérialiser en lignes NDJSON.
+    
+    Les colonnes brutes passent par le préprocesseur de la version servie,
+    comme sur les routes de prédiction.
+    """
+    if snapshot.preprocessor is not None:
+        features = snapshot.preprocessor.transform(chunk)
+    else:
+        features = chunk[FEATURE_COLUMNS].to_numpy(dtype=np.float64, na_value=np.nan)
+    valid = ~np.isnan(features).any(axis=1)
+    
+    probabilities = np.full(len(chunk), np.nan)
+    if valid.any():
+        probabilities[valid] = predict_risk_probabilities(snapshot.model, features[valid])
+    
+    departments = chunk['department'].tolist() if 'department' in chunk else [None] * len(chunk)
+    lines = []
+    for employee_id, dept, probability in zip(
+        chunk['employee_id'].tolist(), departments, probabilities.tolist()
+    ):
+        record = {'employee_id': to_json_value(employee_id), 'department': to_json_value(dept)}
+        if np.isnan(probability):
+            record['error'] = "Features manquantes"
+        else:
+            record['adhd_risk'] = int(probability > PREDICTION_THRESHOLD)
+            record['probability'] = probability
+            record['confidence'] = get_confidence_level(probability)
+        lines.append(json.dumps(record))
+    
+    return "\n".join(lines) + "\n"
+
+def prepare_batch(body: bytes, content_type: str,
+                  transform: Any) -> Tuple[List[BatchPredictionItem], List[int], List[EmployeeData], Optional[np.ndarray]]:
+    """Décoder et valider un batch, puis construire la matrice de features
+    des lignes valides (appelé hors de la boucle d'événements).
+    
+    Renvoie les résultats par ligne (erreurs renseignées), les index et
+    employés valides et leur matrice (None si aucune ligne valide).
+    """
+    records = parse_batch_body(body, content_type)
+    if len(records) > BATCH_MAX_RECORDS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch trop volumineux: {len(records)} > {BATCH_MAX_RECORDS}"
+        )
+    
+    # Validation ligne par ligne
+    results = [BatchPredictionItem(index=i) for i in range(len(records))]
+    valid_indices = []
+    valid_employees = []
+    for i, record in enumerate(records):
+        if isinstance(record, Exception):
+            results[i].errors = [f"JSON invalide: {record}"]
+            continue
+        if isinstance(record, dict):
+            results[i].employee_id = record.get('employee_id')
+        try:
+            employee = EmployeeData.model_validate(record)
+        except ValidationError as e:
+            results[i].errors = [
+                f"{'.'.join(str(loc) for loc in err['loc']) or 'body'}: {err['msg']}"
+                for err in e.errors()
+            ]
+            continue
+        valid_indices.append(i)
+        valid_employees.append(employee)
+    
+    features = build_feature_matrix(valid_employees, transform) if valid_employees else None
+    
+    return results, valid_indices, valid_employees, features
+
+def parse_batch_body(body: bytes, content_type: str) -> List[Any]:
+    """Décoder un corps JSON (tableau) ou NDJSON.
+    
+    En NDJSON, une ligne illisible est remplacée par l'exception de
+    décodage pour être rapportée comme erreur de cette ligne.
+    """
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        records = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                records.append(e)
+        return records
+    
+    try:
+        records = json.loads(body)
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=422, detail=f"JSON invalide: {e}")
+    
+    if not isinstance(records, list):
+        raise HTTPException(status_code=422, detail="Un tableau JSON d'employés est attendu")
+    
+    return records
+
+def get_confidence_level(probability: float) -> str:
+    """Niveau de confiance à partir de la probabilité de risque."""
+    max_prob = max(probability, 1 - probability)
+    
+    if max_prob >= 0.9:
+        return "très_élevée"
+    elif max_prob >= 0.8:
+        return "élevée"
+    elif max_prob >= 0.7:
+        return "modérée"
+    else:
+        return "faible"
+
+def get_risk_recommendations(adhd_risk: int, probability: float) -> List[str]:
+    """Recommandations associées au niveau de risque."""
+    if adhd_risk == 1 or probability > 0.5:
+        if probability > 0.8:
+            recommendations = [
+                "Évaluation clinique recommandée",
+                "Aménagements de poste prioritaires",
+                "Suivi rapproché avec les RH"
+            ]
+        else:
+            recommendations = [
+                "Surveillance des indicateurs de performance",
+                "Considérer des aménagements préventifs",
+                "Formation des managers sur la neurodiversité"
+            ]
+        
+        recommendations.extend([
+            "Environnement de travail calme",
+            "Pauses régulières",
+            "Instructions écrites claires",
+            "Flexibilité horaires si possible"
+        ])
+        return recommendations
+    
+    return [
+        "Maintenir l'environnement actuel",
+        "Surveillance périodique",
+        "Promouvoir les bonnes pratiques"
+    ]
+
+def build_prediction_response(employee_id: str, adhd_risk: int, probability: float,
+                              timestamp: Optional[datetime] = None) -> PredictionResponse:
+    """Construire la réponse de prédiction d'un employé."""
+    return PredictionResponse(
+        employee_id=employee_id,
+        adhd_risk=adhd_risk,
+        probability=probability,
+        confidence=get_confidence_level(probability),
+        recommendations=get_risk_recommendations(adhd_risk, probability),
+        timestamp=timestamp or datetime.now()
+    )
@@ -0,0 +1,230 @@
+"""
+Registre des versions de modèle servies par l'API.
+
+Une nouvelle version est chargée et chauffée en arrière-plan, puis échangée
+atomiquement avec la version active. L'ancienne version reste référencée
+pendant ``drain_seconds`` pour que les requêtes en cours se terminent
+avant sa libération.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+
+from src.inference import load_forest_model
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class ModelVersion:
+    """Version de modèle chargée en mémoire."""
+    generation: int
+    version: str
+    model: Any
+    metadata: Dict[str, Any]
+    fingerprint: Tuple
+    loaded_at: datetime
+    load_time_ms: float
+    warmup_time_ms: float
+    preprocessor: Optional[Any] = None
+    retired_at: Optional[float] = field(default=None, repr=False)
+
+    @property
+    def cache_token(self) -> str:
+        """Identifiant stable entre workers (version + empreinte des métadonnées)."""
+        digest = hashlib.blake2b(
+            json.dumps(self.metadata, sort_keys=True, default=str).encode(), digest_size=6
+        ).hexdigest()
+        return f"{self.version}-{digest}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Description sérialisable de la version."""
+        return {
+            'generation': self.generation,
+            'version': self.version,
+            'model_type': type(self.model).__name__,
+            'loaded_at': self.loaded_at.isoformat(),
+            'load_time_ms': round(self.load_time_ms, 2),
+            'warmup_time_ms': round(self.warmup_time_ms, 2)
+        }
+
+class ModelRegistry:
+    """Chargement, échange à chaud et drainage des versions de modèle."""
+
+    def __init__(self, model_dir: Path, engine: str = 'auto',
+                 on_swap: Optional[Callable[[ModelVersion], None]] = None,
+                 drain_seconds: float = 30.0):
+        self.model_dir = Path(model_dir)
+        self.engine = engine
+        self.on_swap = on_swap
+        self.drain_seconds = drain_seconds
+
+        self.active: Optional[ModelVersion] = None
+        self.draining: List[ModelVersion] = []
+        self.reload_count = 0
+        self.failed_reloads = 0
+        self.last_error: Optional[str] = None
+
+        self._generation = 0
+        self._reload_lock = threading.Lock()
+        self._watcher: Optional[asyncio.Task] = None
+
+    def fingerprint(self) -> Tuple:
+        """Empreinte des fichiers du modèle (mtime et taille).
+
+        ``model_metadata.json`` est écrit en dernier par
+        ``ModelTrainer.save_best_model`` et sert de point de validation.
+        """
+        stats = []
+        for name in ("model_metadata.json", "random_forest.pkl"):
+            path = self.model_dir / name
+            if path.exists():
+                stat = path.stat()
+                stats.append((name, stat.st_mtime_ns, stat.st_size))
+
+        return tuple(stats)
+
+    def has_changed(self) -> bool:
+        """Les fichiers du modèle ont-ils changé depuis la version active ?"""
+        return self.active is None or self.fingerprint() != self.active.fingerprint
+
+    def reload(self, force: bool = False) -> Optional[ModelVersion]:
+        """Charger, chauffer et activer la version présente sur disque.
+
+        Renvoie la nouvelle version, ou ``None`` si rien n'a changé. En cas
+        d'erreur la version active est conservée et l'exception propagée.
+        """
+        with self._reload_lock:
+            if not force and not self.has_changed():
+                return None
+
+            try:
+                version = self._load_version()
+            except Exception as e:
+                self.failed_reloads += 1
+                self.last_error = str(e)
+                logger.error(f"Échec du rechargement du modèle: {e}")
+                raise
+
+            self._activate(version)
+            return version
+
+    def release_drained(self) -> int:
+        """Libérer les versions retirées depuis plus de ``drain_seconds``."""
+        now = time.monotonic()
+        remaining = [v for v in self.draining if now - v.retired_at < self.drain_seconds]
+        released = len(self.draining) - len(remaining)
+        self.draining = remaining
+
+        if released:
+            logger.info(f"{released} ancienne(s) version(s) de modèle libérée(s)")
+
+        return released
+
+    def start_watching(self, interval_seconds: float):
+        """Surveiller le dossier du modèle depuis la boucle courante."""
+        if interval_seconds <= 0 or (self._watcher is not None and not self._watcher.done()):
+            return
+
+        self._watcher = asyncio.get_running_loop().create_task(self._watch(interval_seconds))
+        logger.info(f"Surveillance de {self.model_dir} toutes les {interval_seconds}s")
+
+    async def stop_watching(self):
+        """Arrêter la surveillance."""
+        if self._watcher is not None:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except asyncio.CancelledError:
+                pass
+            self._watcher = None
+
+    def get_info(self) -> Dict[str, Any]:
+        """État du registre pour /model/info."""
+        return {
+            'active_version': self.active.to_dict() if self.active else None,
+            'draining_versions': [v.to_dict() for v in self.draining],
+            'engine': self.engine,
+            'reload_count': self.reload_count,
+            'failed_reloads': self.failed_reloads,
+            'last_error': self.last_error,
+            'watching': self._watcher is not None and not self._watcher.done()
+        }
+
+    async def _watch(self, interval_seconds: float):
+        """Boucle de surveillance : recharge en arrière-plan si nécessaire."""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(interval_seconds)
+            self.release_drained()
+            if not self.has_changed():
+                continue
+            try:
+                await loop.run_in_executor(None, self.reload)
+            except Exception:
+                # Déjà journalisé ; nouvel essai au prochain tour
+                pass
+
+    def _load_version(self) -> ModelVersion:
+        """Charger et chauffer une version sans l'activer."""
+        fingerprint = self.fingerprint()
+        start = time.perf_counter()
+
+        with open(self.model_dir / "model_metadata.json", 'r') as f:
+            metadata = json.load(f)
+        model = load_forest_model(self.model_dir, metadata, self.engine)
+        preprocessor = None
+        if metadata.get('preprocessor'):
+            preprocessor = joblib.load(self.model_dir / metadata['preprocessor'])
+        load_time_ms = (time.perf_counter() - start) * 1000
+
+        # Chauffe : un appel à vide avant de servir du trafic
+        start = time.perf_counter()
+        n_features = getattr(model, 'n_features_in_', None) or len(metadata.get('feature_names', []))
+        if n_features:
+            model.predict_proba(np.zeros((1, n_features)))
+        if preprocessor is not None:
+            preprocessor.transform([{}])
+        warmup_time_ms = (time.perf_counter() - start) * 1000
+
+        version = metadata.get('model_version') or metadata.get('training_date') or 'unknown'
+
+        return ModelVersion(
+            generation=self._generation + 1,
+            version=str(version),
+            model=model,
+            metadata=metadata,
+            fingerprint=fingerprint,
+            loaded_at=datetime.now(),
+            load_time_ms=load_time_ms,
+            warmup_time_ms=warmup_time_ms,
+            preprocessor=preprocessor
+        )
+
+    def _activate(self, version: ModelVersion):
+        """Échanger la version active et mettre l'ancienne en drainage."""
+        previous = self.active
+        self._generation = version.generation
+        self.active = version
+        if self.on_swap is not None:
+            self.on_swap(version)
+
+        if previous is not None:
+            previous.retired_at = time.monotonic()
+            self.draining.append(previous)
+            self.reload_count += 1
+
+        logger.info(
+            f"Modèle {version.version} (génération {version.generation}) actif - "
+            f"chargement {version.load_time_ms:.1f} ms, chauffe {version.warmup_time_ms:.1f} ms"
+        )
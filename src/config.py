@@ -14,6 +14,12 @@ DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://localhost/ubisoft_analyti
 # ML Models
 ADHD_MODEL_PATH = MODELS_DIR / "random_forest.pkl"
 PREDICTION_THRESHOLD = 0.5
+# Moteur d'inférence (src/inference.py) :
+# "auto" = artefact .npy mappé s'il existe, sinon pickle ; "compiled" = idem,
+# pickle compilé au chargement à défaut ; "sklearn" = toujours le pickle
+INFERENCE_ENGINE = os.getenv("INFERENCE_ENGINE", "auto")
+# Taille de batch à partir de laquelle le moteur compilé délègue à sklearn
+COMPILED_FALLBACK_ROWS = int(os.getenv("COMPILED_FALLBACK_ROWS", "512"))
 
 # Streamlit
 APP_TITLE = "Ubisoft People Analytics"
@@ -22,3 +28,27 @@ APP_ICON = "🎯"
 # API
 API_VERSION = "v1"
 API_PREFIX = f"/api/{API_VERSION}"
+
+# Prédiction batch
+BATCH_MAX_RECORDS = int(os.getenv("BATCH_MAX_RECORDS", "50000"))
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "5000"))
+
+# Micro-batching des prédictions unitaires
+MICRO_BATCH_ENABLED = os.getenv("MICRO_BATCH_ENABLED", "true").lower() == "true"
+MICRO_BATCH_MAX_SIZE = int(os.getenv("MICRO_BATCH_MAX_SIZE", "64"))
+MICRO_BATCH_MAX_WAIT_MS = float(os.getenv("MICRO_BATCH_MAX_WAIT_MS", "5"))
+MICRO_BATCH_MAX_QUEUE = int(os.getenv("MICRO_BATCH_MAX_QUEUE", "10000"))
+
+# Rechargement à chaud du modèle (0 = pas de surveillance de models/)
+MODEL_WATCH_INTERVAL_SECONDS = float(os.getenv("MODEL_WATCH_INTERVAL_SECONDS", "30"))
+MODEL_DRAIN_SECONDS = float(os.getenv("MODEL_DRAIN_SECONDS", "30"))
+
+# Cache des prédictions (LRU local + Redis optionnel)
+PREDICTION_CACHE_ENABLED = os.getenv("PREDICTION_CACHE_ENABLED", "true").lower() == "true"
+PREDICTION_CACHE_SIZE = int(os.getenv("PREDICTION_CACHE_SIZE", "100000"))
+PREDICTION_CACHE_TTL_SECONDS = float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", "3600"))
+REDIS_URL = os.getenv("REDIS_URL")
+
+# Export NDJSON des scores depuis les tables de l'ETL
+STREAM_SOURCE_TABLE = os.getenv("STREAM_SOURCE_TABLE", "daily_employee_analytics")
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", "5000"))
@@ -6,16 +6,78 @@ import pandas as pd
 import numpy as np
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from datetime import datetime, timedelta
 import sqlalchemy as sa
 from sqlalchemy import create_engine, text
 import os
-from dataclasses import dataclass
-from src.utils.data_processing import DataProcessor, validate_data_quality
+import json
+import shutil
+import joblib
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from itertools import compress
+from src.loaders import (
+    CsvChecksumWriter, ParquetChunkWriter, create_indexes, delete_rows, drop_table, ensure_unique_index, get_bulk_loader,
+    swap_table, upsert_rows
+)
+from src.utils.data_processing import DataProcessor, FittedStatistics, categorize_columns, validate_data_quality
+from src.utils.profiling import StageProfiler, profiled
+from src.utils.quality import DataProfile, profile_data
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    pq = None
 
 logger = logging.getLogger(__name__)
 
+# Nombre maximal de paramètres liés par requête SQLite (32766 depuis 3.32)
+SQLITE_MAX_PARAMS = 30000
+
+HR_DATA_QUERY = """
+SELECT 
+    e.employee_id,
+    e.department,
+    e.hire_date,
+    e.status,
+    a.creative_score,
+    a.burnout_scale,
+    a.communication_style,
+    a.assessment_date,
+    p.productivity_score,
+    p.innovation_index
+FROM employees e
+LEFT JOIN assessments a ON e.employee_id = a.employee_id
+LEFT JOIN performance p ON e.employee_id = p.employee_id
+WHERE e.status = 'active'
+"""
+
+# Extraction parallèle en base : chaque table est lue séparément puis
+# jointe localement (mêmes colonnes et lignes que HR_DATA_QUERY)
+HR_TABLE_QUERIES = {
+    'employees': "SELECT employee_id, department, hire_date, status FROM employees WHERE status = 'active'",
+    'assessments': "SELECT employee_id, creative_score, burnout_scale, communication_style, "
+                   "assessment_date FROM assessments",
+    'performance': "SELECT employee_id, productivity_score, innovation_index FROM performance"
+}
+
+# Sources RH fichier : {nom}.csv ou {nom}.parquet dans raw_data_path
+HR_SOURCE_NAMES = ('employees', 'assessments', 'performance')
+FILE_SOURCE_TYPES = ('csv', 'parquet')
+
+# État du mode incrémental : point de reprise par table de sortie
+ETL_WATERMARKS = sa.Table(
+    'etl_watermarks', sa.MetaData(),
+    sa.Column('output_table', sa.String(255), primary_key=True),
+    sa.Column('source_type', sa.String(32)),
+    sa.Column('watermark', sa.Text),
+    sa.Column('updated_at', sa.DateTime)
+)
+
 @dataclass
 class ETLConfig:
     """Configuration pour le pipeline ETL."""
@@ -25,6 +87,62 @@ class ETLConfig:
     batch_size: int = 1000
     validation_threshold: float = 0.8
     backup_enabled: bool = True
+    # Mode streaming : extraction, transformation et chargement par chunks
+    # de batch_size lignes (mémoire proportionnelle au chunk)
+    chunked: bool = False
+    # Stratégie de chargement (src/loaders.py) : "auto" = selon le dialecte
+    load_strategy: str = "auto"
+    # Remplacement (if_exists='replace') via une table de staging indexée
+    # puis renommée ; la génération précédente devient {table}_previous
+    staging_swap: bool = True
+    index_columns: Tuple[str, ...] = ("employee_id",)
+    # Mode incrémental : seules les lignes modifiées depuis le dernier
+    # passage sont transformées puis upsertées (voir _run_incremental_pipeline)
+    incremental: bool = False
+    # Vérification après chargement : relecture complète (COUNT(*), CSV
+    # relu) en plus des comptages et empreintes calculés à l'écriture
+    paranoid_verification: bool = False
+    # Format des fichiers de sortie : "csv" ou "parquet" (typé, compressé,
+    # partitionné selon parquet_partition_cols ; "run_date" = date du run)
+    output_format: str = "csv"
+    parquet_partition_cols: Tuple[str, ...] = ("run_date", "department")
+    parquet_compression: str = "zstd"
+    # Lecture simultanée des sources (1 = séquentielle) ; en base, les tables
+    # sont lues chacune par un curseur serveur si parallel_db_extraction
+    extract_workers: int = 3
+    parallel_db_extraction: bool = False
+    # Transformation en mémoire dans un pool de processus (1 = en série),
+    # à partir de parallel_transform_min_rows lignes
+    transform_workers: int = 1
+    parallel_transform_min_rows: int = 50000
+    # Mesure des étapes (durées, lignes) exposée par get_pipeline_status ;
+    # profile_memory ajoute tracemalloc et la taille des DataFrames (lent)
+    profiling: bool = True
+    profile_memory: bool = False
+    # Colonnes texte peu variées (département, style, statut) converties en
+    # 'category' dès l'extraction : nettoyage et encodage sur les catégories
+    categorical_extraction: bool = True
+    # Détection des outliers : "iqr", "zscore" ou "mad" (robuste) ; en mode
+    # chunked, les bornes viennent des sketches de fit_statistics
+    outlier_method: str = "iqr"
+
+def content_hashes(df: pd.DataFrame) -> pd.Series:
+    """Empreinte 64 bits du contenu de chaque ligne (int64 signé).
+    
+    Les colonnes sont triées par nom et normalisées (numériques en float64,
+    autres en texte) : une même ligne a la même empreinte quel que soit le
+    chunk ou la source qui l'a produite.
+    """
+    canonical = pd.DataFrame(index=df.index)
+    for col in sorted(df.columns):
+        if pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col]):
+            canonical[col] = df[col].astype(np.float64)
+        else:
+            canonical[col] = df[col].astype(object).where(df[col].notna(), '').astype(str)
+    
+    hashes = pd.util.hash_pandas_object(canonical, index=False).to_numpy()
+    
+    return pd.Series(hashes.view(np.int64), index=df.index)
 
 class UbisoftETLPipeline:
     """Pipeline ETL principal pour les données RH Ubisoft."""
@@ -32,13 +150,21 @@ class UbisoftETLPipeline:
     def __init__(self, config: ETLConfig):
         self.config = config
         self.engine = create_engine(config.database_url)
+        self.bulk_loader = get_bulk_loader(self.engine, config.batch_size, config.load_strategy)
         self.data_processor = DataProcessor()
         self.execution_log = []
+        self.profiler = StageProfiler(memory=config.profile_memory) if config.profiling else None
+        self.data_processor.profiler = self.profiler
+        
+    def extract_from_csv(self, file_path: Union[str, Path],
+                         columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Extraire les données depuis un fichier CSV.
         
-    def extract_from_csv(self, file_path: Union[str, Path]) -> pd.DataFrame:
-        """Extraire les données depuis un fichier CSV."""
+        ``columns`` (par ex. ``TransformPlan.source_columns``) limite
+        l'analyse du fichier aux colonnes utiles.
+        """
         try:
-            df = pd.read_csv(file_path)
+            df = pd.read_csv(file_path, usecols=columns)
             logger.info(f"Extraction CSV réussie: {len(df)} lignes depuis {file_path}")
             
             self._log_step("extract_csv", "success", {
@@ -54,6 +180,32 @@ class UbisoftETLPipeline:
             self._log_step("extract_csv", "error", {'error': str(e)})
             raise
     
+    def extract_from_parquet(self, file_path: Union[str, Path],
+                             columns: Optional[List[str]] = None,
+                             filters: Optional[List[Tuple]] = None) -> pd.DataFrame:
+        """Extraire les données d'un fichier ou dataset partitionné Parquet.
+        
+        ``columns`` limite la lecture aux colonnes utiles ; ``filters``
+        (ex. ``[('department', '==', 'design')]``) écarte les partitions et
+        groupes de lignes non concernés sans les lire.
+        """
+        try:
+            df = pd.read_parquet(file_path, columns=columns, filters=filters)
+            logger.info(f"Extraction Parquet réussie: {len(df)} lignes depuis {file_path}")
+            
+            self._log_step("extract_parquet", "success", {
+                'source_file': str(file_path),
+                'rows_extracted': len(df),
+                'columns': list(df.columns)
+            })
+            
+            return df
+            
+        except Exception as e:
+            logger.error(f"Erreur extraction Parquet: {e}")
+            self._log_step("extract_parquet", "error", {'error': str(e)})
+            raise
+    
     def extract_from_database(self, query: str, 
                             params: Optional[Dict] = None) -> pd.DataFrame:
         """Extraire les données depuis la base de données."""
@@ -73,154 +225,488 @@ class UbisoftETLPipeline:
             self._log_step("extract_db", "error", {'error': str(e)})
             raise
     
+    def iter_csv_chunks(self, file_path: Union[str, Path],
+                        chunksize: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """Lire un fichier CSV par chunks de ``chunksize`` lignes."""
+        chunksize = chunksize or self.config.batch_size
+        rows = chunks = 0
+        
+        try:
+            with pd.read_csv(file_path, chunksize=chunksize) as reader:
+                for chunk in reader:
+                    rows += len(chunk)
+                    chunks += 1
+                    yield chunk
+        except Exception as e:
+            logger.error(f"Erreur extraction CSV: {e}")
+            self._log_step("extract_csv", "error", {'error': str(e)})
+            raise
+        
+        logger.info(f"Extraction CSV par chunks: {rows} lignes ({chunks} chunks) depuis {file_path}")
+        self._log_step("extract_csv", "success", {
+            'source_file': str(file_path),
+            'rows_extracted': rows,
+            'chunks': chunks
+        })
+    
+    def iter_parquet_chunks(self, file_path: Union[str, Path],
+                            chunksize: Optional[int] = None,
+                            columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+        """Lire un fichier Parquet par chunks de ``chunksize`` lignes."""
+        chunksize = chunksize or self.config.batch_size
+        rows = chunks = 0
+        
+        try:
+            parquet_file = pq.ParquetFile(file_path)
+            for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+                chunk = batch.to_pandas()
+                rows += len(chunk)
+                chunks += 1
+                yield chunk
+        except Exception as e:
+            logger.error(f"Erreur extraction Parquet: {e}")
+            self._log_step("extract_parquet", "error", {'error': str(e)})
+            raise
+        
+        logger.info(f"Extraction Parquet par chunks: {rows} lignes ({chunks} chunks) depuis {file_path}")
+        self._log_step("extract_parquet", "success", {
+            'source_file': str(file_path),
+            'rows_extracted': rows,
+            'chunks': chunks
+        })
+    
+    def iter_file_chunks(self, file_path: Path,
+                         chunksize: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """Lire un fichier CSV ou Parquet (selon l'extension) par chunks."""
+        if file_path.suffix == '.parquet':
+            return self.iter_parquet_chunks(file_path, chunksize)
+        return self.iter_csv_chunks(file_path, chunksize)
+    
+    def iter_hr_data_chunks(self, source_type: str = "csv",
+                            chunksize: Optional[int] = None,
+                            since: Optional[str] = None) -> Iterator[pd.DataFrame]:
+        """Extraire les données RH jointes, chunk par chunk.
+        
+        En CSV ou Parquet, ``assessments`` et ``performance`` sont d'abord
+        versés par chunks dans des tables de lookup SQLite temporaires
+        indexées sur ``employee_id`` ; chaque chunk d'``employees`` est
+        ensuite joint aux seules lignes qui le concernent. En base, la
+        jointure est faite par le SGBD et lue avec un curseur serveur ;
+        ``since`` n'y garde que les évaluations postérieures à cette date.
+        """
+        chunksize = chunksize or self.config.batch_size
+        
+        if source_type in FILE_SOURCE_TYPES:
+            employees_path = self.config.raw_data_path / f'employees.{source_type}'
+            if not employees_path.exists():
+                raise FileNotFoundError(f"Fichier employees.{source_type} requis")
+            
+            lookup_files = {
+                'assessments': self.config.raw_data_path / f'assessments.{source_type}',
+                'performance': self.config.raw_data_path / f'performance.{source_type}'
+            }
+            
+            with tempfile.TemporaryDirectory() as temp_dir:
+                # sqlite3 direct : évite la compilation SQLAlchemy ligne à ligne
+                lookup_conn = sqlite3.connect(Path(temp_dir) / 'lookup.db')
+                lookup_conn.execute("PRAGMA journal_mode = OFF")
+                lookup_conn.execute("PRAGMA synchronous = OFF")
+                try:
+                    lookups = {}
+                    for name, file_path in lookup_files.items():
+                        if file_path.exists():
+                            lookups[name] = self._build_lookup_table(
+                                lookup_conn, name, file_path, chunksize
+                            )
+                        else:
+                            logger.warning(f"Fichier non trouvé: {file_path}")
+                    
+                    for chunk in self.iter_file_chunks(employees_path, chunksize):
+                        for name, dtypes in lookups.items():
+                            chunk = chunk.merge(
+                                self._lookup_rows(lookup_conn, name, dtypes, chunk['employee_id']),
+                                on='employee_id', how='left'
+                            )
+                        yield self._categorize_chunk(chunk)
+                finally:
+                    lookup_conn.close()
+        
+        elif source_type == "database":
+            try:
+                query, params = HR_DATA_QUERY, {}
+                if since is not None:
+                    query += "AND a.assessment_date > :since\n"
+                    params['since'] = since
+                with self.engine.connect().execution_options(stream_results=True) as conn:
+                    for chunk in pd.read_sql(text(query), conn, params=params, chunksize=chunksize):
+                        yield self._categorize_chunk(chunk)
+            except Exception as e:
+                logger.error(f"Erreur extraction DB: {e}")
+                self._log_step("extract_db", "error", {'error': str(e)})
+                raise
+        
+        else:
+            raise ValueError(f"Type de source non supporté: {source_type}")
+    
+    @profiled
     def extract_hr_data(self, source_type: str = "csv") -> pd.DataFrame:
         """Extraire toutes les données RH selon le type de source."""
         
-        if source_type == "csv":
-            # Extraction depuis fichiers CSV
+        if source_type in FILE_SOURCE_TYPES:
+            # Extraction depuis fichiers CSV ou Parquet
             data_files = {
-                'employees': self.config.raw_data_path / 'employees.csv',
-                'assessments': self.config.raw_data_path / 'assessments.csv',
-                'performance': self.config.raw_data_path / 'performance.csv'
+                name: self.config.raw_data_path / f'{name}.{source_type}'
+                for name in HR_SOURCE_NAMES
             }
+            extract = self.extract_from_csv if source_type == "csv" else self.extract_from_parquet
             
-            dataframes = {}
+            sources = {}
             for name, file_path in data_files.items():
                 if file_path.exists():
-                    dataframes[name] = self.extract_from_csv(file_path)
+                    sources[name] = (extract, file_path)
                 else:
                     logger.warning(f"Fichier non trouvé: {file_path}")
             
-            # Joindre les données
-            if 'employees' in dataframes:
-                df = dataframes['employees']
-                
-                if 'assessments' in dataframes:
-                    df = df.merge(dataframes['assessments'], 
-                                on='employee_id', how='left')
-                
-                if 'performance' in dataframes:
-                    df = df.merge(dataframes['performance'], 
-                                on='employee_id', how='left')
-                
-                return df
-            else:
-                raise FileNotFoundError("Fichier employees.csv requis")
+            if 'employees' not in sources:
+                raise FileNotFoundError(f"Fichier employees.{source_type} requis")
+            
+            return self._categorize(self._join_sources(self._extract_sources(sources)))
                 
         elif source_type == "database":
             # Extraction depuis base de données
-            query = """
-            SELECT 
-                e.employee_id,
-                e.department,
-                e.hire_date,
-                e.status,
-                a.creative_score,
-                a.burnout_scale,
-                a.communication_style,
-                a.assessment_date,
-                p.productivity_score,
-                p.innovation_index
-            FROM employees e
-            LEFT JOIN assessments a ON e.employee_id = a.employee_id
-            LEFT JOIN performance p ON e.employee_id = p.employee_id
-            WHERE e.status = 'active'
-            """
-            
-            return self.extract_from_database(query)
+            if self.config.parallel_db_extraction:
+                sources = {
+                    name: (self._extract_table, query) for name, query in HR_TABLE_QUERIES.items()
+                }
+                return self._categorize(self._join_sources(self._extract_sources(sources)))
+            return self._categorize(self.extract_from_database(HR_DATA_QUERY))
         
         else:
             raise ValueError(f"Type de source non supporté: {source_type}")
     
+    def _categorize(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Convertir les colonnes texte peu variées en ``category``.
+        
+        La mémoire avant et après conversion (``memory_usage_mb`` de
+        ``validate_data_quality``) est ajoutée à ``execution_log`` (étape
+        ``categorize``) ; le profil après conversion est réutilisé par la
+        validation de la transformation (cache de ``profile_data``).
+        """
+        if not self.config.categorical_extraction:
+            return df
+        
+        memory_before = validate_data_quality(df)['memory_usage_mb']
+        columns = categorize_columns(df)
+        memory_after = validate_data_quality(df)['memory_usage_mb'] if columns else memory_before
+        
+        logger.info(f"Colonnes converties en category: {columns} "
+                    f"({memory_before:.1f} Mo -> {memory_after:.1f} Mo)")
+        self._log_step("categorize", "success", {
+            'columns': columns,
+            'memory_usage_mb_before': memory_before,
+            'memory_usage_mb_after': memory_after
+        })
+        
+        return df
+    
+    def _categorize_chunk(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """``_categorize`` d'un chunk extrait, sans rapport mémoire par chunk."""
+        if self.config.categorical_extraction:
+            categorize_columns(chunk)
+        return chunk
+    
+    def _extract_sources(self, sources: Dict[str, Tuple]) -> Dict[str, pd.DataFrame]:
+        """Extraire les sources ``{nom: (fonction, argument)}`` simultanément.
+        
+        Les parseurs CSV/Parquet et les drivers relâchent le GIL pendant la
+        lecture : un pool de threads suffit. Les durées par source sont
+        ajoutées à ``execution_log`` (étape ``extract_sources``).
+        """
+        wall_start = time.perf_counter()
+        
+        def timed(item):
+            name, (extract, argument) = item
+            start = time.perf_counter()
+            df = extract(argument)
+            return name, df, time.perf_counter() - start
+        
+        workers = max(1, min(self.config.extract_workers, len(sources)))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="etl-extract") as executor:
+                results = list(executor.map(timed, sources.items()))
+        else:
+            results = [timed(item) for item in sources.items()]
+        
+        self._log_step("extract_sources", "success", {
+            'workers': workers,
+            'wall_seconds': time.perf_counter() - wall_start,
+            'sources': {
+                name: {'rows': len(df), 'duration_seconds': duration}
+                for name, df, duration in results
+            }
+        })
+        
+        return {name: df for name, df, _ in results}
+    
+    def _extract_table(self, query: str) -> pd.DataFrame:
+        """Lire une table par un curseur serveur, sur une connexion dédiée."""
+        try:
+            with self.engine.connect().execution_options(stream_results=True) as conn:
+                chunks = list(pd.read_sql(text(query), conn, chunksize=max(self.config.batch_size, 10000)))
+            return pd.concat(chunks, ignore_index=True)
+        except Exception as e:
+            logger.error(f"Erreur extraction DB: {e}")
+            self._log_step("extract_db", "error", {'error': str(e)})
+            raise
+    
+    def _join_sources(self, dataframes: Dict[str, pd.DataFrame]) -> pd.DataFrame:
+        """Joindre évaluations et performance aux employés (jointure gauche).
+        
+        Les tables de droite sont indexées sur ``employee_id`` avant la
+        jointure ; le résultat est celui de ``merge(on='employee_id',
+        how='left')`` (ordre des employés et suffixes compris).
+        """
+        df = dataframes['employees']
+        
+        for name in ('assessments', 'performance'):
+            if name in dataframes:
+                right = dataframes[name].set_index('employee_id')
+                df = df.join(right, on='employee_id', how='left', lsuffix='_x', rsuffix='_y')
+        
+        return df.reset_index(drop=True)
+    
+    @profiled
     def transform_employee_data(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Transformer les données d'employés."""
+        """Transformer les données d'employés.
+        
+        Avec ``transform_workers > 1``, les données sont transformées en
+        parallèle par département (voir ``_transform_parallel``).
+        """
         logger.info("Début transformation des données")
         
+        workers = self.config.transform_workers
+        parallel = (
+            workers > 1 and len(df) >= self.config.parallel_transform_min_rows
+            and 'department' in df.columns and df.index.is_unique
+            and self.data_processor.statistics is None
+        )
+        if parallel:
+            df_transformed, n_outliers, n_partitions = self._transform_parallel(df, workers)
+        else:
+            df_transformed, n_outliers = self._transform_frame(df)
+        
+        self._log_step("transform", "success", {
+            'input_rows': len(df),
+            'output_rows': len(df_transformed),
+            'input_columns': len(df.columns),
+            'output_columns': len(df_transformed.columns),
+            'outliers_detected': n_outliers,
+            'partitions': n_partitions if parallel else 1
+        })
+        
+        logger.info(f"Transformation terminée: {len(df_transformed)} lignes, {len(df_transformed.columns)} colonnes")
+        
+        return df_transformed
+    
+    def _transform_parallel(self, df: pd.DataFrame, workers: int) -> Tuple[pd.DataFrame, int, int]:
+        """Transformer ``df`` par partitions de département dans un pool de processus.
+        
+        Les statistiques globales (imputation, quantiles, moyennes par
+        département, vocabulaires d'encodage) sont d'abord ajustées de façon
+        exacte sur l'ensemble puis envoyées une fois à chaque processus ;
+        les étapes 1 à 4 y sont appliquées partition par partition. Les
+        partitions sont réassemblées dans l'ordre d'origine des lignes et
+        les outliers (bornes globales) traités sur l'ensemble : le résultat
+        est celui du traitement en série.
+        
+        Les gros départements sont redécoupés pour occuper tous les
+        processus. Renvoie le DataFrame, le nombre de colonnes avec outliers
+        et le nombre de partitions.
+        """
+        quality_report = validate_data_quality(df)
+        if quality_report['data_quality_score'] < self.config.validation_threshold * 100:
+            logger.warning(f"Qualité des données faible: {quality_report['data_quality_score']:.1f}%")
+        
+        # Doublons écartés avant le découpage (ils peuvent changer de département)
+        unique_rows = df.drop_duplicates(subset=['employee_id'])
+        
+        fit_start = time.perf_counter()
+        statistics = self.data_processor.fit_statistics(lambda: [unique_rows], exact=True, outliers=False)
+        fit_seconds = time.perf_counter() - fit_start
+        self.data_processor.reset_statistics()
+        if statistics.knn_imputer is not None:
+            self.data_processor.imputers['neighbor_numeric'] = statistics.knn_imputer
+        
+        max_rows = max(1, -(-len(unique_rows) // (workers * 2)))
+        partitions = [
+            part.iloc[start:start + max_rows]
+            for _, part in unique_rows.groupby('department', sort=True, dropna=False)
+            for start in range(0, len(part), max_rows)
+        ]
+        
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=min(workers, len(partitions)),
+                                 initializer=_init_transform_worker,
+                                 initargs=(self.config, statistics)) as executor:
+            prepared = list(executor.map(_prepare_partition, partitions))
+        pool_seconds = time.perf_counter() - start
+        
+        # Ordre d'origine des lignes, indépendant du découpage
+        df_prepared = pd.concat(prepared).reindex(unique_rows.index)
+        df_transformed, n_outliers = self._finalize_frame(df_prepared)
+        
+        logger.info(f"Transformation parallèle: {len(partitions)} partitions, {workers} processus "
+                    f"(ajustement {fit_seconds:.2f}s, pool {pool_seconds:.2f}s)")
+        
+        return df_transformed, n_outliers, len(partitions)
+    
+    def transform_chunks(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Transformer un flux de chunks.
+        
+        Les doublons d'``employee_id`` sont écartés d'un chunk à l'autre
+        (seuls les identifiants vus sont conservés en mémoire). Sans
+        statistiques ajustées au préalable (``DataProcessor.fit_statistics``),
+        les transformations utilisent les statistiques de chaque chunk.
+        Les profils de qualité des chunks bruts sont fusionnés en un
+        rapport global (``data_quality`` de l'étape ``transform``) ; chaque
+        chunk n'est profilé qu'une fois (cache de ``profile_data``).
+        """
+        stats = {'input_rows': 0, 'output_rows': 0, 'chunks': 0, 'outliers_detected': 0}
+        profile = DataProfile()
+        
+        def counted(chunks):
+            for chunk in chunks:
+                stats['input_rows'] += len(chunk)
+                profile.merge(profile_data(chunk))
+                yield chunk
+        
+        for chunk in self._drop_seen_duplicates(counted(chunks)):
+            chunk_transformed, n_outliers = self._transform_frame(chunk)
+            
+            stats['output_rows'] += len(chunk_transformed)
+            stats['chunks'] += 1
+            stats['outliers_detected'] += n_outliers
+            
+            yield chunk_transformed
+        
+        stats['data_quality'] = profile.quality_report()
+        self._log_step("transform", "success", stats)
+        logger.info(f"Transformation par chunks terminée: {stats['output_rows']} lignes "
+                    f"({stats['chunks']} chunks)")
+    
+    def _drop_seen_duplicates(self, chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Écarter les doublons d'employee_id, dans un chunk et d'un chunk à l'autre.
+        
+        Les doublons internes au chunk sont retirés par ``drop_duplicates``
+        (première occurrence gardée, comme ``clean_employee_data``). Les
+        identifiants déjà vus restent dans un ``set`` : un ``isin`` contre
+        tous les identifiants vus reconstruirait leur table de hachage à
+        chaque chunk (coût quadratique sur le flux).
+        """
+        seen_ids = set()
+        for chunk in chunks:
+            chunk = chunk.drop_duplicates(subset=['employee_id'])
+            ids = chunk['employee_id'].tolist()
+            unseen = np.fromiter((eid not in seen_ids for eid in ids), dtype=bool, count=len(ids))
+            if not unseen.all():
+                chunk = chunk[unseen]
+                ids = list(compress(ids, unseen))
+            if chunk.empty:
+                continue
+            seen_ids.update(ids)
+            yield chunk
+    
+    def _transform_frame(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, int]:
+        """Appliquer la chaîne de transformation à un DataFrame."""
+        
         # Validation initiale
         quality_report = validate_data_quality(df)
         if quality_report['data_quality_score'] < self.config.validation_threshold * 100:
             logger.warning(f"Qualité des données faible: {quality_report['data_quality_score']:.1f}%")
         
-        # Pipeline de transformation
-        df_transformed = df.copy()
+        return self._finalize_frame(self._prepare_frame(df))
+    
+    def _prepare_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Étapes 1 à 4 : nettoyage, imputation, features, encodage.
         
-        # 1. Nettoyage de base
-        df_transformed = self.data_processor.clean_employee_data(df_transformed)
+        Avec des statistiques figées, chaque ligne est transformée
+        indépendamment des autres (partitionnable).
+        """
+        # 1. Nettoyage de base : seule copie de df (paresseuse sous
+        # copy-on-write), les étapes suivantes modifient cette frame
+        df_transformed = self.data_processor.clean_employee_data(df)
         
         # 2. Gestion des valeurs manquantes
-        df_transformed = self.data_processor.handle_missing_values(df_transformed)
+        df_transformed = self.data_processor.handle_missing_values(df_transformed, copy=False)
         
         # 3. Feature engineering
-        df_transformed = self.data_processor.engineer_features(df_transformed)
+        df_transformed = self.data_processor.engineer_features(df_transformed, copy=False)
         
         # 4. Encodage des variables catégorielles
-        df_transformed = self.data_processor.encode_categorical_variables(df_transformed)
+        df_transformed = self.data_processor.encode_categorical_variables(df_transformed, copy=False)
         
-        # 5. Détection des outliers
-        outliers = self.data_processor.detect_outliers(df_transformed)
+        return df_transformed
+    
+    def _finalize_frame(self, df_transformed: pd.DataFrame) -> Tuple[pd.DataFrame, int]:
+        """Étapes 5 et 6 : outliers puis validation finale."""
+        
+        # 5. Détection des outliers et traitement conservateur des outliers
+        # rares (cap aux 1er/99e percentiles), en une passe vectorisée
+        df_transformed, outliers = self.data_processor.handle_outliers(
+            df_transformed, method=self.config.outlier_method
+        )
         if outliers:
             logger.info(f"Outliers détectés dans {len(outliers)} colonnes")
-            
-            # Traitement conservateur des outliers (cap au 99e percentile)
-            for col, outlier_indices in outliers.items():
-                if len(outlier_indices) < len(df_transformed) * 0.05:  # < 5% outliers
-                    p99 = df_transformed[col].quantile(0.99)
-                    p1 = df_transformed[col].quantile(0.01)
-                    df_transformed[col] = df_transformed[col].clip(p1, p99)
         
         # 6. Validation finale
         self._validate_transformed_data(df_transformed)
         
-        self._log_step("transform", "success", {
-            'input_rows': len(df),
-            'output_rows': len(df_transformed),
-            'input_columns': len(df.columns),
-            'output_columns': len(df_transformed.columns),
-            'outliers_detected': len(outliers)
-        })
-        
-        logger.info(f"Transformation terminée: {len(df_transformed)} lignes, {len(df_transformed.columns)} colonnes")
-        
-        return df_transformed
+        return df_transformed, len(outliers)
     
+    @profiled
     def load_to_database(self, df: pd.DataFrame, 
                         table_name: str,
                         if_exists: str = 'replace') -> bool:
-        """Charger les données dans la base de données."""
+        """Charger les données dans la base de données.
+        
+        En mode ``staging_swap``, un remplacement écrit d'abord dans une
+        table de staging puis l'échange avec la table courante.
+        """
+        staging_table = None
         try:
-            # Backup si nécessaire
-            if self.config.backup_enabled and if_exists == 'replace':
-                self._backup_table(table_name)
+            swap = self.config.staging_swap and if_exists == 'replace'
+            if swap:
+                staging_table = self._staging_table_name(table_name)
+                target_table = staging_table
+            else:
+                target_table = table_name
+                # Backup si nécessaire
+                if self.config.backup_enabled and if_exists == 'replace':
+                    self._backup_table(table_name)
             
-            # Chargement par batch pour de gros datasets
+            # Chargement en masse (COPY, executemany ou to_sql selon le dialecte)
             total_rows = len(df)
             batch_size = self.config.batch_size
             
-            for i in range(0, total_rows, batch_size):
-                batch_df = df.iloc[i:i + batch_size]
-                batch_df.to_sql(
-                    table_name, 
-                    self.engine, 
-                    if_exists='append' if i > 0 else if_exists,
-                    index=False,
-                    method='multi'
-                )
-                
-                logger.info(f"Batch {i//batch_size + 1}/{(total_rows-1)//batch_size + 1} chargé")
-            
-            # Vérification post-chargement
-            verification_query = f"SELECT COUNT(*) as count FROM {table_name}"
-            result = pd.read_sql(verification_query, self.engine)
-            loaded_count = result.iloc[0]['count']
+            loaded_count = self.bulk_loader.load(df, target_table, 'replace' if swap else if_exists)
             
+            # Vérification post-chargement : lignes rapportées par le driver
             if loaded_count != total_rows:
                 raise ValueError(f"Nombre de lignes incohérent: {loaded_count} vs {total_rows}")
+            if if_exists == 'replace':
+                self._verify_table_count(target_table, total_rows)
             
-            self._log_step("load_db", "success", {
+            details = {
                 'table_name': table_name,
                 'rows_loaded': total_rows,
-                'batches': (total_rows-1)//batch_size + 1
-            })
+                'batches': (total_rows-1)//batch_size + 1,
+                'load_strategy': self.bulk_loader.name
+            }
+            if swap:
+                details.update(self._publish_staging_table(staging_table, table_name))
+                staging_table = None
+            
+            self._log_step("load_db", "success", details)
             
             logger.info(f"Chargement DB réussi: {total_rows} lignes dans {table_name}")
             return True
@@ -228,8 +714,79 @@ class UbisoftETLPipeline:
         except Exception as e:
             logger.error(f"Erreur chargement DB: {e}")
             self._log_step("load_db", "error", {'error': str(e)})
+            if staging_table is not None:
+                self._drop_staging_table(staging_table)
+            raise
+    
+    @profiled
+    def load_chunks_to_database(self, chunks: Iterable[pd.DataFrame],
+                                table_name: str,
+                                if_exists: str = 'replace') -> int:
+        """Charger un flux de chunks dans la base de données.
+        
+        Le premier chunk fixe le schéma de la table ; les suivants y sont
+        alignés puis ajoutés. Renvoie le nombre de lignes chargées. En mode
+        ``staging_swap``, un remplacement n'est visible qu'une fois tous les
+        chunks chargés.
+        """
+        staging_table = None
+        try:
+            swap = self.config.staging_swap and if_exists == 'replace'
+            if swap:
+                staging_table = self._staging_table_name(table_name)
+                target_table = staging_table
+            else:
+                target_table = table_name
+                if self.config.backup_enabled and if_exists == 'replace':
+                    self._backup_table(table_name)
+            
+            total_rows = 0
+            loaded_count = 0
+            columns = None
+            n_batches = 0
+            for chunk in chunks:
+                if columns is None:
+                    columns = list(chunk.columns)
+                else:
+                    extra = [col for col in chunk.columns if col not in columns]
+                    if extra:
+                        logger.warning(f"Colonnes absentes du premier chunk ignorées: {extra}")
+                    chunk = chunk.reindex(columns=columns)
+                
+                loaded_count += self.bulk_loader.load(chunk, target_table, 'append' if n_batches > 0 else if_exists)
+                total_rows += len(chunk)
+                n_batches += 1
+                logger.info(f"Chunk {n_batches} chargé ({total_rows} lignes)")
+            
+            # Vérification post-chargement : lignes rapportées par le driver
+            if loaded_count != total_rows:
+                raise ValueError(f"Nombre de lignes incohérent: {loaded_count} vs {total_rows}")
+            if n_batches and if_exists == 'replace':
+                self._verify_table_count(target_table, total_rows)
+            
+            details = {
+                'table_name': table_name,
+                'rows_loaded': total_rows,
+                'batches': n_batches,
+                'load_strategy': self.bulk_loader.name
+            }
+            if swap and n_batches:
+                details.update(self._publish_staging_table(staging_table, table_name))
+                staging_table = None
+            
+            self._log_step("load_db", "success", details)
+            
+            logger.info(f"Chargement DB réussi: {total_rows} lignes dans {table_name}")
+            return total_rows
+            
+        except Exception as e:
+            logger.error(f"Erreur chargement DB: {e}")
+            self._log_step("load_db", "error", {'error': str(e)})
+            if staging_table is not None:
+                self._drop_staging_table(staging_table)
             raise
     
+    @profiled
     def load_to_csv(self, df: pd.DataFrame, 
                    file_path: Union[str, Path]) -> bool:
         """Charger les données dans un fichier CSV."""
@@ -243,16 +800,17 @@ class UbisoftETLPipeline:
                 file_path.rename(backup_path)
                 logger.info(f"Backup créé: {backup_path}")
             
-            df.to_csv(file_path, index=False)
+            with CsvChecksumWriter(file_path) as writer:
+                writer.write(df)
             
-            # Vérification
-            verification_df = pd.read_csv(file_path)
-            if len(verification_df) != len(df):
-                raise ValueError(f"Nombre de lignes incohérent après écriture")
+            # Vérification : taille sur disque (relecture en mode paranoïaque)
+            writer.verify(self.config.paranoid_verification)
             
             self._log_step("load_csv", "success", {
                 'file_path': str(file_path),
-                'rows_saved': len(df)
+                'rows_saved': writer.rows,
+                'bytes_written': writer.bytes,
+                'checksum': writer.checksum
             })
             
             logger.info(f"Sauvegarde CSV réussie: {len(df)} lignes dans {file_path}")
@@ -263,6 +821,38 @@ class UbisoftETLPipeline:
             self._log_step("load_csv", "error", {'error': str(e)})
             raise
     
+    @profiled
+    def load_to_parquet(self, df: pd.DataFrame, file_path: Union[str, Path],
+                        partition_cols: Optional[List[str]] = None) -> bool:
+        """Charger les données dans un fichier Parquet, ou dans un dataset
+        partitionné par ``partition_cols`` dont ``file_path`` est la racine."""
+        try:
+            file_path = Path(file_path)
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            
+            with ParquetChunkWriter(file_path, partition_cols or (), self.config.parquet_compression) as writer:
+                writer.write(df)
+            
+            # Vérification : lignes lues dans les pieds de page des fichiers
+            writer.verify(self.config.paranoid_verification)
+            
+            self._log_step("load_parquet", "success", {
+                'file_path': str(file_path),
+                'rows_saved': writer.rows,
+                'bytes_written': writer.bytes,
+                'files': len(writer.files),
+                'partition_cols': list(partition_cols or [])
+            })
+            
+            logger.info(f"Sauvegarde Parquet réussie: {writer.rows} lignes dans {file_path}")
+            return True
+            
+        except Exception as e:
+            logger.error(f"Erreur sauvegarde Parquet: {e}")
+            self._log_step("load_parquet", "error", {'error': str(e)})
+            raise
+    
+    @profiled
     def run_full_pipeline(self, source_type: str = "csv",
                          output_table: str = "processed_employee_data") -> Dict:
         """Exécuter le pipeline ETL complet."""
@@ -270,6 +860,11 @@ class UbisoftETLPipeline:
         pipeline_start = datetime.now()
         logger.info("=== DÉBUT PIPELINE ETL ===")
         
+        if self.config.incremental:
+            return self._run_incremental_pipeline(source_type, output_table, pipeline_start)
+        if self.config.chunked:
+            return self._run_chunked_pipeline(source_type, output_table, pipeline_start)
+        
         try:
             # 1. Extract
             logger.info("Phase 1: Extraction")
@@ -284,10 +879,15 @@ class UbisoftETLPipeline:
             
             # Chargement DB
             self.load_to_database(processed_data, output_table)
+            imputer_file = self._save_imputer(output_table, self.data_processor.imputers.get('neighbor_numeric'))
             
             # Chargement fichier de backup
-            backup_file = self.config.processed_data_path / f"{output_table}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            self.load_to_csv(processed_data, backup_file)
+            backup_file = self._prepare_output_path(output_table, pipeline_start)
+            if self.config.output_format == "parquet":
+                partitioned, partition_cols = self._with_partitions(processed_data, pipeline_start)
+                self.load_to_parquet(partitioned, backup_file, partition_cols)
+            else:
+                self.load_to_csv(processed_data, backup_file)
             
             pipeline_end = datetime.now()
             execution_time = (pipeline_end - pipeline_start).total_seconds()
@@ -303,7 +903,8 @@ class UbisoftETLPipeline:
                 'data_quality_improvement': self._calculate_quality_improvement(raw_data, processed_data),
                 'steps_executed': len(self.execution_log),
                 'output_table': output_table,
-                'backup_file': str(backup_file)
+                'backup_file': str(backup_file),
+                'imputer_file': str(imputer_file) if imputer_file else None
             }
             
             logger.info(f"=== PIPELINE ETL TERMINÉ - {execution_time:.2f}s ===")
@@ -324,6 +925,412 @@ class UbisoftETLPipeline:
             
             raise Exception(f"Pipeline ETL échoué: {e}")
     
+    def _run_chunked_pipeline(self, source_type: str, output_table: str,
+                              pipeline_start: datetime) -> Dict:
+        """Pipeline ETL en streaming : chaque chunk est extrait, transformé
+        puis chargé (base et fichier de backup) avant de lire le suivant."""
+        
+        try:
+            backup_file = self._prepare_output_path(output_table, pipeline_start)
+            counts = {'input_rows': 0}
+            
+            def counted(chunks):
+                for chunk in chunks:
+                    counts['input_rows'] += len(chunk)
+                    yield chunk
+            
+            # Passe d'ajustement : statistiques globales figées pour tous les chunks
+            fit_start = datetime.now()
+            stats = self.data_processor.fit_statistics(
+                lambda: self._drop_seen_duplicates(self.iter_hr_data_chunks(source_type))
+            )
+            self._log_step("fit_statistics", "success", {
+                'rows': stats.n_rows,
+                'knn_imputation': stats.knn_imputer is not None,
+                'duration_seconds': (datetime.now() - fit_start).total_seconds()
+            })
+            
+            raw_chunks = counted(self.iter_hr_data_chunks(source_type))
+            if self.config.output_format == "parquet":
+                processed_chunks = self._write_parquet_chunks(
+                    self.transform_chunks(raw_chunks), backup_file, pipeline_start
+                )
+            else:
+                processed_chunks = self._write_csv_chunks(self.transform_chunks(raw_chunks), backup_file)
+            output_rows = self.load_chunks_to_database(processed_chunks, output_table)
+            imputer_file = self._save_imputer(output_table, stats.knn_imputer)
+            
+            execution_time = (datetime.now() - pipeline_start).total_seconds()
+            summary = {
+                'status': 'success',
+                'execution_time_seconds': execution_time,
+                'start_time': pipeline_start.isoformat(),
+                'end_time': datetime.now().isoformat(),
+                'input_rows': counts['input_rows'],
+                'output_rows': output_rows,
+                'chunk_size': self.config.batch_size,
+                'steps_executed': len(self.execution_log),
+                'output_table': output_table,
+                'backup_file': str(backup_file),
+                'imputer_file': str(imputer_file) if imputer_file else None
+            }
+            
+            logger.info(f"=== PIPELINE ETL (chunks) TERMINÉ - {execution_time:.2f}s ===")
+            logger.info(f"Données traitées: {counts['input_rows']} → {output_rows} lignes")
+            
+            return summary
+            
+        except Exception as e:
+            logger.error(f"=== ÉCHEC PIPELINE ETL: {e} ===")
+            raise Exception(f"Pipeline ETL échoué: {e}")
+        
+        finally:
+            self.data_processor.reset_statistics()
+    
+    def _run_incremental_pipeline(self, source_type: str, output_table: str,
+                                  pipeline_start: datetime) -> Dict:
+        """Pipeline ETL incrémental (type CDC) par ``employee_id``.
+        
+        - Point de reprise (table ``etl_watermarks``) : mtime et taille des
+          fichiers CSV (rien n'est relu s'ils n'ont pas changé), ou date de
+          la dernière évaluation extraite en base (seules les évaluations
+          plus récentes sont lues).
+        - Empreinte du contenu de chaque ligne source par ``employee_id``
+          (table ``{output_table}_row_hashes``) : seules les lignes nouvelles
+          ou modifiées sont transformées, puis upsertées
+          (``INSERT ... ON CONFLICT``). En CSV, les employés disparus de la
+          source sont supprimés.
+        - Les transformations utilisent les statistiques globales figées lors
+          de la dernière reconstruction complète
+          (``{output_table}_statistics.joblib``), pour que les lignes
+          recalculées restent cohérentes avec les autres.
+        
+        Sans état, sans table de sortie ou sans statistiques, une
+        reconstruction complète est faite et initialise l'état.
+        """
+        stats_path = self.config.processed_data_path / f"{output_table}_statistics.joblib"
+        hashes_table = f"{output_table}_row_hashes"
+        
+        try:
+            ETL_WATERMARKS.create(self.engine, checkfirst=True)
+            state = self._load_watermark(output_table)
+            inspector = sa.inspect(self.engine)
+            full_refresh = (
+                state is None or state['source_type'] != source_type or not stats_path.exists()
+                or not inspector.has_table(output_table) or not inspector.has_table(hashes_table)
+            )
+            
+            file_source = source_type in FILE_SOURCE_TYPES
+            file_watermark = self._source_files_watermark(source_type) if file_source else None
+            if not full_refresh and file_source and file_watermark == state['watermark']:
+                logger.info("Sources fichier inchangées depuis le dernier passage")
+                self._log_step("detect_changes", "success", {'changed_rows': 0, 'sources_unchanged': True})
+                return self._incremental_summary(pipeline_start, output_table, False, 0, 0, 0, 0)
+            
+            if full_refresh:
+                logger.info("Pas d'état incrémental exploitable : reconstruction complète")
+                stats = self.data_processor.fit_statistics(
+                    lambda: self._drop_seen_duplicates(self.iter_hr_data_chunks(source_type))
+                )
+                self.config.processed_data_path.mkdir(parents=True, exist_ok=True)
+                joblib.dump(stats, stats_path)
+                self._save_imputer(output_table, stats.knn_imputer)
+                stored_hashes = {}
+                raw_chunks = self.iter_hr_data_chunks(source_type)
+            else:
+                self.data_processor.statistics = joblib.load(stats_path)
+                stored_hashes = self._load_row_hashes(hashes_table)
+                since = state['watermark'] if source_type == "database" else None
+                raw_chunks = self.iter_hr_data_chunks(source_type, since=since)
+            
+            tracking = {'input_rows': 0, 'seen': set(), 'hashes': {}, 'max_assessment_date': None,
+                        'id_dtype': None}
+            
+            def changed_rows(chunks):
+                """Ne laisser passer que les lignes nouvelles ou modifiées."""
+                for chunk in chunks:
+                    tracking['input_rows'] += len(chunk)
+                    tracking['id_dtype'] = chunk['employee_id'].dtype
+                    # Clés en texte, comme dans la table d'empreintes (identifiants entiers compris)
+                    ids = [str(eid) for eid in chunk['employee_id'].tolist()]
+                    hashes = content_hashes(chunk).tolist()
+                    tracking['seen'].update(ids)
+                    if 'assessment_date' in chunk.columns:
+                        dates = chunk['assessment_date'].dropna().astype(str)
+                        if len(dates):
+                            latest = dates.max()
+                            if tracking['max_assessment_date'] is None or latest > tracking['max_assessment_date']:
+                                tracking['max_assessment_date'] = latest
+                    
+                    mask = [stored_hashes.get(eid) != h for eid, h in zip(ids, hashes)]
+                    for eid, h, is_changed in zip(ids, hashes, mask):
+                        if is_changed:
+                            tracking['hashes'][eid] = h
+                    yield chunk[mask]
+            
+            transformed = self.transform_chunks(changed_rows(self._drop_seen_duplicates(raw_chunks)))
+            deleted_rows = 0
+            if full_refresh:
+                output_rows = self.load_chunks_to_database(transformed, output_table)
+                ensure_unique_index(self.engine, output_table, ['employee_id'])
+            else:
+                output_rows = 0
+                for chunk in transformed:
+                    output_rows += upsert_rows(self.engine, chunk, output_table, ['employee_id'],
+                                               self.config.batch_size)
+                if file_source:
+                    removed = [eid for eid in stored_hashes if eid not in tracking['seen']]
+                    if removed:
+                        output_ids = removed
+                        if tracking['id_dtype'] is not None:
+                            output_ids = pd.Index(removed).astype(tracking['id_dtype']).tolist()
+                        deleted_rows = delete_rows(self.engine, output_table, 'employee_id', output_ids)
+                        delete_rows(self.engine, hashes_table, 'employee_id', removed)
+            
+            self._save_row_hashes(hashes_table, tracking['hashes'], replace=full_refresh)
+            if file_source:
+                watermark = file_watermark
+            else:
+                previous = None if full_refresh else state['watermark']
+                watermark = max(filter(None, [previous, tracking['max_assessment_date']]), default=None)
+            self._save_watermark(output_table, source_type, watermark)
+            
+            self._log_step("detect_changes", "success", {
+                'full_refresh': full_refresh,
+                'input_rows': tracking['input_rows'],
+                'changed_rows': len(tracking['hashes']),
+                'deleted_rows': deleted_rows,
+                'watermark': watermark
+            })
+            
+            return self._incremental_summary(pipeline_start, output_table, full_refresh,
+                                             tracking['input_rows'], len(tracking['hashes']),
+                                             output_rows, deleted_rows)
+            
+        except Exception as e:
+            logger.error(f"=== ÉCHEC PIPELINE ETL: {e} ===")
+            raise Exception(f"Pipeline ETL échoué: {e}")
+        finally:
+            self.data_processor.reset_statistics()
+    
+    def _incremental_summary(self, pipeline_start: datetime, output_table: str, full_refresh: bool,
+                             input_rows: int, changed_rows: int, output_rows: int,
+                             deleted_rows: int) -> Dict:
+        """Résumé d'une exécution incrémentale."""
+        execution_time = (datetime.now() - pipeline_start).total_seconds()
+        
+        logger.info(f"=== PIPELINE ETL (incrémental) TERMINÉ - {execution_time:.2f}s ===")
+        logger.info(f"Lignes modifiées: {changed_rows}/{input_rows}, supprimées: {deleted_rows}")
+        
+        return {
+            'status': 'success',
+            'mode': 'incremental',
+            'full_refresh': full_refresh,
+            'execution_time_seconds': execution_time,
+            'start_time': pipeline_start.isoformat(),
+            'end_time': datetime.now().isoformat(),
+            'input_rows': input_rows,
+            'changed_rows': changed_rows,
+            'output_rows': output_rows,
+            'deleted_rows': deleted_rows,
+            'steps_executed': len(self.execution_log),
+            'output_table': output_table
+        }
+    
+    def _save_imputer(self, output_table: str, imputer) -> Optional[Path]:
+        """Sauvegarder l'imputeur numérique ajusté (``{output_table}_imputer.joblib``).
+        
+        L'API le recharge avec ``joblib.load`` pour imputer à l'inférence
+        exactement comme l'ETL (``imputer.transform`` sur une ligne ou un lot).
+        """
+        if imputer is None:
+            return None
+        
+        self.config.processed_data_path.mkdir(parents=True, exist_ok=True)
+        imputer_path = self.config.processed_data_path / f"{output_table}_imputer.joblib"
+        joblib.dump(imputer, imputer_path)
+        
+        return imputer_path
+    
+    def _source_files_watermark(self, source_type: str) -> str:
+        """Point de reprise des sources fichier : mtime et taille de chaque fichier."""
+        files = {}
+        for name in (f"{source}.{source_type}" for source in HR_SOURCE_NAMES):
+            path = self.config.raw_data_path / name
+            if path.exists():
+                stat = path.stat()
+                files[name] = [stat.st_mtime_ns, stat.st_size]
+        
+        return json.dumps(files, sort_keys=True)
+    
+    def _load_watermark(self, output_table: str) -> Optional[Dict]:
+        """État incrémental enregistré pour ``output_table``."""
+        with self.engine.connect() as conn:
+            row = conn.execute(
+                ETL_WATERMARKS.select().where(ETL_WATERMARKS.c.output_table == output_table)
+            ).mappings().first()
+        
+        return dict(row) if row else None
+    
+    def _save_watermark(self, output_table: str, source_type: str, watermark: Optional[str]):
+        upsert_rows(self.engine, pd.DataFrame([{
+            'output_table': output_table,
+            'source_type': source_type,
+            'watermark': watermark,
+            'updated_at': datetime.now()
+        }]), ETL_WATERMARKS.name, ['output_table'])
+    
+    def _load_row_hashes(self, hashes_table: str) -> Dict[str, int]:
+        """Empreintes enregistrées, par ``employee_id`` (en texte)."""
+        with self.engine.connect() as conn:
+            rows = conn.exec_driver_sql(f'SELECT employee_id, row_hash FROM "{hashes_table}"')
+            return {str(eid): h for eid, h in rows.fetchall()}
+    
+    def _save_row_hashes(self, hashes_table: str, hashes: Dict[str, int], replace: bool):
+        """Enregistrer les empreintes des lignes modifiées (toutes si ``replace``)."""
+        table = sa.Table(
+            hashes_table, sa.MetaData(),
+            sa.Column('employee_id', sa.String(64), primary_key=True),
+            sa.Column('row_hash', sa.BigInteger, nullable=False)
+        )
+        if replace:
+            table.drop(self.engine, checkfirst=True)
+        table.create(self.engine, checkfirst=True)
+        
+        df = pd.DataFrame({'employee_id': [str(eid) for eid in hashes], 'row_hash': list(hashes.values())})
+        if replace:
+            self.bulk_loader.load(df, hashes_table, 'append')
+        elif len(df):
+            upsert_rows(self.engine, df, hashes_table, ['employee_id'], self.config.batch_size)
+    
+    def _write_csv_chunks(self, chunks: Iterable[pd.DataFrame],
+                          file_path: Path) -> Iterator[pd.DataFrame]:
+        """Écrire chaque chunk dans un CSV au passage, sans le retenir."""
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        with CsvChecksumWriter(file_path) as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+                yield chunk
+        writer.verify(self.config.paranoid_verification)
+        
+        self._log_step("load_csv", "success", {
+            'file_path': str(file_path),
+            'rows_saved': writer.rows,
+            'bytes_written': writer.bytes,
+            'checksum': writer.checksum
+        })
+        logger.info(f"Sauvegarde CSV réussie: {writer.rows} lignes dans {file_path}")
+    
+    def _write_parquet_chunks(self, chunks: Iterable[pd.DataFrame], file_path: Path,
+                              run_start: datetime) -> Iterator[pd.DataFrame]:
+        """Écrire chaque chunk dans un fichier ou dataset Parquet au passage."""
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        writer = None
+        
+        try:
+            for chunk in chunks:
+                partitioned, partition_cols = self._with_partitions(chunk, run_start)
+                if writer is None:
+                    writer = ParquetChunkWriter(file_path, partition_cols, self.config.parquet_compression)
+                writer.write(partitioned)
+                yield chunk
+        finally:
+            if writer is not None:
+                writer.close()
+        
+        if writer is None:
+            return
+        writer.verify(self.config.paranoid_verification)
+        
+        self._log_step("load_parquet", "success", {
+            'file_path': str(file_path),
+            'rows_saved': writer.rows,
+            'bytes_written': writer.bytes,
+            'files': len(writer.files),
+            'partition_cols': writer.partition_cols
+        })
+        logger.info(f"Sauvegarde Parquet réussie: {writer.rows} lignes dans {file_path}")
+    
+    def _prepare_output_path(self, output_table: str, run_start: datetime) -> Path:
+        """Fichier de sortie d'un run selon ``output_format``.
+        
+        En Parquet partitionné, la racine du dataset est commune à tous les
+        runs ; la partition ``run_date`` du jour est remplacée si le
+        pipeline est relancé le même jour.
+        """
+        stamp = run_start.strftime('%Y%m%d_%H%M%S')
+        
+        if self.config.output_format == "csv":
+            return self.config.processed_data_path / f"{output_table}_{stamp}.csv"
+        if self.config.output_format != "parquet":
+            raise ValueError(f"Format de sortie non supporté: {self.config.output_format}")
+        
+        if not self.config.parquet_partition_cols:
+            return self.config.processed_data_path / f"{output_table}_{stamp}.parquet"
+        
+        dataset_path = self.config.processed_data_path / output_table
+        if "run_date" in self.config.parquet_partition_cols:
+            shutil.rmtree(dataset_path / f"run_date={run_start.date().isoformat()}", ignore_errors=True)
+        
+        return dataset_path
+    
+    def _with_partitions(self, df: pd.DataFrame,
+                         run_start: datetime) -> Tuple[pd.DataFrame, List[str]]:
+        """Colonnes de partitionnement présentes (``run_date`` ajoutée)."""
+        partition_cols = [
+            col for col in self.config.parquet_partition_cols
+            if col == "run_date" or col in df.columns
+        ]
+        if "run_date" in partition_cols:
+            df = df.assign(run_date=run_start.date().isoformat())
+        
+        return df, partition_cols
+    
+    def _build_lookup_table(self, lookup_conn: sqlite3.Connection, name: str,
+                            file_path: Path, chunksize: int) -> Dict[str, str]:
+        """Verser un fichier source dans une table de lookup indexée sur employee_id.
+        
+        Renvoie les dtypes du premier chunk, réappliqués à la relecture.
+        """
+        dtypes = None
+        for chunk in self.iter_file_chunks(file_path, chunksize):
+            if dtypes is None:
+                dtypes = chunk.dtypes.astype(str).to_dict()
+            chunk.to_sql(name, lookup_conn, if_exists='append', index=False)
+        
+        lookup_conn.execute(f"CREATE INDEX idx_{name}_employee_id ON {name} (employee_id)")
+        lookup_conn.commit()
+        
+        return dtypes or {}
+    
+    def _lookup_rows(self, lookup_conn: sqlite3.Connection, name: str,
+                     dtypes: Dict[str, str], employee_ids: pd.Series) -> pd.DataFrame:
+        """Lignes d'une table de lookup pour un chunk d'employee_id."""
+        ids = employee_ids.dropna().unique().tolist()
+        
+        # Par paquets : SQLite limite le nombre de paramètres par requête
+        parts = []
+        for start in range(0, max(len(ids), 1), SQLITE_MAX_PARAMS):
+            batch = ids[start:start + SQLITE_MAX_PARAMS]
+            placeholders = ", ".join("?" * len(batch)) or "NULL"
+            parts.append(pd.read_sql(
+                f"SELECT rowid AS _rowid, * FROM {name} WHERE employee_id IN ({placeholders})",
+                lookup_conn, params=batch
+            ))
+        rows = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+        rows = rows.sort_values('_rowid', kind='stable').drop(columns='_rowid').reset_index(drop=True)
+        
+        for col, dtype in dtypes.items():
+            if col in rows.columns and str(rows[col].dtype) != dtype:
+                try:
+                    rows[col] = rows[col].astype(dtype)
+                except (TypeError, ValueError):
+                    # Ex. entiers avec valeurs manquantes dans ce chunk
+                    pass
+        
+        return rows
+    
     def _validate_transformed_data(self, df: pd.DataFrame):
         """Valider les données transformées."""
         
@@ -352,15 +1359,56 @@ class UbisoftETLPipeline:
         if missing_pct > 20:  # Plus de 20% de valeurs manquantes
             logger.warning(f"Pourcentage élevé de valeurs manquantes: {missing_pct:.1f}%")
     
+    def _verify_table_count(self, table_name: str, expected_rows: int):
+        """Recompter la table chargée (mode ``paranoid_verification`` seulement)."""
+        if not self.config.paranoid_verification:
+            return
+        
+        result = pd.read_sql(f"SELECT COUNT(*) as count FROM {table_name}", self.engine)
+        loaded_count = result.iloc[0]['count']
+        if loaded_count != expected_rows:
+            raise ValueError(f"Nombre de lignes incohérent: {loaded_count} vs {expected_rows}")
+    
+    def _staging_table_name(self, table_name: str) -> str:
+        """Nom unique de la table de staging d'un chargement."""
+        return f"{table_name}_staging_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+    
+    def _publish_staging_table(self, staging_table: str, table_name: str) -> Dict:
+        """Indexer la table de staging puis l'échanger avec ``table_name``.
+        
+        La table remplacée est conservée sous ``{table_name}_previous`` si
+        ``backup_enabled`` (renommage, sans copie des lignes).
+        """
+        start = datetime.now()
+        indexes = create_indexes(self.engine, staging_table, self.config.index_columns)
+        previous_table = f"{table_name}_previous" if self.config.backup_enabled else None
+        swap_table(self.engine, staging_table, table_name, previous_table)
+        
+        logger.info(f"Table {staging_table} publiée sous {table_name}")
+        
+        return {
+            'staging_table': staging_table,
+            'previous_table': previous_table,
+            'indexes': indexes,
+            'swap_seconds': (datetime.now() - start).total_seconds()
+        }
+    
+    def _drop_staging_table(self, staging_table: str):
+        """Supprimer une table de staging abandonnée."""
+        try:
+            drop_table(self.engine, staging_table)
+        except Exception as e:
+            logger.warning(f"Impossible de supprimer la table de staging {staging_table}: {e}")
+    
+    @profiled
     def _backup_table(self, table_name: str):
-        """Créer un backup de la table."""
+        """Créer un backup de la table (mode sans staging)."""
         try:
             backup_table = f"{table_name}_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
             
-            with self.engine.connect() as conn:
-                # Vérifier si la table existe
-                result = conn.execute(text(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{table_name}'"))
-                if result.fetchone():
+            # Vérifier si la table existe (quel que soit le dialecte)
+            if sa.inspect(self.engine).has_table(table_name):
+                with self.engine.begin() as conn:
                     # Créer le backup
                     conn.execute(text(f"CREATE TABLE {backup_table} AS SELECT * FROM {table_name}"))
                     logger.info(f"Backup table créé: {backup_table}")
@@ -401,11 +1449,38 @@ class UbisoftETLPipeline:
             'successful_steps': len([step for step in self.execution_log if step['status'] == 'success']),
             'failed_steps': len([step for step in self.execution_log if step['status'] == 'error']),
             'last_execution': self.execution_log[-1] if self.execution_log else None,
-            'execution_log': self.execution_log
+            'execution_log': self.execution_log,
+            'stages': self.profiler.as_dict() if self.profiler is not None else []
         }
+    
+    def get_prometheus_metrics(self) -> str:
+        """Mesures des étapes au format texte Prometheus."""
+        return self.profiler.to_prometheus() if self.profiler is not None else ""
+
+# Pipeline de chaque processus du pool de transformation parallèle
+_worker_pipeline: Optional[UbisoftETLPipeline] = None
+
+def _init_transform_worker(config: ETLConfig, statistics: FittedStatistics):
+    """Initialiser un processus du pool avec les statistiques figées."""
+    global _worker_pipeline
+    _worker_pipeline = UbisoftETLPipeline(replace(config, database_url="sqlite://", profiling=False))
+    _worker_pipeline.data_processor.statistics = statistics
 
-def run_daily_etl():
-    """Fonction pour exécution quotidienne du pipeline ETL."""
+def _prepare_partition(df: pd.DataFrame) -> pd.DataFrame:
+    """Étapes 1 à 4 de la transformation pour une partition."""
+    return _worker_pipeline._prepare_frame(df)
+
+def run_daily_etl(profile: bool = False, prometheus_file: Optional[Path] = None,
+                  profile_memory: Optional[bool] = None):
+    """Fonction pour exécution quotidienne du pipeline ETL.
+    
+    ``profile`` journalise le résumé des étapes en fin d'exécution (même en
+    cas d'échec) ; ``prometheus_file`` y écrit les mesures au format texte
+    Prometheus (collecteur textfile de node_exporter). ``profile_memory``
+    fixe ``ETLConfig.profile_memory`` (None : variable ``ETL_PROFILE_MEMORY``).
+    """
+    if profile_memory is None:
+        profile_memory = os.getenv("ETL_PROFILE_MEMORY", "false").lower() == "true"
     
     # Configuration
     config = ETLConfig(
@@ -414,7 +1489,15 @@ def run_daily_etl():
         processed_data_path=Path("data/processed"),
         batch_size=1000,
         validation_threshold=0.8,
-        backup_enabled=True
+        backup_enabled=True,
+        chunked=os.getenv("ETL_CHUNKED", "false").lower() == "true",
+        incremental=os.getenv("ETL_INCREMENTAL", "false").lower() == "true",
+        paranoid_verification=os.getenv("ETL_PARANOID_VERIFICATION", "false").lower() == "true",
+        output_format=os.getenv("ETL_OUTPUT_FORMAT", "csv"),
+        parallel_db_extraction=os.getenv("ETL_PARALLEL_DB_EXTRACTION", "false").lower() == "true",
+        transform_workers=int(os.getenv("ETL_TRANSFORM_WORKERS", "1")),
+        profile_memory=profile_memory,
+        outlier_method=os.getenv("ETL_OUTLIER_METHOD", "iqr")
     )
     
     # Initialiser et lancer le pipeline
@@ -432,8 +1515,25 @@ def run_daily_etl():
     except Exception as e:
         logger.error(f"Échec ETL quotidien: {e}")
         raise
+    
+    finally:
+        if profile:
+            logger.info(f"Profil des étapes:\n{pipeline.profiler.format_summary()}")
+        if prometheus_file is not None:
+            Path(prometheus_file).write_text(pipeline.get_prometheus_metrics(), encoding='utf-8')
 
 if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="ETL quotidien Ubisoft People Analytics")
+    parser.add_argument("--profile", action="store_true",
+                        help="afficher le profil des étapes (durées, lignes, mémoire) en fin d'exécution")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="mesurer aussi le pic d'allocation et la taille des DataFrames (plus lent)")
+    parser.add_argument("--prometheus-file", type=Path, default=None,
+                        help="écrire les mesures des étapes au format texte Prometheus")
+    args = parser.parse_args()
+    
     # Configuration logging
     logging.basicConfig(
         level=logging.INFO,
@@ -441,5 +1541,9 @@ if __name__ == "__main__":
     )
     
     # Lancer ETL
-    result = run_daily_etl()
+    result = run_daily_etl(
+        profile=args.profile or args.profile_memory,
+        prometheus_file=args.prometheus_file,
+        profile_memory=args.profile_memory or None
+    )
     print(f"Pipeline terminé: {result['status']}")
@@ -0,0 +1,326 @@
+"""
+Moteur d'inférence compilé pour les forêts aléatoires.
+
+Les arbres d'une forêt scikit-learn sont aplatis dans des tableaux NumPy
+contigus (feature, seuil, enfants, valeurs des feuilles) et parcourus
+niveau par niveau pour tous les arbres et toutes les lignes à la fois.
+Les probabilités produites sont identiques bit à bit à ``predict_proba``.
+
+Le parcours vectorisé est surtout rentable pour les petits batchs servis
+par l'API ; au-delà de ``fallback_min_rows`` lignes, le modèle d'origine
+(s'il est disponible) reprend la main.
+
+Les tableaux peuvent être sauvegardés en fichiers ``.npy`` à côté de
+``random_forest.pkl`` puis ouverts avec ``np.load(mmap_mode="r")`` : tous
+les workers partagent alors les mêmes pages via le cache du système. Une
+forêt ainsi ouverte n'a pas de modèle de repli : charger le pickle dans
+chaque worker annulerait ce partage.
+"""
+
+import logging
+import shutil
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import joblib
+import numpy as np
+
+from src.config import COMPILED_FALLBACK_ROWS
+
+logger = logging.getLogger(__name__)
+
+# Artefact .npy : sous-dossier du modèle et version du format
+FOREST_ARTIFACT_DIR = "forest"
+FOREST_ARTIFACT_VERSION = 1
+FOREST_ARRAYS = ('feature', 'threshold', 'children', 'missing_go_to_left', 'value', 'roots')
+
+class CompiledForest:
+    """Forêt de classification aplatie en tableaux contigus."""
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray,
+                 children: np.ndarray, missing_go_to_left: np.ndarray,
+                 value: np.ndarray, roots: np.ndarray, classes: np.ndarray,
+                 max_depth: int, n_features_in: int,
+                 feature_importances: Optional[np.ndarray] = None,
+                 chunk_size: int = 1024, fallback: Any = None,
+                 fallback_min_rows: Optional[int] = None):
+        self.feature = feature
+        self.threshold = threshold
+        # children[noeud] = (enfant droit, enfant gauche), indexé par "va à gauche"
+        self.children = children
+        self.missing_go_to_left = missing_go_to_left
+        self.value = value
+        self.roots = roots
+        self.classes_ = classes
+        self.max_depth = int(max_depth)
+        self.n_features_in_ = int(n_features_in)
+        self.chunk_size = chunk_size
+        self.fallback = fallback
+        self.fallback_min_rows = fallback_min_rows
+
+        if feature_importances is not None:
+            self.feature_importances_ = feature_importances
+
+        self.n_estimators = len(roots)
+        self.n_classes_ = len(classes)
+        self._has_missing_routing = bool(missing_go_to_left.any())
+        # Vue plate, sans copie même sur un tableau mappé en mémoire
+        self._children_flat = children.reshape(-1)
+
+    @property
+    def children_left(self) -> np.ndarray:
+        return self.children[:, 1]
+
+    @property
+    def children_right(self) -> np.ndarray:
+        return self.children[:, 0]
+
+    @classmethod
+    def from_sklearn(cls, model: Any, chunk_size: int = 1024,
+                     fallback_min_rows: Optional[int] = None) -> "CompiledForest":
+        """Compiler une forêt scikit-learn (RandomForest/ExtraTrees classifier).
+
+        Si ``fallback_min_rows`` est fourni, ``model`` est conservé et utilisé
+        pour les batchs d'au moins ``fallback_min_rows`` lignes.
+        """
+        estimators = getattr(model, 'estimators_', None)
+        if not estimators or not hasattr(model, 'classes_'):
+            raise ValueError(f"Modèle non compilable: {type(model).__name__}")
+        if getattr(model, 'n_outputs_', 1) != 1:
+            raise ValueError("Seuls les modèles mono-sortie sont compilables")
+
+        n_classes = len(model.classes_)
+        features, thresholds, children, missing, values, roots = [], [], [], [], [], []
+        max_depth = 0
+        offset = 0
+
+        for estimator in estimators:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(offset, offset + n_nodes)
+            is_leaf = tree.children_left == -1
+
+            # Une feuille pointe sur elle-même : le parcours y reste stable
+            children.append(np.column_stack([
+                np.where(is_leaf, node_ids, tree.children_right + offset),
+                np.where(is_leaf, node_ids, tree.children_left + offset)
+            ]))
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(tree.threshold)
+            missing.append(
+                np.asarray(getattr(tree, 'missing_go_to_left', np.zeros(n_nodes)), dtype=bool)
+                & ~is_leaf
+            )
+
+            # Même normalisation que DecisionTreeClassifier.predict_proba
+            proba = tree.value[:, 0, :n_classes].copy()
+            normalizer = proba.sum(axis=1)[:, np.newaxis]
+            normalizer[normalizer == 0.0] = 1.0
+            proba /= normalizer
+            values.append(proba)
+
+            roots.append(offset)
+            max_depth = max(max_depth, tree.max_depth)
+            offset += n_nodes
+
+        compiled = cls(
+            feature=np.ascontiguousarray(np.concatenate(features), dtype=np.intp),
+            threshold=np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64),
+            children=np.ascontiguousarray(np.concatenate(children), dtype=np.intp),
+            missing_go_to_left=np.ascontiguousarray(np.concatenate(missing), dtype=bool),
+            value=np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+            roots=np.asarray(roots, dtype=np.intp),
+            classes=np.asarray(model.classes_),
+            max_depth=max_depth,
+            n_features_in=model.n_features_in_,
+            feature_importances=getattr(model, 'feature_importances_', None),
+            chunk_size=chunk_size,
+            fallback=model if fallback_min_rows is not None else None,
+            fallback_min_rows=fallback_min_rows
+        )
+
+        logger.info(f"Forêt compilée: {compiled.n_estimators} arbres, {offset} noeuds")
+
+        return compiled
+
+    def save(self, output_dir: Path) -> Dict[str, Any]:
+        """Écrire les tableaux en ``.npy`` dans ``output_dir/forest``.
+
+        Les fichiers sont écrits dans un dossier temporaire puis échangés par
+        renommage : un worker qui mappe encore l'ancienne version n'est
+        jamais exposé à un fichier tronqué. Renvoie la description de
+        l'artefact à stocker dans ``model_metadata.json``.
+        """
+        output_dir = Path(output_dir)
+        target_dir = output_dir / FOREST_ARTIFACT_DIR
+        suffix = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        tmp_dir = output_dir / f".{FOREST_ARTIFACT_DIR}.tmp-{suffix}"
+        tmp_dir.mkdir(parents=True)
+
+        arrays = {name: getattr(self, name) for name in FOREST_ARRAYS}
+        if hasattr(self, 'feature_importances_'):
+            arrays['feature_importances'] = np.asarray(self.feature_importances_)
+
+        for name, array in arrays.items():
+            np.save(tmp_dir / f"{name}.npy", np.ascontiguousarray(array), allow_pickle=False)
+
+        if target_dir.exists():
+            old_dir = output_dir / f".{FOREST_ARTIFACT_DIR}.old-{suffix}"
+            target_dir.rename(old_dir)
+            tmp_dir.rename(target_dir)
+            shutil.rmtree(old_dir, ignore_errors=True)
+        else:
+            tmp_dir.rename(target_dir)
+
+        logger.info(f"Artefact forêt écrit dans {target_dir}")
+
+        return {
+            'format_version': FOREST_ARTIFACT_VERSION,
+            'directory': FOREST_ARTIFACT_DIR,
+            'n_estimators': self.n_estimators,
+            'max_depth': self.max_depth,
+            'n_features': self.n_features_in_,
+            'classes': self.classes_.tolist(),
+            'arrays': {
+                name: {'dtype': str(array.dtype), 'shape': list(array.shape)}
+                for name, array in arrays.items()
+            }
+        }
+
+    @classmethod
+    def load(cls, model_dir: Path, artifact: Dict[str, Any],
+             mmap_mode: Optional[str] = 'r') -> "CompiledForest":
+        """Ouvrir un artefact ``.npy`` (mappé en mémoire par défaut).
+
+        Sans modèle de repli : tous les batchs passent par les tableaux
+        partagés, de la version décrite par ``artifact``.
+        """
+        if artifact.get('format_version') != FOREST_ARTIFACT_VERSION:
+            raise ValueError(f"Version d'artefact non supportée: {artifact.get('format_version')}")
+
+        artifact_dir = Path(model_dir) / artifact.get('directory', FOREST_ARTIFACT_DIR)
+        arrays = {}
+        for name, spec in artifact['arrays'].items():
+            array = np.load(artifact_dir / f"{name}.npy", mmap_mode=mmap_mode, allow_pickle=False)
+            if list(array.shape) != spec['shape'] or str(array.dtype) != spec['dtype']:
+                raise ValueError(f"Artefact incohérent pour {name}: {array.dtype}{array.shape}")
+            arrays[name] = array
+
+        compiled = cls(
+            **{name: arrays[name] for name in FOREST_ARRAYS},
+            classes=np.asarray(artifact['classes']),
+            max_depth=artifact['max_depth'],
+            n_features_in=artifact['n_features'],
+            feature_importances=arrays.get('feature_importances')
+        )
+
+        logger.info(f"Artefact forêt ouvert depuis {artifact_dir} (mmap_mode={mmap_mode})")
+
+        return compiled
+
+    def predict_proba(self, X: Any) -> np.ndarray:
+        """Probabilités par classe, identiques à celles de scikit-learn."""
+        if self.fallback is not None and self.fallback_min_rows is not None and len(X) >= self.fallback_min_rows:
+            return self.fallback.predict_proba(X)
+
+        # scikit-learn évalue les arbres sur des float32
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"{self.n_features_in_} features attendues, reçu la forme {X.shape}"
+            )
+
+        probabilities = np.empty((len(X), self.n_classes_), dtype=np.float64)
+        for start in range(0, len(X), self.chunk_size):
+            chunk = X[start:start + self.chunk_size]
+            probabilities[start:start + len(chunk)] = self._predict_chunk(chunk)
+
+        return probabilities
+
+    def predict(self, X: Any) -> np.ndarray:
+        """Classes prédites."""
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+    def get_info(self) -> Dict[str, Any]:
+        """Description du moteur compilé."""
+        return {
+            'engine': 'compiled',
+            'memory_mapped': isinstance(self.value, np.memmap),
+            'n_estimators': self.n_estimators,
+            'n_nodes': len(self.feature),
+            'max_depth': self.max_depth,
+            'n_features': self.n_features_in_,
+            'n_classes': self.n_classes_,
+            'fallback_min_rows': self.fallback_min_rows
+        }
+
+    def _predict_chunk(self, X: np.ndarray) -> np.ndarray:
+        """Parcours niveau par niveau de tous les arbres pour un chunk."""
+        n_rows, n_features = X.shape
+        X_flat = X.ravel()
+
+        # Un curseur par couple (ligne, arbre), en indices plats
+        row_offsets = np.repeat(np.arange(n_rows, dtype=np.intp) * n_features, self.n_estimators)
+        nodes = np.tile(self.roots, n_rows)
+
+        for _ in range(self.max_depth):
+            x = X_flat.take(row_offsets + self.feature.take(nodes))
+            go_left = x <= self.threshold.take(nodes)
+            if self._has_missing_routing:
+                go_left |= np.isnan(x) & self.missing_go_to_left.take(nodes)
+            nodes = self._children_flat.take(2 * nodes + go_left)
+
+        # Accumulation séquentielle arbre par arbre, comme scikit-learn
+        leaf_values = self.value.take(nodes, axis=0).reshape(n_rows, self.n_estimators, -1)
+        return np.cumsum(leaf_values, axis=1)[:, -1] / self.n_estimators
+
+def compile_model(model: Any, engine: str = 'sklearn',
+                  fallback_min_rows: Optional[int] = COMPILED_FALLBACK_ROWS) -> Optional[CompiledForest]:
+    """Compiler ``model`` si ``engine == 'compiled'`` et s'il est compatible."""
+    if engine in ('sklearn', 'auto'):
+        return None
+    if engine != 'compiled':
+        raise ValueError(f"Moteur d'inférence non supporté: {engine}")
+
+    try:
+        return CompiledForest.from_sklearn(model, fallback_min_rows=fallback_min_rows)
+    except ValueError as e:
+        logger.warning(f"Compilation impossible, moteur sklearn conservé: {e}")
+        return None
+
+def save_forest_artifact(model: Any, output_dir: Path) -> Optional[Dict[str, Any]]:
+    """Écrire l'artefact ``.npy`` d'un modèle s'il est compilable."""
+    try:
+        compiled = CompiledForest.from_sklearn(model)
+    except ValueError as e:
+        logger.info(f"Pas d'artefact forêt pour ce modèle: {e}")
+        return None
+
+    return compiled.save(output_dir)
+
+def load_forest_model(model_dir: Path, metadata: Optional[Dict[str, Any]] = None,
+                      engine: str = 'auto') -> Any:
+    """Charger le modèle de prédiction d'un dossier de modèle.
+
+    - ``auto`` : artefact ``.npy`` mappé s'il existe, sinon le pickle ;
+    - ``compiled`` : artefact s'il existe, sinon pickle compilé au chargement ;
+    - ``sklearn`` : toujours le pickle.
+    """
+    if engine not in ('auto', 'compiled', 'sklearn'):
+        raise ValueError(f"Moteur d'inférence non supporté: {engine}")
+
+    model_dir = Path(model_dir)
+    pickle_path = model_dir / "random_forest.pkl"
+    artifact = (metadata or {}).get('compiled_forest')
+
+    if engine != 'sklearn' and artifact:
+        try:
+            return CompiledForest.load(model_dir, artifact)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Artefact forêt inutilisable, chargement du pickle: {e}")
+
+    model = joblib.load(pickle_path)
+    compiled = compile_model(model, engine)
+
+    return compiled if compiled is not None else model
@@ -0,0 +1,558 @@
+"""
+Chargement en masse des DataFrames dans la base de données.
+
+Stratégies sélectionnées selon le dialecte SQLAlchemy :
+
+- PostgreSQL : ``COPY ... FROM STDIN`` alimenté par un flux CSV généré à
+  la volée, sans fichier intermédiaire ;
+- SQLite : ``executemany`` dans une seule transaction, pragmas ajustés ;
+- autres bases : ``DataFrame.to_sql(method='multi')`` par batch.
+
+Dans tous les cas le schéma de la table est créé par pandas à partir d'un
+DataFrame vide, pour garder les mêmes types de colonnes qu'avec ``to_sql``.
+
+Le nombre de lignes renvoyé par ``load`` est celui rapporté par le driver
+(``rowcount``) : il sert de vérification sans relire la table.
+``CsvChecksumWriter`` écrit les fichiers CSV en calculant au passage le
+nombre de lignes, la taille et une empreinte du contenu ;
+``ParquetChunkWriter`` écrit des fichiers (ou datasets partitionnés)
+Parquet au schéma figé par le premier DataFrame.
+
+``create_indexes`` et ``swap_table`` publient une table de staging
+complète par renommage, dans une seule transaction. ``upsert_rows`` met à
+jour des lignes par clé (``INSERT ... ON CONFLICT``) pour les chargements
+incrémentaux.
+"""
+
+import csv
+import hashlib
+import io
+import logging
+import uuid
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import quote
+from typing import Dict, Iterator, List, Optional, Sequence, Type, Union
+
+import pandas as pd
+import sqlalchemy as sa
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+class BulkLoader:
+    """Stratégie de chargement par défaut : ``to_sql`` par batch."""
+
+    name = "to_sql"
+
+    def __init__(self, engine: sa.engine.Engine, batch_size: int = 1000):
+        self.engine = engine
+        self.batch_size = batch_size
+
+    def load(self, df: pd.DataFrame, table_name: str, if_exists: str = 'append') -> int:
+        """Charger ``df`` dans ``table_name``.
+
+        Renvoie le nombre de lignes écrites selon le driver, ou ``len(df)``
+        si le driver ne le rapporte pas.
+        """
+        if if_exists not in ('append', 'replace', 'fail'):
+            raise ValueError(f"if_exists non supporté: {if_exists}")
+
+        self.create_table(df, table_name, if_exists)
+        if not len(df):
+            return 0
+
+        reported = self._insert(df, table_name)
+        if reported is None or reported < 0:
+            logger.debug(f"Nombre de lignes non rapporté par le driver ({self.name})")
+            return len(df)
+
+        return reported
+
+    def create_table(self, df: pd.DataFrame, table_name: str, if_exists: str):
+        """Créer (ou recréer) la table avec les types déduits par pandas."""
+        df.head(0).to_sql(table_name, self.engine, if_exists=if_exists, index=False)
+
+    def _insert(self, df: pd.DataFrame, table_name: str) -> Optional[int]:
+        """Insérer les lignes ; renvoie le total rapporté par le driver."""
+        reported = 0
+        for start in range(0, len(df), self.batch_size):
+            rowcount = df.iloc[start:start + self.batch_size].to_sql(
+                table_name, self.engine, if_exists='append', index=False, method='multi'
+            )
+            if rowcount is None:
+                reported = None
+            elif reported is not None:
+                reported += rowcount
+
+        return reported
+
+    def _batches(self, df: pd.DataFrame) -> Iterator[pd.DataFrame]:
+        for start in range(0, len(df), self.batch_size):
+            yield df.iloc[start:start + self.batch_size]
+
+class SQLiteBulkLoader(BulkLoader):
+    """``executemany`` dans une transaction unique, journalisation allégée.
+
+    ``synchronous = OFF`` est restauré après le chargement : une coupure
+    pendant la transaction peut perdre le lot en cours, pas corrompre la
+    base (le journal de rollback reste actif).
+    """
+
+    name = "sqlite_executemany"
+
+    PRAGMAS = {
+        'synchronous': 'OFF',
+        'temp_store': 'MEMORY',
+        'cache_size': '-65536'  # 64 MB
+    }
+
+    def _insert(self, df: pd.DataFrame, table_name: str) -> Optional[int]:
+        columns = ", ".join(_quote(col) for col in df.columns)
+        placeholders = ", ".join("?" * len(df.columns))
+        statement = f"INSERT INTO {_quote(table_name)} ({columns}) VALUES ({placeholders})"
+
+        raw = self.engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            previous = {
+                pragma: cursor.execute(f"PRAGMA {pragma}").fetchone()[0]
+                for pragma in self.PRAGMAS
+            }
+            for pragma, value in self.PRAGMAS.items():
+                cursor.execute(f"PRAGMA {pragma} = {value}")
+
+            reported = 0
+            try:
+                for batch in self._batches(df):
+                    cursor.executemany(statement, _python_rows(batch))
+                    # executemany : somme des lignes insérées par le lot
+                    reported += cursor.rowcount
+                raw.commit()
+            except Exception:
+                raw.rollback()
+                raise
+            finally:
+                for pragma, value in previous.items():
+                    cursor.execute(f"PRAGMA {pragma} = {value}")
+        finally:
+            raw.close()
+
+        return reported
+
+class PostgresCopyLoader(BulkLoader):
+    """``COPY FROM STDIN`` (format CSV) alimenté par un flux en mémoire.
+
+    Le CSV est produit batch par batch à mesure que le serveur le lit :
+    seul un batch est sérialisé à la fois. Les chaînes vides sont
+    chargées comme NULL (convention du format CSV de COPY).
+    """
+
+    name = "postgres_copy"
+
+    def _insert(self, df: pd.DataFrame, table_name: str) -> Optional[int]:
+        columns = ", ".join(_quote(col) for col in df.columns)
+        statement = f"COPY {_quote(table_name)} ({columns}) FROM STDIN WITH (FORMAT csv)"
+
+        raw = self.engine.raw_connection()
+        try:
+            cursor = raw.cursor()
+            try:
+                cursor.copy_expert(statement, CsvStream(self._batches(df)))
+                # Étiquette de commande "COPY n"
+                reported = cursor.rowcount
+                raw.commit()
+            except Exception:
+                raw.rollback()
+                raise
+        finally:
+            raw.close()
+
+        return reported
+
+class CsvStream(io.RawIOBase):
+    """Flux en lecture seule sérialisant des DataFrames en CSV à la demande."""
+
+    def __init__(self, frames: Iterator[pd.DataFrame]):
+        self._frames = frames
+        self._buffer = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self._buffer) < size:
+            frame = next(self._frames, None)
+            if frame is None:
+                break
+            self._buffer += frame.to_csv(
+                header=False, index=False, na_rep='', quoting=csv.QUOTE_MINIMAL,
+                date_format='%Y-%m-%d %H:%M:%S.%f'
+            ).encode('utf-8')
+
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+class CsvChecksumWriter:
+    """Écriture CSV avec nombre de lignes, taille et empreinte BLAKE2b
+    calculés au fil de l'écriture.
+
+    ``verify`` compare la taille du fichier sur disque aux octets écrits ;
+    en mode ``paranoid``, le fichier est en plus relu pour recalculer
+    l'empreinte et recompter les lignes.
+    """
+
+    def __init__(self, file_path: Union[str, Path]):
+        self.file_path = Path(file_path)
+        self.rows = 0
+        self.bytes = 0
+        self.columns: Optional[List[str]] = None
+        self._digest = hashlib.blake2b(digest_size=16)
+        self._file = None
+
+    def __enter__(self) -> "CsvChecksumWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, df: pd.DataFrame):
+        """Ajouter ``df`` (colonnes alignées sur le premier DataFrame écrit)."""
+        header = self._file is None
+        if header:
+            self.columns = list(df.columns)
+            self._file = open(self.file_path, 'wb')
+        else:
+            df = df.reindex(columns=self.columns)
+
+        data = df.to_csv(index=False, header=header).encode('utf-8')
+        self._file.write(data)
+        self._digest.update(data)
+        self.bytes += len(data)
+        self.rows += len(df)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+    @property
+    def checksum(self) -> str:
+        return self._digest.hexdigest()
+
+    def verify(self, paranoid: bool = False):
+        """Vérifier le fichier écrit ; lève ``ValueError`` en cas d'écart."""
+        if self._file is None:
+            return
+
+        size = self.file_path.stat().st_size
+        if size != self.bytes:
+            raise ValueError(f"Taille incohérente après écriture: {size} vs {self.bytes} octets")
+
+        if paranoid:
+            digest = hashlib.blake2b(digest_size=16)
+            with open(self.file_path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+            if digest.hexdigest() != self.checksum:
+                raise ValueError("Empreinte incohérente après écriture")
+
+            rows = sum(len(chunk) for chunk in pd.read_csv(self.file_path, chunksize=100000))
+            if rows != self.rows:
+                raise ValueError(f"Nombre de lignes incohérent après écriture: {rows} vs {self.rows}")
+
+class ParquetChunkWriter:
+    """Écriture Parquet par DataFrames successifs, au schéma stable.
+
+    Le schéma Arrow est déduit du premier DataFrame ; les suivants y sont
+    alignés (colonnes et types). Avec ``partition_cols``, ``file_path`` est
+    la racine d'un dataset partitionné façon Hive (``col=valeur/``), avec
+    un fichier par partition quel que soit le nombre d'appels à ``write``
+    (un groupe de lignes par appel) ; sinon un fichier unique est écrit.
+
+    ``verify`` compare les lignes écrites au total lu dans les pieds de
+    page des fichiers ; en mode ``paranoid``, les fichiers sont relus.
+    """
+
+    def __init__(self, file_path: Union[str, Path], partition_cols: Sequence[str] = (),
+                 compression: str = 'zstd'):
+        if pq is None:
+            raise ImportError("pyarrow est requis pour le format Parquet")
+
+        self.file_path = Path(file_path)
+        self.partition_cols = list(partition_cols)
+        self.compression = compression
+        self.rows = 0
+        self.schema = None
+        self.files: List[Path] = []
+        self._writers: Dict[tuple, "pq.ParquetWriter"] = {}
+        self._file_schema = None
+        self._token = uuid.uuid4().hex[:8]
+
+    def __enter__(self) -> "ParquetChunkWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @property
+    def bytes(self) -> int:
+        return sum(path.stat().st_size for path in self.files)
+
+    def write(self, df: pd.DataFrame):
+        """Ajouter ``df`` au fichier ou au dataset."""
+        if self.schema is None:
+            self.schema = pa.Schema.from_pandas(df, preserve_index=False)
+            self._file_schema = self.schema
+            for col in self.partition_cols:
+                self._file_schema = self._file_schema.remove(self._file_schema.get_field_index(col))
+        else:
+            df = df.reindex(columns=self.schema.names)
+
+        if self.partition_cols:
+            for key, part in df.groupby(self.partition_cols, sort=False, dropna=False):
+                key = key if isinstance(key, tuple) else (key,)
+                self._partition_writer(key).write_table(pa.Table.from_pandas(
+                    part.drop(columns=self.partition_cols), schema=self._file_schema, preserve_index=False
+                ))
+        else:
+            self._partition_writer(()).write_table(
+                pa.Table.from_pandas(df, schema=self.schema, preserve_index=False)
+            )
+
+        self.rows += len(df)
+
+    def close(self):
+        for writer in self._writers.values():
+            writer.close()
+        self._writers = {}
+
+    def _partition_writer(self, key: tuple) -> "pq.ParquetWriter":
+        """Writer du fichier de la partition ``key`` (ouvert à la demande)."""
+        writer = self._writers.get(key)
+        if writer is not None:
+            return writer
+
+        if not key:
+            path = self.file_path
+        else:
+            directory = self.file_path.joinpath(*(
+                f"{col}={_hive_value(value)}" for col, value in zip(self.partition_cols, key)
+            ))
+            directory.mkdir(parents=True, exist_ok=True)
+            path = directory / f"part-{self._token}.parquet"
+
+        writer = pq.ParquetWriter(path, self._file_schema, compression=self.compression)
+        self._writers[key] = writer
+        self.files.append(path)
+
+        return writer
+
+    def verify(self, paranoid: bool = False):
+        """Vérifier les fichiers écrits ; lève ``ValueError`` en cas d'écart."""
+        rows = sum(pq.read_metadata(path).num_rows for path in self.files)
+        if rows != self.rows:
+            raise ValueError(f"Nombre de lignes incohérent après écriture: {rows} vs {self.rows}")
+
+        if paranoid:
+            rows = sum(pq.read_table(path).num_rows for path in self.files)
+            if rows != self.rows:
+                raise ValueError(f"Nombre de lignes incohérent à la relecture: {rows} vs {self.rows}")
+
+BULK_LOADERS: Dict[str, Type[BulkLoader]] = {
+    'to_sql': BulkLoader,
+    'sqlite': SQLiteBulkLoader,
+    'postgres_copy': PostgresCopyLoader
+}
+
+def get_bulk_loader(engine: sa.engine.Engine, batch_size: int = 1000,
+                    strategy: str = 'auto') -> BulkLoader:
+    """Stratégie de chargement pour le dialecte de ``engine``.
+
+    ``strategy`` : "auto" (selon le dialecte), "to_sql", "sqlite" ou
+    "postgres_copy".
+    """
+    if strategy == 'auto':
+        dialect = engine.dialect.name
+        driver = engine.dialect.driver
+        if dialect == 'postgresql' and driver == 'psycopg2':
+            strategy = 'postgres_copy'
+        elif dialect == 'sqlite':
+            strategy = 'sqlite'
+        else:
+            strategy = 'to_sql'
+
+    if strategy not in BULK_LOADERS:
+        raise ValueError(f"Stratégie de chargement inconnue: {strategy}")
+
+    return BULK_LOADERS[strategy](engine, batch_size)
+
+def create_indexes(engine: sa.engine.Engine, table_name: str,
+                   columns: Sequence[str]) -> List[str]:
+    """Indexer les colonnes présentes de ``table_name`` ; renvoie les index créés.
+
+    Les noms d'index dérivent du nom de la table : ils suivent la table
+    quand elle est renommée et restent uniques d'une génération à l'autre.
+    """
+    existing = {col['name'] for col in sa.inspect(engine).get_columns(table_name)}
+    created = []
+
+    with engine.begin() as conn:
+        for column in columns:
+            if column not in existing:
+                continue
+            index_name = f"ix_{table_name}_{column}"
+            conn.exec_driver_sql(
+                f"CREATE INDEX {_quote(index_name)} ON {_quote(table_name)} ({_quote(column)})"
+            )
+            created.append(index_name)
+
+    return created
+
+def swap_table(engine: sa.engine.Engine, staging_table: str, table_name: str,
+               previous_table: Optional[str] = None):
+    """Remplacer ``table_name`` par ``staging_table`` en une transaction.
+
+    La table courante est renommée en ``previous_table`` (la génération
+    précédente est supprimée) ou supprimée si ``previous_table`` est
+    ``None``. Les lecteurs voient l'ancienne ou la nouvelle table, jamais
+    un chargement partiel.
+
+    Les vues qui référencent ``table_name`` suivent le renommage (PostgreSQL
+    et SQLite >= 3.26) et pointent ensuite sur ``previous_table``.
+    """
+    inspector = sa.inspect(engine)
+    statements = []
+    if previous_table is not None and inspector.has_table(previous_table):
+        statements.append(f"DROP TABLE {_quote(previous_table)}")
+    if inspector.has_table(table_name):
+        if previous_table is not None:
+            statements.append(f"ALTER TABLE {_quote(table_name)} RENAME TO {_quote(previous_table)}")
+        else:
+            statements.append(f"DROP TABLE {_quote(table_name)}")
+    statements.append(f"ALTER TABLE {_quote(staging_table)} RENAME TO {_quote(table_name)}")
+
+    if engine.dialect.name == 'sqlite':
+        # pysqlite n'ouvre pas de transaction implicite avant un DDL
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+            try:
+                for statement in statements:
+                    conn.exec_driver_sql(statement)
+                conn.exec_driver_sql("COMMIT")
+            except Exception:
+                conn.exec_driver_sql("ROLLBACK")
+                raise
+    else:
+        with engine.begin() as conn:
+            for statement in statements:
+                conn.exec_driver_sql(statement)
+
+def ensure_unique_index(engine: sa.engine.Engine, table_name: str,
+                        columns: Sequence[str]) -> Optional[str]:
+    """Créer un index unique sur ``columns`` s'il n'en existe pas déjà un.
+
+    Nécessaire à ``ON CONFLICT`` ; renvoie le nom de l'index créé.
+    """
+    for index in sa.inspect(engine).get_indexes(table_name):
+        if index.get('unique') and list(index['column_names']) == list(columns):
+            return None
+
+    index_name = f"ux_{table_name}_{'_'.join(columns)}_{datetime.now().strftime('%Y%m%d%H%M%S%f')}"
+    column_list = ", ".join(_quote(col) for col in columns)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            f"CREATE UNIQUE INDEX {_quote(index_name)} ON {_quote(table_name)} ({column_list})"
+        )
+
+    return index_name
+
+def upsert_rows(engine: sa.engine.Engine, df: pd.DataFrame, table_name: str,
+                key_columns: Sequence[str], batch_size: int = 1000) -> int:
+    """Insérer ou mettre à jour les lignes de ``df`` selon ``key_columns``.
+
+    ``INSERT ... ON CONFLICT (clé) DO UPDATE`` (PostgreSQL, SQLite >= 3.24),
+    dans une transaction. La table doit exister avec un index unique sur
+    la clé ; les colonnes de ``df`` absentes de la table sont ignorées.
+    """
+    if engine.dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif engine.dialect.name == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise ValueError(f"Upsert non supporté pour le dialecte {engine.dialect.name}")
+
+    table = sa.Table(table_name, sa.MetaData(), autoload_with=engine)
+    columns = [col for col in df.columns if col in table.c]
+    extra = [col for col in df.columns if col not in table.c]
+    if extra:
+        logger.warning(f"Colonnes absentes de {table_name} ignorées: {extra}")
+
+    statement = insert(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=list(key_columns),
+        set_={col: statement.excluded[col] for col in columns if col not in key_columns}
+    )
+
+    with engine.begin() as conn:
+        for start in range(0, len(df), batch_size):
+            batch = df.iloc[start:start + batch_size][columns]
+            rows = [dict(zip(columns, row)) for row in _python_rows(batch, dates_as_text=False)]
+            conn.execute(statement, rows)
+
+    return len(df)
+
+def delete_rows(engine: sa.engine.Engine, table_name: str, key_column: str,
+                keys: Sequence, batch_size: int = 1000) -> int:
+    """Supprimer les lignes dont ``key_column`` est dans ``keys``."""
+    table = sa.Table(table_name, sa.MetaData(), autoload_with=engine)
+    keys = list(keys)
+
+    with engine.begin() as conn:
+        for start in range(0, len(keys), batch_size):
+            conn.execute(table.delete().where(table.c[key_column].in_(keys[start:start + batch_size])))
+
+    return len(keys)
+
+def drop_table(engine: sa.engine.Engine, table_name: str):
+    """Supprimer ``table_name`` si elle existe."""
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"DROP TABLE IF EXISTS {_quote(table_name)}")
+
+def _hive_value(value) -> str:
+    """Valeur de partition encodée pour un chemin ``col=valeur``."""
+    if pd.isna(value):
+        return "__HIVE_DEFAULT_PARTITION__"
+    return quote(str(value), safe='')
+
+def _quote(identifier: str) -> str:
+    """Identifiant SQL entre guillemets doubles."""
+    return '"' + str(identifier).replace('"', '""') + '"'
+
+def _python_rows(df: pd.DataFrame, dates_as_text: bool = True) -> List[tuple]:
+    """Lignes en types Python natifs (NaN/NaT → None, dates en texte sauf
+    ``dates_as_text=False`` pour les paramètres typés de SQLAlchemy)."""
+    converted = {}
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_datetime64_any_dtype(series) and dates_as_text:
+            values = series.dt.strftime('%Y-%m-%d %H:%M:%S.%f').astype(object)
+        elif pd.api.types.is_timedelta64_dtype(series):
+            values = (series.dt.total_seconds() * 1e9).astype(object)
+        else:
+            values = series.astype(object)
+        converted[col] = values.where(series.notna(), None).tolist()
+
+    return list(zip(*converted.values())) if converted else []
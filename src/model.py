@@ -6,6 +6,7 @@ import pandas as pd
 import numpy as np
 import joblib
 import json
+import os
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional, Union, Any
 from datetime import datetime
@@ -20,14 +21,50 @@ from sklearn.preprocessing import StandardScaler
 import mlflow
 import mlflow.sklearn
 
+from src.config import INFERENCE_ENGINE
+from src.inference import CompiledForest, load_forest_model, save_forest_artifact
+
 logger = logging.getLogger(__name__)
 
 class ADHDPredictor:
     """Modèle de prédiction du risque TDAH."""
     
-    def __init__(self, model_path: Optional[Path] = None):
+    # Seuils de probabilité max (>=) délimitant les niveaux de confiance
+    CONFIDENCE_THRESHOLDS = np.array([0.7, 0.8, 0.9])
+    CONFIDENCE_LEVELS = ["faible", "modérée", "élevée", "très_élevée"]
+    
+    # Jeux de recommandations : 0 = pas de risque, 1 = risque modéré, 2 = risque élevé
+    _RISK_SPECIFIC_RECOMMENDATIONS = (
+        "Environnement de travail calme",
+        "Pauses régulières",
+        "Instructions écrites claires",
+        "Flexibilité horaires si possible"
+    )
+    RECOMMENDATION_SETS = {
+        0: (
+            "Maintenir l'environnement actuel",
+            "Surveillance périodique",
+            "Promouvoir les bonnes pratiques"
+        ),
+        1: (
+            "Surveillance des indicateurs de performance",
+            "Considérer des aménagements préventifs",
+            "Formation des managers sur la neurodiversité"
+        ) + _RISK_SPECIFIC_RECOMMENDATIONS,
+        2: (
+            "Évaluation clinique recommandée",
+            "Aménagements de poste prioritaires",
+            "Suivi rapproché avec les RH"
+        ) + _RISK_SPECIFIC_RECOMMENDATIONS
+    }
+    
+    def __init__(self, model_path: Optional[Path] = None,
+                 engine: Optional[str] = None):
         self.model = None
+        self.compiled_model = None
+        self.engine = engine or INFERENCE_ENGINE
         self.scaler = None
+        self.preprocessor = None
         self.feature_names = None
         self.metadata = {}
         
@@ -35,15 +72,12 @@ class ADHDPredictor:
             self.load_model(model_path)
     
     def load_model(self, model_path: Path):
-        """Charger un modèle pré-entraîné."""
+        """Charger un modèle pré-entraîné.
+        
+        L'artefact ``.npy`` mappé en mémoire est préféré au pickle s'il est
+        décrit dans les métadonnées (voir INFERENCE_ENGINE).
+        """
         try:
-            self.model = joblib.load(model_path / "random_forest.pkl")
-            
-            # Charger le scaler si disponible
-            scaler_path = model_path / "scaler.pkl"
-            if scaler_path.exists():
-                self.scaler = joblib.load(scaler_path)
-            
             # Charger les métadonnées
             metadata_path = model_path / "model_metadata.json"
             if metadata_path.exists():
@@ -51,6 +85,23 @@ class ADHDPredictor:
                     self.metadata = json.load(f)
                     self.feature_names = self.metadata.get('feature_names', [])
             
+            loaded_model = load_forest_model(model_path, self.metadata, self.engine)
+            if isinstance(loaded_model, CompiledForest):
+                self.compiled_model = loaded_model
+                self.model = loaded_model.fallback if loaded_model.fallback is not None else loaded_model
+            else:
+                self.compiled_model = None
+                self.model = loaded_model
+            
+            # Charger le scaler si disponible
+            scaler_path = model_path / "scaler.pkl"
+            if scaler_path.exists():
+                self.scaler = joblib.load(scaler_path)
+            
+            # Transformation figée des données brutes (DataProcessor.export_transform)
+            if self.metadata.get('preprocessor'):
+                self.preprocessor = joblib.load(model_path / self.metadata['preprocessor'])
+            
             logger.info(f"Modèle chargé depuis {model_path}")
             
         except Exception as e:
@@ -66,7 +117,7 @@ class ADHDPredictor:
         X_processed = self._preprocess_input(X)
         
         # Prédiction
-        predictions = self.model.predict(X_processed)
+        predictions = self._estimator().predict(X_processed)
         
         return predictions
     
@@ -76,14 +127,34 @@ class ADHDPredictor:
             raise ValueError("Aucun modèle chargé")
         
         X_processed = self._preprocess_input(X)
-        probabilities = self.model.predict_proba(X_processed)
+        probabilities = self._estimator().predict_proba(X_processed)
         
         return probabilities
     
-    def predict_with_explanation(self, X: Union[pd.DataFrame, np.ndarray]) -> Dict[str, Any]:
-        """Prédiction avec explication."""
-        predictions = self.predict(X)
+    def predict_with_explanation(self, X: Union[pd.DataFrame, np.ndarray],
+                                 output: str = 'records') -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        """Prédiction avec explication.
+        
+        ``output='records'`` renvoie un dict par ligne (ou un seul dict pour
+        une ligne). ``output='columnar'`` renvoie un DataFrame de résultats
+        avec des identifiants de jeux de recommandations, plus les jeux de
+        recommandations et l'importance des features une seule fois.
+        """
+        if output not in ('records', 'columnar'):
+            raise ValueError(f"Format de sortie non supporté: {output}")
+        
         probabilities = self.predict_proba(X)
+        predictions = self._predictions_from_proba(probabilities)
+        
+        if probabilities.shape[1] > 1:
+            no_risk_probability = probabilities[:, 0]
+            risk_probability = probabilities[:, 1]
+        else:
+            risk_probability = probabilities[:, 0]
+            no_risk_probability = 1 - risk_probability
+        
+        confidence_codes = self._confidence_codes(probabilities)
+        recommendation_ids = self._recommendation_set_ids(predictions, risk_probability)
         
         # Feature importance pour l'explication
         if hasattr(self.model, 'feature_importances_'):
@@ -94,18 +165,37 @@ class ADHDPredictor:
         else:
             feature_importance = {}
         
-        results = []
-        for i, (pred, prob) in enumerate(zip(predictions, probabilities)):
-            
-            # Générer des recommandations
-            recommendations = self._generate_recommendations(pred, prob[1] if len(prob) > 1 else prob[0])
+        if output == 'columnar':
+            results = pd.DataFrame({
+                'prediction': predictions.astype(int),
+                'probability_no_risk': no_risk_probability,
+                'probability_risk': risk_probability,
+                'confidence': pd.Categorical.from_codes(
+                    confidence_codes, categories=self.CONFIDENCE_LEVELS
+                ),
+                'recommendation_set': recommendation_ids
+            }, index=X.index if isinstance(X, pd.DataFrame) else None)
             
+            return {
+                'results': results,
+                'recommendation_sets': {
+                    set_id: list(recommendations)
+                    for set_id, recommendations in self.RECOMMENDATION_SETS.items()
+                },
+                'feature_importance': feature_importance
+            }
+        
+        results = []
+        for pred, prob_no_risk, prob_risk, confidence_code, set_id in zip(
+            predictions.tolist(), no_risk_probability.tolist(), risk_probability.tolist(),
+            confidence_codes.tolist(), recommendation_ids.tolist()
+        ):
             result = {
                 'prediction': int(pred),
-                'probability_no_risk': float(prob[0]) if len(prob) > 1 else float(1 - prob[0]),
-                'probability_risk': float(prob[1]) if len(prob) > 1 else float(prob[0]),
-                'confidence': self._calculate_confidence(prob),
-                'recommendations': recommendations,
+                'probability_no_risk': prob_no_risk,
+                'probability_risk': prob_risk,
+                'confidence': self.CONFIDENCE_LEVELS[confidence_code],
+                'recommendations': list(self.RECOMMENDATION_SETS[set_id]),
                 'feature_importance': feature_importance
             }
             
@@ -113,8 +203,22 @@ class ADHDPredictor:
         
         return results[0] if len(results) == 1 else results
     
-    def _preprocess_input(self, X: Union[pd.DataFrame, np.ndarray]) -> np.ndarray:
-        """Préprocesser les données d'entrée."""
+    def _estimator(self) -> Any:
+        """Moteur utilisé pour l'inférence (compilé si disponible)."""
+        return self.compiled_model if self.compiled_model is not None else self.model
+    
+    def _preprocess_input(self, X: Union[pd.DataFrame, np.ndarray, Dict[str, Any], List[Dict[str, Any]]]) -> np.ndarray:
+        """Préprocesser les données d'entrée.
+        
+        Avec un préprocesseur, les données brutes (ligne, liste de lignes ou
+        DataFrame sans les features) sont transformées comme à l'entraînement.
+        """
+        
+        if self.preprocessor is not None and (
+            isinstance(X, (dict, list))
+            or (isinstance(X, pd.DataFrame) and not set(self.feature_names or []).issubset(X.columns))
+        ):
+            X = self.preprocessor.transform(X)
         
         if isinstance(X, pd.DataFrame):
             # Vérifier que les features requises sont présentes
@@ -135,53 +239,40 @@ class ADHDPredictor:
         
         return X_processed
     
+    def _predictions_from_proba(self, probabilities: np.ndarray) -> np.ndarray:
+        """Classes prédites à partir des probabilités (équivalent à predict)."""
+        classes = getattr(self.model, 'classes_', None)
+        if classes is None or len(classes) != probabilities.shape[1]:
+            classes = np.arange(probabilities.shape[1])
+        
+        return np.asarray(classes).take(np.argmax(probabilities, axis=1))
+    
+    def _confidence_codes(self, probabilities: np.ndarray) -> np.ndarray:
+        """Indices dans CONFIDENCE_LEVELS, calculés en une passe."""
+        probabilities = np.atleast_2d(probabilities)
+        max_prob = probabilities.max(axis=1)
+        if probabilities.shape[1] == 1:
+            max_prob = np.maximum(max_prob, 1 - max_prob)
+        
+        return np.digitize(max_prob, self.CONFIDENCE_THRESHOLDS)
+    
+    def _recommendation_set_ids(self, predictions: np.ndarray,
+                                risk_probability: np.ndarray) -> np.ndarray:
+        """Identifiants dans RECOMMENDATION_SETS pour chaque ligne."""
+        at_risk = (np.asarray(predictions) == 1) | (risk_probability > 0.5)
+        return np.where(at_risk, np.where(risk_probability > 0.8, 2, 1), 0)
+    
     def _calculate_confidence(self, probabilities: np.ndarray) -> str:
         """Calculer le niveau de confiance."""
-        max_prob = np.max(probabilities)
-        
-        if max_prob >= 0.9:
-            return "très_élevée"
-        elif max_prob >= 0.8:
-            return "élevée"
-        elif max_prob >= 0.7:
-            return "modérée"
-        else:
-            return "faible"
+        return self.CONFIDENCE_LEVELS[int(self._confidence_codes(probabilities)[0])]
     
     def _generate_recommendations(self, prediction: int, risk_probability: float) -> List[str]:
         """Générer des recommandations basées sur la prédiction."""
+        set_id = int(self._recommendation_set_ids(
+            np.array([prediction]), np.array([risk_probability])
+        )[0])
         
-        recommendations = []
-        
-        if prediction == 1 or risk_probability > 0.5:
-            if risk_probability > 0.8:
-                recommendations.extend([
-                    "Évaluation clinique recommandée",
-                    "Aménagements de poste prioritaires",
-                    "Suivi rapproché avec les RH"
-                ])
-            else:
-                recommendations.extend([
-                    "Surveillance des indicateurs de performance",
-                    "Considérer des aménagements préventifs",
-                    "Formation des managers sur la neurodiversité"
-                ])
-            
-            # Recommandations spécifiques
-            recommendations.extend([
-                "Environnement de travail calme",
-                "Pauses régulières",
-                "Instructions écrites claires",
-                "Flexibilité horaires si possible"
-            ])
-        else:
-            recommendations.extend([
-                "Maintenir l'environnement actuel",
-                "Surveillance périodique",
-                "Promouvoir les bonnes pratiques"
-            ])
-        
-        return recommendations
+        return list(self.RECOMMENDATION_SETS[set_id])
 
 class ModelTrainer:
     """Classe pour l'entraînement des modèles."""
@@ -329,8 +420,17 @@ class ModelTrainer:
         return comparison_df
     
     def save_best_model(self, model_result: Dict[str, Any], 
-                       output_dir: Path) -> Path:
-        """Sauvegarder le meilleur modèle."""
+                       output_dir: Path, preprocessor: Optional[Any] = None) -> Path:
+        """Sauvegarder le meilleur modèle.
+        
+        ``preprocessor`` (ou ``model_result['preprocessor']``) est la
+        transformation figée de ``DataProcessor.export_transform`` :
+        sauvegardée à côté du modèle, elle permet de prédire sur des
+        données brutes sans réajuster le préprocessing.
+        """
+        preprocessor = preprocessor if preprocessor is not None else model_result.get('preprocessor')
+        if preprocessor is not None and list(preprocessor.feature_names) != list(model_result['feature_names']):
+            raise ValueError("Les features du préprocesseur ne correspondent pas à celles du modèle")
         
         output_dir.mkdir(parents=True, exist_ok=True)
         
@@ -343,6 +443,12 @@ class ModelTrainer:
             scaler_path = output_dir / "scaler.pkl"
             joblib.dump(model_result['scaler'], scaler_path)
         
+        # Artefact .npy partageable entre workers (forêts uniquement)
+        forest_artifact = save_forest_artifact(model_result['model'], output_dir)
+        
+        if preprocessor is not None:
+            joblib.dump(preprocessor, output_dir / "preprocessor.joblib")
+        
         # Sauvegarder les métadonnées
         metadata = {
             'model_type': 'adhd_classifier',
@@ -355,10 +461,18 @@ class ModelTrainer:
                 'std': float(model_result['cv_scores'].std())
             }
         }
+        if forest_artifact:
+            metadata['compiled_forest'] = forest_artifact
+        if preprocessor is not None:
+            metadata['preprocessor'] = "preprocessor.joblib"
         
+        # Écrit en dernier et de façon atomique : l'API recharge le modèle
+        # à chaud dès que ce fichier change
         metadata_path = output_dir / "model_metadata.json"
-        with open(metadata_path, 'w') as f:
+        tmp_metadata_path = output_dir / ".model_metadata.json.tmp"
+        with open(tmp_metadata_path, 'w') as f:
             json.dump(metadata, f, indent=2)
+        os.replace(tmp_metadata_path, metadata_path)
         
         logger.info(f"Modèle sauvegardé dans {output_dir}")
         
@@ -4,82 +4,324 @@ Utilitaires de traitement des données pour Ubisoft People Analytics.
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple, Optional, Union
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Tuple, Optional, Union
 from sklearn.preprocessing import StandardScaler, LabelEncoder, MinMaxScaler
 from sklearn.impute import SimpleImputer, KNNImputer
 import logging
+import warnings
+
+from src.utils.imputation import NeighborImputer
+from src.utils.profiling import StageProfiler, profiled
+from src.utils.quality import profile_data
+from src.utils.sketches import QuantileSketch, RunningMoments
 
 logger = logging.getLogger(__name__)
 
+# En dessous de ce nombre de lignes, fit_statistics garde les données
+# nettoyées en mémoire au lieu de relire la source
+KNN_IMPUTATION_MAX_ROWS = 1000
+# Taille de l'échantillon de donneurs de l'imputation 'auto'
+NEIGHBOR_IMPUTATION_MAX_DONORS = 50000
+# Les outliers d'une colonne ne sont plafonnés que s'ils sont rares
+OUTLIER_CAPPING_MAX_SHARE = 0.05
+# Percentiles de plafonnement des outliers rares
+OUTLIER_CAPPING_QUANTILES = (0.01, 0.99)
+OUTLIER_METHODS = ('iqr', 'zscore', 'mad')
+# Seuil du z-score modifié 0.6745 * |x - médiane| / MAD (Iglewicz et Hoaglin)
+MAD_OUTLIER_THRESHOLD = 3.5
+FEATURE_QUANTILE_COLUMNS = ['creative_score', 'burnout_scale']
+# Colonnes texte converties en 'category' à l'extraction : au plus cette
+# part de valeurs distinctes (département, style de communication, statut)
+CATEGORY_MAX_DISTINCT_RATIO = 0.5
+# Colonnes traitées comme catégorielles (chaînes et catégories)
+CATEGORICAL_DTYPES = ['object', 'category']
+# Bornes des scores appliquées au nettoyage
+VALUE_RANGES = {'creative_score': (0, 100), 'burnout_scale': (1, 10)}
+
+@dataclass
+class FittedStatistics:
+    """Statistiques globales figées, appliquées chunk par chunk.
+    
+    Produites par ``DataProcessor.fit_statistics`` ; les sketches restent
+    fusionnables pour des ajustements incrémentaux.
+    """
+    n_rows: int = 0
+    # Imputation
+    medians: Dict[str, float] = field(default_factory=dict)
+    modes: Dict[str, Any] = field(default_factory=dict)
+    knn_imputer: Optional[NeighborImputer] = None
+    knn_columns: List[str] = field(default_factory=list)
+    # Feature engineering et encodage
+    feature_quantiles: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+    department_means: Dict[Any, float] = field(default_factory=dict)
+    creative_score_mean: float = np.nan
+    categories: Dict[str, List[Any]] = field(default_factory=dict)
+    # Date de référence de l'ancienneté, commune à tous les chunks
+    reference_time: Optional[pd.Timestamp] = None
+    # Outliers (après encodage)
+    outlier_sketches: Dict[str, QuantileSketch] = field(default_factory=dict)
+    outlier_moments: Dict[str, RunningMoments] = field(default_factory=dict)
+    
+    def outlier_bounds(self, col: str, method: str = 'iqr') -> Tuple[float, float]:
+        """Bornes hors desquelles une valeur est un outlier."""
+        if method == 'iqr':
+            sketch = self.outlier_sketches[col]
+            q1, q3 = sketch.quantile(0.25), sketch.quantile(0.75)
+            iqr = q3 - q1
+            return q1 - 1.5 * iqr, q3 + 1.5 * iqr
+        
+        if method == 'mad':
+            sketch = self.outlier_sketches[col]
+            return _mad_bounds(sketch.quantile(0.5), sketch.median_absolute_deviation())
+        
+        moments = self.outlier_moments[col]
+        return moments.mean - 3 * moments.std, moments.mean + 3 * moments.std
+    
+    def outlier_count(self, col: str, method: str = 'iqr') -> float:
+        """Nombre d'outliers de la colonne sur l'ensemble des données."""
+        lower, upper = self.outlier_bounds(col, method)
+        sketch = self.outlier_sketches[col]
+        return sketch.count_below(lower) + sketch.count_above(upper)
+
+@dataclass
+class FeatureTransform:
+    """Transformation figée des données brutes en matrice de features.
+    
+    Produite par ``DataProcessor.export_transform`` après
+    ``prepare_ml_dataset`` et sauvegardée avec le modèle : nettoyage,
+    imputation, features, encodage et scaling sont rejoués avec les
+    statistiques d'entraînement, sans réajustement. ``transform`` accepte
+    une ligne (dict), une liste de lignes ou un DataFrame et calcule
+    colonne par colonne sur des tableaux numpy ; les colonnes absentes
+    sont imputées comme des valeurs manquantes.
+    """
+    feature_names: List[str]
+    input_columns: List[str]
+    numeric_columns: List[str]
+    categorical_columns: List[str]
+    statistics: FittedStatistics
+    scaled_columns: List[str] = field(default_factory=list)
+    scale_mean: Optional[np.ndarray] = None
+    scale_std: Optional[np.ndarray] = None
+    
+    def transform(self, data: Union[Dict[str, Any], List[Dict[str, Any]], pd.DataFrame]) -> np.ndarray:
+        """Matrice float64 (une ligne par entrée, colonnes ``feature_names``)."""
+        if isinstance(data, dict):
+            data = [data]
+        n_rows = len(data)
+        if isinstance(data, pd.DataFrame):
+            raw = {col: data[col].to_numpy() for col in self.input_columns if col in data.columns}
+        else:
+            raw = {col: np.array([record.get(col) for record in data], dtype=object) for col in self.input_columns}
+        
+        stats = self.statistics
+        missing = np.full(n_rows, np.nan)
+        features: Dict[str, np.ndarray] = {}
+        
+        # Nettoyage et imputation des colonnes numériques
+        numeric = np.column_stack([
+            np.asarray(raw.get(col, missing), dtype=np.float64) for col in self.numeric_columns
+        ]) if self.numeric_columns else np.empty((n_rows, 0))
+        for j, col in enumerate(self.numeric_columns):
+            if col in VALUE_RANGES:
+                numeric[:, j] = np.clip(numeric[:, j], *VALUE_RANGES[col])
+        if stats.knn_imputer is not None:
+            numeric = stats.knn_imputer.transform(numeric)
+        else:
+            fill = np.array([stats.medians.get(col, 0.0) for col in self.numeric_columns])
+            numeric = np.where(np.isnan(numeric), fill, numeric)
+        features.update(zip(self.numeric_columns, numeric.T))
+        
+        # Nettoyage (comme .str.strip().str.lower()) et imputation par le mode
+        categorical = {}
+        for col in self.categorical_columns:
+            values = raw.get(col, np.full(n_rows, None, dtype=object))
+            mode = stats.modes.get(col)
+            categorical[col] = np.array([
+                value.strip().lower() if isinstance(value, str) else mode for value in values
+            ], dtype=object)
+        
+        # Features dérivées (cf. engineer_features)
+        if 'creative_score' in features and 'burnout_scale' in features:
+            features['creativity_burnout_ratio'] = features['creative_score'] / (features['burnout_scale'] + 1)
+        for col, (q25, q75) in stats.feature_quantiles.items():
+            if col in features:
+                features[f'{col}_high'] = (features[col] > q75).astype(np.int64)
+                features[f'{col}_low'] = (features[col] < q25).astype(np.int64)
+        if 'department' in categorical and 'creative_score' in features:
+            dept_creativity = np.array([
+                stats.department_means.get(dept, np.nan) for dept in categorical['department']
+            ], dtype=np.float64)
+            dept_creativity = np.where(np.isnan(dept_creativity), stats.creative_score_mean, dept_creativity)
+            features['creativity_vs_dept_avg'] = features['creative_score'] - dept_creativity
+        if 'hire_date' in self.input_columns:
+            hire_values = categorical.get('hire_date', raw.get('hire_date', missing))
+            hire_date = pd.to_datetime(pd.Index(hire_values, dtype=object))
+            features['tenure_years'] = ((stats.reference_time - hire_date).days / 365.25).to_numpy(dtype=np.float64)
+            features['hire_month'] = hire_date.month.to_numpy(dtype=np.float64)
+            features['hire_quarter'] = hire_date.quarter.to_numpy(dtype=np.float64)
+        
+        # Encodage (catégorie inconnue : -1)
+        for col, values in categorical.items():
+            codes = {category: code for code, category in enumerate(stats.categories.get(col, []))}
+            features[f'{col}_encoded'] = np.array([codes.get(value, -1) for value in values], dtype=np.int64)
+        
+        unknown = [name for name in self.feature_names if name not in features]
+        if unknown:
+            raise ValueError(f"Features non reproductibles: {unknown}")
+        
+        matrix = np.column_stack([features[name] for name in self.feature_names]).astype(np.float64)
+        if self.scaled_columns:
+            positions = [self.feature_names.index(col) for col in self.scaled_columns]
+            matrix[:, positions] = (matrix[:, positions] - self.scale_mean) / self.scale_std
+        
+        return matrix
+
+@dataclass(frozen=True)
+class TransformStage:
+    """Étape déclarée de la chaîne de ``prepare_ml_dataset``.
+    
+    ``method`` (méthode de ``DataProcessor``) lit ``inputs`` et produit
+    ``outputs`` ; nettoyage et imputation produisent la colonne qu'ils
+    lisent.
+    """
+    method: str
+    inputs: Tuple[str, ...]
+    outputs: Tuple[str, ...]
+
+@dataclass
+class TransformPlan:
+    """Plan paresseux de ``prepare_ml_dataset`` limité à ``feature_names``.
+    
+    Produit par ``plan_transform`` : seules les étapes ``stages`` sont
+    exécutées et seules les colonnes ``source_columns`` sont lues (à
+    passer par ex. à ``extract_from_parquet(columns=...)``).
+    """
+    feature_names: List[str]
+    source_columns: List[str]
+    stages: List[TransformStage]
+    
+    @property
+    def methods(self) -> List[str]:
+        """Méthodes de ``DataProcessor`` à exécuter, dans l'ordre."""
+        return list(dict.fromkeys(stage.method for stage in self.stages))
+
 class DataProcessor:
-    """Classe principale pour le traitement des données."""
+    """Classe principale pour le traitement des données.
+    
+    Les étapes (``clean_employee_data``, ``handle_missing_values``,
+    ``engineer_features``, ``encode_categorical_variables``,
+    ``scale_numerical_features``) ne modifient pas leur entrée : elles
+    travaillent sur une copie paresseuse sous copy-on-write (pandas 3),
+    profonde sinon. Avec ``copy=False``, l'étape ajoute ou remplace les
+    colonnes de ``df`` lui-même et le renvoie : une chaîne d'étapes ne
+    garde alors qu'une copie des données plus les colonnes créées.
+    """
     
     def __init__(self):
         self.scalers = {}
         self.encoders = {}
         self.imputers = {}
+        # Statistiques figées (None = chaque appel ajuste sur ses données)
+        self.statistics: Optional[FittedStatistics] = None
+        # Profileur des étapes (None = pas de mesure)
+        self.profiler: Optional[StageProfiler] = None
+        # Colonnes brutes vues par prepare_ml_dataset (hors cible)
+        self.input_columns: List[str] = []
+        # Statistiques ajustées par le dernier prepare_ml_dataset
+        self.training_statistics: Optional[FittedStatistics] = None
+        # Plan du dernier prepare_ml_dataset (None = chaîne complète)
+        self.transform_plan: Optional[TransformPlan] = None
         
-    def clean_employee_data(self, df: pd.DataFrame) -> pd.DataFrame:
+    @profiled
+    def clean_employee_data(self, df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
         """Nettoyer les données d'employés."""
-        df_clean = df.copy()
+        df_clean = _stage_frame(df, copy)
         
-        # Supprimer les doublons
-        initial_rows = len(df_clean)
-        df_clean = df_clean.drop_duplicates(subset=['employee_id'])
-        if len(df_clean) < initial_rows:
-            logger.info(f"Supprimé {initial_rows - len(df_clean)} doublons")
+        # Supprimer les doublons (sans recopier les lignes s'il n'y en a pas)
+        duplicated = df_clean.duplicated(subset=['employee_id'])
+        if duplicated.any():
+            df_clean = df_clean[~duplicated.to_numpy()]
+            logger.info(f"Supprimé {int(duplicated.sum())} doublons")
         
         # Valider les ranges
-        if 'creative_score' in df_clean.columns:
-            df_clean['creative_score'] = df_clean['creative_score'].clip(0, 100)
+        for col, (lower, upper) in VALUE_RANGES.items():
+            if col in df_clean.columns:
+                df_clean[col] = df_clean[col].clip(lower, upper)
         
-        if 'burnout_scale' in df_clean.columns:
-            df_clean['burnout_scale'] = df_clean['burnout_scale'].clip(1, 10)
-        
-        # Nettoyer les chaînes de caractères
-        string_cols = df_clean.select_dtypes(include=['object']).columns
+        # Nettoyer les chaînes de caractères (une fois par catégorie pour
+        # les colonnes 'category')
+        string_cols = df_clean.select_dtypes(include=CATEGORICAL_DTYPES).columns
         for col in string_cols:
-            if col != 'employee_id':
+            if col == 'employee_id':
+                continue
+            if isinstance(df_clean[col].dtype, pd.CategoricalDtype):
+                known = self.statistics.categories.get(col) if self.statistics is not None else None
+                df_clean[col] = _clean_categories(df_clean[col], known)
+            else:
                 df_clean[col] = df_clean[col].str.strip().str.lower()
         
         return df_clean
     
-    def handle_missing_values(self, df: pd.DataFrame, strategy: str = 'auto') -> pd.DataFrame:
+    @profiled
+    def handle_missing_values(self, df: pd.DataFrame, strategy: str = 'auto',
+                              copy: bool = True) -> pd.DataFrame:
         """Gérer les valeurs manquantes."""
-        df_imputed = df.copy()
+        df_imputed = _stage_frame(df, copy)
         
         # Séparer les colonnes numériques et catégorielles
         numeric_cols = df_imputed.select_dtypes(include=[np.number]).columns
-        categorical_cols = df_imputed.select_dtypes(include=['object']).columns
+        categorical_cols = df_imputed.select_dtypes(include=CATEGORICAL_DTYPES).columns
+        
+        if self.statistics is not None:
+            return self._apply_imputation(df_imputed, numeric_cols, categorical_cols)
         
-        # Imputation numérique
+        # Imputation numérique (une colonne entièrement vide, par ex. dans un
+        # chunk, est conservée et remplie de 0 au lieu d'être supprimée)
         if len(numeric_cols) > 0:
             if strategy == 'auto':
-                # KNN pour les petits datasets, median pour les gros
-                if len(df_imputed) < 1000:
-                    imputer = KNNImputer(n_neighbors=5)
-                    imputer_name = 'knn_numeric'
-                else:
-                    imputer = SimpleImputer(strategy='median')
-                    imputer_name = 'median_numeric'
+                # Plus proches voisins sur KD-tree, quelle que soit la taille
+                imputer = NeighborImputer(max_donors=NEIGHBOR_IMPUTATION_MAX_DONORS)
+                imputer.fit(df_imputed[numeric_cols], df_imputed.get('employee_id'))
+                imputer_name = 'neighbor_numeric'
+            elif strategy == 'knn':
+                # KNN exact (distances deux à deux) : petits datasets seulement
+                imputer = KNNImputer(n_neighbors=5, keep_empty_features=True).fit(df_imputed[numeric_cols])
+                imputer_name = 'knn_numeric'
             else:
-                imputer = SimpleImputer(strategy=strategy)
+                imputer = SimpleImputer(strategy=strategy, keep_empty_features=True).fit(df_imputed[numeric_cols])
                 imputer_name = f'{strategy}_numeric'
             
-            df_imputed[numeric_cols] = imputer.fit_transform(df_imputed[numeric_cols])
+            if isinstance(imputer, SimpleImputer):
+                # Remplissage colonne par colonne, sans matrice transformée
+                for col, value in zip(numeric_cols, imputer.statistics_):
+                    df_imputed[col] = df_imputed[col].astype(np.float64).fillna(value)
+            else:
+                _assign_imputed(df_imputed, numeric_cols, imputer.transform(df_imputed[numeric_cols]))
             self.imputers[imputer_name] = imputer
         
-        # Imputation catégorielle
-        if len(categorical_cols) > 0:
-            imputer = SimpleImputer(strategy='most_frequent')
-            df_imputed[categorical_cols] = imputer.fit_transform(df_imputed[categorical_cols])
+        # Imputation catégorielle ('category' : mode lu sur les codes, à
+        # égalité la plus petite valeur comme SimpleImputer)
+        category_cols = [col for col in categorical_cols if isinstance(df_imputed[col].dtype, pd.CategoricalDtype)]
+        for col in category_cols:
+            counts = np.bincount(df_imputed[col].cat.codes.to_numpy() + 1)[1:]
+            if counts.any():
+                df_imputed[col] = _fill_category(df_imputed[col], df_imputed[col].cat.categories[counts.argmax()])
+        
+        object_cols = categorical_cols.difference(category_cols, sort=False)
+        if len(object_cols) > 0:
+            imputer = SimpleImputer(strategy='most_frequent', keep_empty_features=True)
+            df_imputed[object_cols] = imputer.fit_transform(df_imputed[object_cols])
             self.imputers['mode_categorical'] = imputer
         
         return df_imputed
     
-    def engineer_features(self, df: pd.DataFrame) -> pd.DataFrame:
+    @profiled
+    def engineer_features(self, df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
         """Créer des features dérivées."""
-        df_features = df.copy()
+        df_features = _stage_frame(df, copy)
         
         # Features de ratio
         if 'creative_score' in df_features.columns and 'burnout_scale' in df_features.columns:
@@ -88,43 +330,73 @@ class DataProcessor:
             )
         
         # Features binaires basées sur quantiles
-        numeric_cols = ['creative_score', 'burnout_scale']
-        for col in numeric_cols:
+        for col in FEATURE_QUANTILE_COLUMNS:
             if col in df_features.columns:
-                q75 = df_features[col].quantile(0.75)
-                q25 = df_features[col].quantile(0.25)
+                if self.statistics is not None:
+                    q25, q75 = self.statistics.feature_quantiles[col]
+                else:
+                    q75 = df_features[col].quantile(0.75)
+                    q25 = df_features[col].quantile(0.25)
                 df_features[f'{col}_high'] = (df_features[col] > q75).astype(int)
                 df_features[f'{col}_low'] = (df_features[col] < q25).astype(int)
         
         # Features d'interaction
         if 'department' in df_features.columns and 'creative_score' in df_features.columns:
-            dept_creativity = df_features.groupby('department')['creative_score'].transform('mean')
+            if self.statistics is not None:
+                # Département inconnu lors de l'ajustement : moyenne globale
+                dept_creativity = (
+                    df_features['department'].map(self.statistics.department_means)
+                    .astype(float).fillna(self.statistics.creative_score_mean)
+                )
+            else:
+                dept_creativity = df_features.groupby('department')['creative_score'].transform('mean')
             df_features['creativity_vs_dept_avg'] = (
                 df_features['creative_score'] - dept_creativity
             )
         
         # Features temporelles (si date disponible)
         if 'hire_date' in df_features.columns:
-            df_features['hire_date'] = pd.to_datetime(df_features['hire_date'])
+            hire_date = df_features['hire_date']
+            if isinstance(hire_date.dtype, pd.CategoricalDtype):
+                # Une conversion par catégorie, puis lecture des codes
+                dates = pd.to_datetime(hire_date.cat.categories)
+                df_features['hire_date'] = pd.Series(
+                    dates.take(hire_date.cat.codes.to_numpy(), allow_fill=True), index=hire_date.index
+                )
+            else:
+                df_features['hire_date'] = pd.to_datetime(hire_date)
+            now = pd.Timestamp.now()
+            if self.statistics is not None and self.statistics.reference_time is not None:
+                now = self.statistics.reference_time
             df_features['tenure_years'] = (
-                (pd.Timestamp.now() - df_features['hire_date']).dt.days / 365.25
+                (now - df_features['hire_date']).dt.days / 365.25
             )
             df_features['hire_month'] = df_features['hire_date'].dt.month
             df_features['hire_quarter'] = df_features['hire_date'].dt.quarter
         
         return df_features
     
+    @profiled
     def encode_categorical_variables(self, df: pd.DataFrame, 
-                                   method: str = 'label') -> pd.DataFrame:
+                                   method: str = 'label', copy: bool = True) -> pd.DataFrame:
         """Encoder les variables catégorielles."""
-        df_encoded = df.copy()
-        categorical_cols = df_encoded.select_dtypes(include=['object']).columns
+        df_encoded = _stage_frame(df, copy)
+        categorical_cols = df_encoded.select_dtypes(include=CATEGORICAL_DTYPES).columns
         
         for col in categorical_cols:
             if col == 'employee_id':  # Garder l'ID original
                 continue
                 
-            if method == 'label':
+            if method == 'label' and self.statistics is not None:
+                # Catégorie inconnue lors de l'ajustement : -1
+                df_encoded[f'{col}_encoded'] = _category_codes(df_encoded[col], self.statistics.categories[col])
+            elif method == 'label' and isinstance(df_encoded[col].dtype, pd.CategoricalDtype):
+                # Codes des catégories triées et présentes : ceux de LabelEncoder
+                encoder = LabelEncoder()
+                encoder.classes_ = np.array(sorted(df_encoded[col].dropna().unique().tolist()), dtype=object)
+                df_encoded[f'{col}_encoded'] = _category_codes(df_encoded[col], encoder.classes_)
+                self.encoders[col] = encoder
+            elif method == 'label':
                 encoder = LabelEncoder()
                 df_encoded[f'{col}_encoded'] = encoder.fit_transform(df_encoded[col])
                 self.encoders[col] = encoder
@@ -136,10 +408,11 @@ class DataProcessor:
         
         return df_encoded
     
+    @profiled
     def scale_numerical_features(self, df: pd.DataFrame, 
-                                method: str = 'standard') -> pd.DataFrame:
+                                method: str = 'standard', copy: bool = True) -> pd.DataFrame:
         """Normaliser les features numériques."""
-        df_scaled = df.copy()
+        df_scaled = _stage_frame(df, copy)
         
         # Identifier les colonnes à scaler (exclure les binaires et l'ID)
         numeric_cols = df_scaled.select_dtypes(include=[np.number]).columns
@@ -160,43 +433,390 @@ class DataProcessor:
         
         return df_scaled
     
+    @profiled
     def detect_outliers(self, df: pd.DataFrame, 
-                       method: str = 'iqr') -> Dict[str, List]:
-        """Détecter les outliers."""
-        outliers = {}
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
+                       method: str = 'iqr') -> Dict[str, np.ndarray]:
+        """Détecter les outliers des colonnes numériques.
         
-        for col in numeric_cols:
-            if method == 'iqr':
-                Q1 = df[col].quantile(0.25)
-                Q3 = df[col].quantile(0.75)
-                IQR = Q3 - Q1
-                lower_bound = Q1 - 1.5 * IQR
-                upper_bound = Q3 + 1.5 * IQR
-                outlier_mask = (df[col] < lower_bound) | (df[col] > upper_bound)
+        Renvoie un masque booléen (aligné sur les lignes de ``df``) par
+        colonne ayant au moins un outlier. Les bornes de toutes les colonnes
+        sont calculées en un seul ``np.nanquantile`` sur la matrice des
+        colonnes numériques, ou lues dans les statistiques figées.
+        Méthodes : ``iqr``, ``zscore`` et ``mad`` (z-score modifié, robuste).
+        """
+        columns, values = _numeric_matrix(df)
+        lower, upper, _ = self._outlier_limits(columns, values, method)
+        
+        return self._outlier_masks(columns, values, lower, upper)
+    
+    @profiled
+    def cap_outliers(self, df: pd.DataFrame, outliers: Dict[str, np.ndarray],
+                     method: str = 'iqr') -> pd.DataFrame:
+        """Plafonner aux 1er/99e percentiles les colonnes où les outliers
+        sont rares (moins de ``OUTLIER_CAPPING_MAX_SHARE`` des lignes)."""
+        stats = self.statistics
+        if stats is not None:
+            columns = [col for col in stats.outlier_sketches if col in df.columns]
+        else:
+            columns = [col for col in outliers if col in df.columns]
+        columns, values = _numeric_matrix(df, columns)
+        _, _, caps = self._outlier_limits(columns, values, method, capping=True)
+        
+        return self._apply_caps(df, columns, caps, outliers, method)
+    
+    @profiled
+    def handle_outliers(self, df: pd.DataFrame,
+                        method: str = 'iqr') -> Tuple[pd.DataFrame, Dict[str, np.ndarray]]:
+        """Détecter puis plafonner les outliers en une passe.
+        
+        Équivalent à ``detect_outliers`` suivi de ``cap_outliers``, mais la
+        matrice numérique n'est extraite qu'une fois et les quantiles de
+        détection et de plafonnement sont calculés dans le même appel.
+        """
+        columns, values = _numeric_matrix(df)
+        lower, upper, caps = self._outlier_limits(columns, values, method, capping=True)
+        outliers = self._outlier_masks(columns, values, lower, upper)
+        
+        return self._apply_caps(df, columns, caps, outliers, method), outliers
+    
+    def _outlier_limits(self, columns: List[str], values: np.ndarray, method: str,
+                        capping: bool = False) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        """Bornes de détection (inférieure, supérieure) de chaque colonne et,
+        si ``capping``, percentiles de plafonnement (tableau 2 x colonnes)."""
+        if method not in OUTLIER_METHODS:
+            raise ValueError(f"Méthode de détection des outliers non supportée: {method}")
+        
+        n_columns = len(columns)
+        lower = np.full(n_columns, -np.inf)
+        upper = np.full(n_columns, np.inf)
+        caps = np.full((len(OUTLIER_CAPPING_QUANTILES), n_columns), np.nan) if capping else None
+        
+        stats = self.statistics
+        frozen = np.array([stats is not None and col in stats.outlier_sketches for col in columns], dtype=bool)
+        for j in np.flatnonzero(frozen):
+            lower[j], upper[j] = stats.outlier_bounds(columns[j], method)
+            if capping:
+                sketch = stats.outlier_sketches[columns[j]]
+                caps[:, j] = [sketch.quantile(q) for q in OUTLIER_CAPPING_QUANTILES]
+        
+        local = np.flatnonzero(~frozen)
+        if len(local) == 0 or len(values) == 0:
+            return lower, upper, caps
+        
+        data = values[:, local]
+        probabilities = {'iqr': [0.25, 0.75], 'mad': [0.5], 'zscore': []}[method]
+        if capping:
+            probabilities = probabilities + list(OUTLIER_CAPPING_QUANTILES)
+        
+        # Colonnes entièrement manquantes : bornes NaN, aucun outlier
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            quantiles = np.nanquantile(data, probabilities, axis=0) if probabilities else None
             
+            if method == 'iqr':
+                iqr = quantiles[1] - quantiles[0]
+                lower[local] = quantiles[0] - 1.5 * iqr
+                upper[local] = quantiles[1] + 1.5 * iqr
             elif method == 'zscore':
-                z_scores = np.abs((df[col] - df[col].mean()) / df[col].std())
-                outlier_mask = z_scores > 3
+                mean = np.nanmean(data, axis=0)
+                std = np.nanstd(data, axis=0, ddof=1)
+                lower[local] = mean - 3 * std
+                upper[local] = mean + 3 * std
+            else:
+                median = quantiles[0]
+                lower[local], upper[local] = _mad_bounds(median, np.nanmedian(np.abs(data - median), axis=0))
+        
+        if capping:
+            caps[:, local] = quantiles[-len(OUTLIER_CAPPING_QUANTILES):]
+        
+        return lower, upper, caps
+    
+    @staticmethod
+    def _outlier_masks(columns: List[str], values: np.ndarray,
+                       lower: np.ndarray, upper: np.ndarray) -> Dict[str, np.ndarray]:
+        """Masques des valeurs hors bornes, pour les colonnes concernées."""
+        masks = (values < lower) | (values > upper)
+        counts = masks.sum(axis=0)
+        
+        return {col: masks[:, j] for j, col in enumerate(columns) if counts[j]}
+    
+    def _apply_caps(self, df: pd.DataFrame, columns: List[str], caps: np.ndarray,
+                    outliers: Dict[str, np.ndarray], method: str) -> pd.DataFrame:
+        """Plafonner, dans ``df``, les colonnes dont les outliers sont rares."""
+        stats = self.statistics
+        for j, col in enumerate(columns):
+            if stats is not None and col in stats.outlier_sketches:
+                # Décision globale, y compris pour les chunks sans outlier
+                n_outliers, n_rows = stats.outlier_count(col, method), stats.n_rows
+            else:
+                n_outliers, n_rows = np.count_nonzero(outliers.get(col, ())), len(df)
+            
+            if 0 < n_outliers < n_rows * OUTLIER_CAPPING_MAX_SHARE:
+                df[col] = df[col].clip(caps[0, j], caps[1, j])
+        
+        return df
+    
+    @profiled
+    def fit_statistics(self, chunks: Callable[[], Iterable[pd.DataFrame]],
+                       strategy: str = 'auto', exact: bool = False,
+                       outliers: bool = True, target_columns: Iterable[str] = ()) -> FittedStatistics:
+        """Ajuster les statistiques globales de la chaîne de transformation.
+        
+        ``chunks`` renvoie à chaque appel un nouvel itérateur sur les mêmes
+        données, sans doublons d'``employee_id`` d'un chunk à l'autre.
+        
+        - Passe 1 : nettoyage, puis sketches des colonnes numériques
+          (médianes, quantiles), comptages des catégories (modes,
+          encodage), agrégats par département et, en mode ``'auto'``,
+          échantillon de donneurs du ``NeighborImputer``. Les quantiles et
+          moyennes après imputation par la médiane s'en déduisent sans
+          relire.
+        - Passe 1b (``'auto'`` uniquement) : nettoyage et imputation par
+          plus proches voisins, puis quantiles des features et moyennes
+          par département des données imputées.
+        - Passe 2 : nettoyage, imputation, features et encodage avec ces
+          statistiques figées, puis sketches des colonnes pour les outliers.
+        
+        Sous ``KNN_IMPUTATION_MAX_ROWS`` lignes, les données nettoyées sont
+        gardées en mémoire et les passes 1b et 2 ne relisent pas la source.
+        
+        Tolérance : les résultats sont identiques au traitement en mémoire
+        tant qu'une colonne compte au plus ``QuantileSketch.max_exact``
+        valeurs distinctes. Au-delà, les quantiles viennent d'un t-digest
+        (erreur de rang de l'ordre de 1e-3) : seules les lignes proches
+        d'un seuil (q25/q75, bornes IQR, p1/p99) peuvent différer.
+        
+        ``exact=True`` garde des sketches exacts quel que soit le nombre de
+        valeurs distinctes (mémoire proportionnelle aux données).
+        ``outliers=False`` saute la passe 2 : ``detect_outliers`` et
+        ``cap_outliers`` restent alors à appliquer sur les données complètes.
+        ``target_columns`` (cible d'entraînement) sont imputées par la
+        médiane et exclues des distances du ``NeighborImputer`` : elles
+        sont inconnues à l'inférence.
+        
+        Les statistiques sont ensuite appliquées par ``handle_missing_values``,
+        ``engineer_features``, ``encode_categorical_variables``,
+        ``detect_outliers`` et ``cap_outliers`` jusqu'à ``reset_statistics``.
+        """
+        if strategy not in ('auto', 'median'):
+            raise ValueError(f"Stratégie non supportée avec statistiques figées: {strategy}")
+        
+        self.statistics = None
+        stats = FittedStatistics(reference_time=pd.Timestamp.now())
+        max_exact = None if exact else QuantileSketch().max_exact
+        
+        numeric_sketches: Dict[str, QuantileSketch] = {}
+        category_counts: Dict[str, Counter] = {}
+        department_groups: Dict[Any, np.ndarray] = {}
+        buffer: Optional[List[pd.DataFrame]] = []
+        imputer = NeighborImputer(max_donors=NEIGHBOR_IMPUTATION_MAX_DONORS) if strategy == 'auto' else None
+        
+        # Passe 1 : statistiques des données nettoyées
+        for chunk in chunks():
+            clean = self.clean_employee_data(chunk)
+            stats.n_rows += len(clean)
+            
+            numeric_cols = clean.select_dtypes(include=[np.number]).columns
+            neighbor_cols = numeric_cols.difference(target_columns, sort=False)
+            if imputer is not None and len(neighbor_cols) > 0:
+                imputer.partial_fit(clean[neighbor_cols], clean.get('employee_id'))
+            for col in numeric_cols:
+                numeric_sketches.setdefault(col, QuantileSketch(max_exact=max_exact)).update(clean[col].to_numpy(dtype=np.float64, na_value=np.nan))
+            for col in clean.select_dtypes(include=CATEGORICAL_DTYPES).columns:
+                if col != 'employee_id':
+                    counts = clean[col].value_counts()
+                    category_counts.setdefault(col, Counter()).update(counts[counts > 0].to_dict())
+            
+            if 'department' in clean.columns and 'creative_score' in clean.columns:
+                groups = clean.groupby('department', dropna=False)['creative_score'].agg(['sum', 'count', 'size'])
+                for dept, row in groups.iterrows():
+                    key = None if pd.isna(dept) else dept
+                    totals = department_groups.setdefault(key, np.zeros(3))
+                    totals += row.to_numpy(dtype=np.float64)
+            
+            if buffer is not None:
+                buffer.append(clean)
+                if strategy != 'auto' or stats.n_rows >= KNN_IMPUTATION_MAX_ROWS:
+                    buffer = None
+        
+        # Imputation : médianes, modes (à égalité, la plus petite valeur comme
+        # SimpleImputer) et plus proches voisins en mode 'auto'
+        stats.medians = {
+            col: sketch.quantile(0.5) if sketch.count else 0.0
+            for col, sketch in numeric_sketches.items()
+        }
+        for col, counts in category_counts.items():
+            if counts:
+                top = max(counts.values())
+                stats.modes[col] = min(value for value, count in counts.items() if count == top)
+        
+        # Aucune colonne de distance (ex. plan sans feature numérique) : médiane
+        if imputer is not None and not imputer.columns:
+            imputer = None
+        if imputer is not None:
+            stats.knn_imputer = imputer
+            stats.knn_columns = imputer.columns
+        
+        if buffer is not None:
+            data = pd.concat(buffer)
+            
+            # Statistiques des features calculées sur les données imputées
+            self.statistics = stats
+            data = self.handle_missing_values(data, strategy, copy=False)
+            for col in FEATURE_QUANTILE_COLUMNS:
+                if col in data.columns:
+                    stats.feature_quantiles[col] = (data[col].quantile(0.25), data[col].quantile(0.75))
+            if 'department' in data.columns and 'creative_score' in data.columns:
+                stats.department_means = data.groupby('department')['creative_score'].mean().to_dict()
+                stats.creative_score_mean = data['creative_score'].mean()
+            stats.categories = {
+                col: sorted(data[col].dropna().unique().tolist())
+                for col in data.select_dtypes(include=CATEGORICAL_DTYPES).columns if col != 'employee_id'
+            }
+        elif imputer is not None:
+            # Passe 1b : features des données imputées par plus proches voisins
+            self.statistics = stats
+            feature_sketches = {
+                col: QuantileSketch(max_exact=max_exact) for col in FEATURE_QUANTILE_COLUMNS if col in numeric_sketches
+            }
+            imputed_groups: Dict[Any, np.ndarray] = {}
+            for chunk in chunks():
+                frame = self.handle_missing_values(self.clean_employee_data(chunk), strategy, copy=False)
+                for col, sketch in feature_sketches.items():
+                    sketch.update(frame[col].to_numpy(dtype=np.float64, na_value=np.nan))
+                if department_groups:
+                    groups = frame.groupby('department')['creative_score'].agg(['sum', 'count'])
+                    for dept, row in groups.iterrows():
+                        imputed_groups.setdefault(dept, np.zeros(2))
+                        imputed_groups[dept] += row.to_numpy(dtype=np.float64)
             
-            outlier_indices = df[outlier_mask].index.tolist()
-            if outlier_indices:
-                outliers[col] = outlier_indices
+            stats.feature_quantiles = {
+                col: (sketch.quantile(0.25), sketch.quantile(0.75)) for col, sketch in feature_sketches.items()
+            }
+            if imputed_groups:
+                stats.department_means = {dept: total / count for dept, (total, count) in imputed_groups.items()}
+                totals = np.sum(list(imputed_groups.values()), axis=0)
+                stats.creative_score_mean = totals[0] / totals[1]
+            stats.categories = {col: sorted(counts) for col, counts in category_counts.items()}
+        else:
+            # Après imputation par la médiane : masse ponctuelle des manquants
+            for col in FEATURE_QUANTILE_COLUMNS:
+                if col in numeric_sketches:
+                    sketch = QuantileSketch(max_exact=max_exact).merge(numeric_sketches[col])
+                    missing = stats.n_rows - sketch.count
+                    if missing:
+                        sketch.update([stats.medians[col]], weight=missing)
+                    stats.feature_quantiles[col] = (sketch.quantile(0.25), sketch.quantile(0.75))
+            
+            if department_groups:
+                median = stats.medians.get('creative_score', 0.0)
+                # Département manquant : imputé par le mode
+                orphan = department_groups.pop(None, None)
+                if orphan is not None and 'department' in stats.modes:
+                    department_groups.setdefault(stats.modes['department'], np.zeros(3))
+                    department_groups[stats.modes['department']] += orphan
+                
+                totals = np.zeros(2)
+                for dept, (total, observed, size) in department_groups.items():
+                    dept_sum = total + (size - observed) * median
+                    stats.department_means[dept] = dept_sum / size
+                    totals += (dept_sum, size)
+                stats.creative_score_mean = totals[0] / totals[1]
+            
+            stats.categories = {col: sorted(counts) for col, counts in category_counts.items()}
+        
+        # Passe 2 : statistiques des outliers sur les données transformées
+        self.statistics = stats
+        if not outliers:
+            logger.info(f"Statistiques ajustées sur {stats.n_rows} lignes (sans outliers)")
+            return stats
+        
+        frames = [data] if buffer is not None else (self.clean_employee_data(chunk) for chunk in chunks())
+        for frame in frames:
+            if buffer is None:
+                frame = self.handle_missing_values(frame, strategy, copy=False)
+            frame = self.encode_categorical_variables(self.engineer_features(frame, copy=False), copy=False)
+            for col in frame.select_dtypes(include=[np.number]).columns:
+                values = frame[col].to_numpy(dtype=np.float64, na_value=np.nan)
+                stats.outlier_sketches.setdefault(col, QuantileSketch(max_exact=max_exact)).update(values)
+                stats.outlier_moments.setdefault(col, RunningMoments()).update(values)
+        
+        logger.info(f"Statistiques ajustées sur {stats.n_rows} lignes "
+                    f"({len(stats.outlier_sketches)} colonnes numériques)")
         
-        return outliers
+        return stats
     
-    def prepare_ml_dataset(self, df: pd.DataFrame, 
-                          target_col: str) -> Tuple[pd.DataFrame, pd.Series]:
-        """Préparer le dataset pour le ML."""
-        # Pipeline complet
-        df_processed = self.clean_employee_data(df)
-        df_processed = self.handle_missing_values(df_processed)
-        df_processed = self.engineer_features(df_processed)
-        df_processed = self.encode_categorical_variables(df_processed)
+    def reset_statistics(self):
+        """Revenir à l'ajustement sur chaque DataFrame traité."""
+        self.statistics = None
+    
+    def _apply_imputation(self, df: pd.DataFrame, numeric_cols: pd.Index,
+                          categorical_cols: pd.Index) -> pd.DataFrame:
+        """Imputer avec les statistiques figées."""
+        stats = self.statistics
+        
+        if stats.knn_imputer is not None:
+            _assign_imputed(df, stats.knn_columns, stats.knn_imputer.transform(df[stats.knn_columns]))
+        for col in numeric_cols.difference(stats.knn_columns, sort=False):
+            df[col] = df[col].astype(np.float64).fillna(stats.medians.get(col, 0.0))
+        
+        for col in categorical_cols:
+            if col in stats.modes:
+                if isinstance(df[col].dtype, pd.CategoricalDtype):
+                    df[col] = _fill_category(df[col], stats.modes[col])
+                else:
+                    df[col] = df[col].fillna(stats.modes[col])
+        
+        return df
+    
+    @profiled
+    def prepare_ml_dataset(self, df: pd.DataFrame, target_col: str,
+                          feature_names: Optional[List[str]] = None) -> Tuple[pd.DataFrame, pd.Series]:
+        """Préparer le dataset pour le ML.
+        
+        Les statistiques sont ajustées une fois sur ``df`` et gardées dans
+        ``training_statistics``, dont ``export_transform`` tire l'artefact
+        sauvegardé avec le modèle. ``statistics`` retrouve ensuite sa valeur
+        précédente : les appels suivants des étapes ne réutilisent pas les
+        statistiques d'entraînement.
+        
+        Avec ``feature_names`` (par ex. ceux de ``model_metadata.json``),
+        la chaîne suit ``plan_transform`` : seules les colonnes sources
+        utiles sont lues et ajustées, les étapes qui ne produisent aucune
+        feature demandée sont sautées et ``X`` se limite à ``feature_names``,
+        avec les valeurs de la chaîne complète appliquée à ces colonnes.
+        """
+        plan = None
+        if feature_names is not None:
+            plan = plan_transform(feature_names, df.dtypes, target_col)
+            df = df[plan.source_columns]
+            logger.info(f"Plan de transformation: {len(plan.source_columns)} colonnes lues, "
+                        f"étapes {plan.methods}")
+        self.transform_plan = plan
+        
+        previous = self.statistics
+        try:
+            self.training_statistics = self.fit_statistics(
+                lambda: [df], exact=True, outliers=False, target_columns=[target_col]
+            )
+            self.input_columns = [col for col in df.columns if col != target_col]
+            
+            # Étapes du plan (toutes sans plan), sur une seule copie de df
+            df_processed = self.clean_employee_data(df)
+            df_processed = self.handle_missing_values(df_processed, copy=False)
+            if plan is None or 'engineer_features' in plan.methods:
+                df_processed = self.engineer_features(df_processed, copy=False)
+            if plan is None or 'encode_categorical_variables' in plan.methods:
+                df_processed = self.encode_categorical_variables(df_processed, copy=False)
+        finally:
+            self.statistics = previous
         
         # Séparer features et target
-        feature_cols = [col for col in df_processed.columns 
-                       if col not in ['employee_id', target_col]]
+        if plan is not None:
+            feature_cols = plan.feature_names
+        else:
+            feature_cols = [col for col in df_processed.columns 
+                           if col not in ['employee_id', target_col]]
         
         X = df_processed[feature_cols]
         y = df_processed[target_col]
@@ -207,60 +827,225 @@ class DataProcessor:
         logger.info(f"Dataset préparé: {X.shape[0]} échantillons, {X.shape[1]} features")
         
         return X, y
+    
+    def export_transform(self, feature_names: List[str]) -> FeatureTransform:
+        """Artefact figé produisant ``feature_names`` depuis les données brutes.
+        
+        À appeler après ``prepare_ml_dataset`` avec les features retenues
+        pour l'entraînement (numériques uniquement).
+        """
+        stats = self.training_statistics
+        if stats is None or not self.input_columns:
+            raise ValueError("Aucune statistique figée : appeler prepare_ml_dataset avant export_transform")
+        
+        scaler = self.scalers.get('standard')
+        scaled_columns = [
+            col for col in (getattr(scaler, 'feature_names_in_', []) if scaler is not None else [])
+            if col in feature_names
+        ]
+        positions = [list(scaler.feature_names_in_).index(col) for col in scaled_columns]
+        
+        transform = FeatureTransform(
+            feature_names=list(feature_names),
+            input_columns=list(self.input_columns),
+            numeric_columns=(list(stats.knn_columns) if stats.knn_imputer is not None
+                             else [col for col in stats.medians if col in self.input_columns]),
+            categorical_columns=[col for col in stats.categories if col in self.input_columns and col != 'employee_id'],
+            statistics=stats,
+            scaled_columns=scaled_columns,
+            scale_mean=scaler.mean_[positions] if scaled_columns else None,
+            scale_std=scaler.scale_[positions] if scaled_columns else None
+        )
+        # Échoue ici plutôt qu'à l'inférence si une feature n'est pas reproductible
+        transform.transform([{}])
+        
+        return transform
 
 def validate_data_quality(df: pd.DataFrame) -> Dict[str, Union[bool, float, int]]:
-    """Valider la qualité des données."""
-    quality_report = {
-        'total_rows': len(df),
-        'total_columns': len(df.columns),
-        'missing_values_pct': (df.isnull().sum().sum() / df.size) * 100,
-        'duplicate_rows': df.duplicated().sum(),
-        'duplicate_rows_pct': (df.duplicated().sum() / len(df)) * 100,
-        'numeric_columns': len(df.select_dtypes(include=[np.number]).columns),
-        'categorical_columns': len(df.select_dtypes(include=['object']).columns),
-        'memory_usage_mb': df.memory_usage(deep=True).sum() / 1024**2,
-        'data_quality_score': 0.0
-    }
-    
-    # Calculer un score de qualité
-    score = 100
-    score -= quality_report['missing_values_pct'] * 2  # -2 points par % manquant
-    score -= quality_report['duplicate_rows_pct'] * 3  # -3 points par % dupliqué
-    quality_report['data_quality_score'] = max(0, min(100, score))
-    
-    return quality_report
+    """Valider la qualité des données (profil en une passe, mis en cache)."""
+    return profile_data(df).quality_report()
 
 def create_data_profile(df: pd.DataFrame) -> pd.DataFrame:
-    """Créer un profil détaillé des données."""
-    profile = []
-    
-    for col in df.columns:
-        col_info = {
-            'column': col,
-            'dtype': str(df[col].dtype),
-            'non_null_count': df[col].count(),
-            'null_count': df[col].isnull().sum(),
-            'null_percentage': (df[col].isnull().sum() / len(df)) * 100,
-            'unique_count': df[col].nunique(),
-            'unique_percentage': (df[col].nunique() / len(df)) * 100
-        }
-        
-        if df[col].dtype in ['int64', 'float64']:
-            col_info.update({
-                'mean': df[col].mean(),
-                'median': df[col].median(),
-                'std': df[col].std(),
-                'min': df[col].min(),
-                'max': df[col].max(),
-                'skewness': df[col].skew(),
-                'kurtosis': df[col].kurtosis()
-            })
-        else:
-            col_info.update({
-                'most_frequent': df[col].mode().iloc[0] if not df[col].mode().empty else None,
-                'most_frequent_count': df[col].value_counts().iloc[0] if len(df[col].value_counts()) > 0 else 0
-            })
-        
-        profile.append(col_info)
+    """Créer un profil détaillé des données (profil en une passe, mis en cache)."""
+    return profile_data(df).to_frame()
+
+def plan_transform(feature_names: Iterable[str], dtypes: pd.Series,
+                   target_col: Optional[str] = None) -> TransformPlan:
+    """Plan de ``prepare_ml_dataset`` produisant seulement ``feature_names``.
+    
+    ``dtypes`` décrit les colonnes brutes (``df.dtypes``, ou celui d'un
+    échantillon du fichier source). Les étapes déclarées sont parcourues
+    de la dernière à la première : une étape est gardée si elle produit
+    une colonne requise, et ses entrées deviennent requises.
+    
+    Les distances du ``NeighborImputer`` ne portent que sur les colonnes
+    numériques retenues : le plan équivaut à la chaîne complète appliquée
+    à ``df[source_columns]``, et l'artefact exporté n'attend à
+    l'inférence que ces colonnes.
+    """
+    feature_names = list(feature_names)
+    stages = _declare_stages(dtypes)
+    
+    produced = {name for stage in stages for name in stage.outputs}
+    unknown = [name for name in feature_names if name not in produced]
+    if unknown:
+        raise ValueError(f"Features non reproductibles: {unknown}")
+    
+    required = set(feature_names) | {'employee_id'}
+    if target_col is not None:
+        required.add(target_col)
+    kept = []
+    for stage in reversed(stages):
+        if required.intersection(stage.outputs):
+            kept.append(stage)
+            required.update(stage.inputs)
+    
+    return TransformPlan(
+        feature_names=feature_names,
+        source_columns=[col for col in dtypes.index if col in required],
+        stages=kept[::-1]
+    )
+
+def _declare_stages(dtypes: pd.Series) -> List[TransformStage]:
+    """Étapes de ``prepare_ml_dataset`` sur des colonnes brutes de types
+    ``dtypes``, dans l'ordre d'exécution (cf. les méthodes de
+    ``DataProcessor``)."""
+    columns = list(dtypes.index)
+    # Doublons et tirage des donneurs du NeighborImputer sur employee_id
+    key = ('employee_id',) if 'employee_id' in columns else ()
+    text = [
+        col for col, dtype in dtypes.items()
+        if col != 'employee_id' and (isinstance(dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(dtype))
+    ]
+    
+    stages = [TransformStage('clean_employee_data', (col,) + key, (col,)) for col in columns]
+    stages += [TransformStage('handle_missing_values', (col,) + key, (col,)) for col in columns]
+    
+    derived = []
+    if 'creative_score' in columns and 'burnout_scale' in columns:
+        derived.append((('creative_score', 'burnout_scale'), ('creativity_burnout_ratio',)))
+    for col in FEATURE_QUANTILE_COLUMNS:
+        if col in columns:
+            derived.append(((col,), (f'{col}_high', f'{col}_low')))
+    if 'department' in columns and 'creative_score' in columns:
+        derived.append((('department', 'creative_score'), ('creativity_vs_dept_avg',)))
+    if 'hire_date' in columns:
+        derived.append((('hire_date',), ('tenure_years', 'hire_month', 'hire_quarter')))
+    stages += [TransformStage('engineer_features', inputs, outputs) for inputs, outputs in derived]
+    
+    # hire_date est converti en date par engineer_features : pas d'encodage
+    stages += [
+        TransformStage('encode_categorical_variables', (col,), (f'{col}_encoded',))
+        for col in text if col != 'hire_date'
+    ]
+    
+    return stages
+
+def _copy_on_write() -> bool:
+    """Copy-on-write actif (toujours à partir de pandas 3)."""
+    if int(pd.__version__.split('.')[0]) >= 3:
+        return True
+    return pd.get_option('mode.copy_on_write') is True
+
+def _stage_frame(df: pd.DataFrame, copy: bool) -> pd.DataFrame:
+    """Frame modifiée par une étape : ``df`` lui-même, une copie paresseuse
+    sous copy-on-write (seules les colonnes modifiées sont recopiées) ou une
+    copie profonde."""
+    if not copy:
+        return df
+    return df.copy(deep=not _copy_on_write())
+
+def _assign_imputed(df: pd.DataFrame, columns: Iterable[str], values: np.ndarray):
+    """Reporter dans ``df`` la matrice imputée ``values`` (float64).
+    
+    Seules les colonnes avec des manquants ou d'un autre dtype sont
+    remplacées : les autres gardent leurs données (partagées sous
+    copy-on-write).
+    """
+    for j, col in enumerate(columns):
+        if df[col].dtype != np.float64 or df[col].hasnans:
+            df[col] = np.ascontiguousarray(values[:, j])
+
+def _numeric_matrix(df: pd.DataFrame,
+                    columns: Optional[List[str]] = None) -> Tuple[List[str], np.ndarray]:
+    """Colonnes numériques de ``df`` et leur matrice float64 (NaN pour les
+    valeurs manquantes), extraite en une copie."""
+    numeric = df.select_dtypes(include=[np.number]).columns
+    if columns is not None:
+        numeric = [col for col in columns if col in numeric]
+    numeric = list(numeric)
+    
+    return numeric, df[numeric].to_numpy(dtype=np.float64, na_value=np.nan)
+
+def _mad_bounds(median, mad) -> Tuple[Any, Any]:
+    """Bornes du z-score modifié ; un MAD nul (colonne quasi constante)
+    ne désigne aucun outlier."""
+    radius = np.where(np.asarray(mad) > 0, MAD_OUTLIER_THRESHOLD / 0.6745 * np.asarray(mad), np.inf)
+    
+    return median - radius, median + radius
+
+def categorize_columns(df: pd.DataFrame, max_distinct_ratio: float = CATEGORY_MAX_DISTINCT_RATIO,
+                       exclude: Iterable[str] = ('employee_id',)) -> List[str]:
+    """Convertir en ``category`` les colonnes texte peu variées de ``df``.
+    
+    Une colonne de chaînes est convertie si son nombre de valeurs
+    distinctes ne dépasse pas ``max_distinct_ratio`` fois le nombre de
+    lignes : chaque valeur est alors stockée une fois, les lignes ne
+    portant qu'un code entier. Le nettoyage, l'imputation et l'encodage
+    de ``DataProcessor`` travaillent ensuite sur les catégories. Renvoie
+    les colonnes converties (``df`` est modifié).
+    """
+    converted = []
+    for col in df.select_dtypes(include=['object']).columns:
+        if col in exclude or pd.api.types.infer_dtype(df[col], skipna=True) != 'string':
+            continue
+        if df[col].nunique() <= max_distinct_ratio * len(df):
+            df[col] = df[col].astype('category')
+            converted.append(col)
+    
+    return converted
+
+def _clean_categories(series: pd.Series, known: Optional[List[Any]] = None) -> pd.Series:
+    """``.str.strip().str.lower()`` appliqué aux catégories puis recodé.
+    
+    Les catégories devenues identiques sont fusionnées et les catégories
+    absentes retirées (triées comme ``LabelEncoder``). Avec ``known``
+    (catégories figées), les catégories sont ``known`` suivies des valeurs
+    inconnues : tous les chunks partagent alors le même dtype.
+    """
+    categories = series.cat.categories
+    if categories.inferred_type != 'string':
+        return series
+    
+    cleaned = categories.str.strip().str.lower()
+    codes = series.cat.codes.to_numpy()
+    present = np.zeros(len(categories), dtype=bool)
+    present[codes[codes >= 0]] = True
+    
+    used = cleaned[present].unique().sort_values()
+    if known is not None:
+        used = pd.Index(known).append(used.difference(known, sort=True))
+    
+    recode = used.get_indexer(cleaned)
+    new_codes = np.where(codes >= 0, recode[codes], -1)
+    
+    return pd.Series(pd.Categorical.from_codes(new_codes, categories=used), index=series.index, name=series.name)
+
+def _fill_category(series: pd.Series, value: Any) -> pd.Series:
+    """``fillna`` d'une colonne ``category``, en ajoutant la valeur au besoin."""
+    if not series.hasnans:
+        return series
+    if value not in series.cat.categories:
+        series = series.cat.add_categories([value])
+    return series.fillna(value)
+
+def _category_codes(series: pd.Series, categories: Iterable[Any]) -> np.ndarray:
+    """Position de chaque valeur dans ``categories`` (-1 si absente), lue sur
+    les catégories d'une colonne ``category`` plutôt que ligne par ligne."""
+    categories = pd.Index(list(categories))
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        recode = np.append(categories.get_indexer(series.cat.categories), -1)
+        return recode[codes].astype(np.int64)
     
-    return pd.DataFrame(profile)
+    return categories.get_indexer(series).astype(np.int64)
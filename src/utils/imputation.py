@@ -0,0 +1,141 @@
+"""
+Imputation par plus proches voisins sur index spatial.
+
+``NeighborImputer`` remplace ``KNNImputer`` (distances deux à deux, coût
+quadratique) par des requêtes sur des KD-trees construits sur un
+échantillon de donneurs : coût en O(n log m) pour n lignes à imputer et m
+donneurs, mémoire bornée par ``max_donors`` quelle que soit la taille des
+données.
+"""
+
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import KDTree
+
+class NeighborImputer:
+    """Imputation des colonnes numériques par la moyenne des k plus proches voisins.
+
+    Les donneurs sont les lignes complètes d'un échantillon de ``max_donors``
+    lignes choisies par plus petite empreinte de clé (``employee_id``) :
+    l'échantillon, donc l'imputation, ne dépend ni du découpage en chunks
+    ni de l'ordre d'arrivée (``partial_fit`` chunk par chunk équivaut à
+    ``fit`` sur l'ensemble). Les distances sont euclidiennes sur les
+    colonnes observées de la ligne, centrées-réduites par la moyenne et
+    l'écart-type des donneurs ; un KD-tree est construit (puis gardé) par
+    motif de valeurs manquantes.
+
+    Une ligne sans aucune colonne observée, ou des données avec moins de
+    ``n_neighbors`` donneurs, est imputée par les médianes des donneurs.
+    Une colonne entièrement vide est remplie de 0 (comme
+    ``keep_empty_features=True``).
+    """
+
+    def __init__(self, n_neighbors: int = 5, max_donors: int = 50000, batch_size: int = 10000):
+        self.n_neighbors = n_neighbors
+        self.max_donors = max_donors
+        self.batch_size = batch_size
+        self.columns: List[str] = []
+        self.n_rows = 0
+        self._priorities = np.empty(0, dtype=np.uint64)
+        self._sample = np.empty((0, 0))
+        self._trees: Dict[Tuple[bool, ...], KDTree] = {}
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # Les KD-trees se reconstruisent à la demande
+        state['_trees'] = {}
+        return state
+
+    def fit(self, X: pd.DataFrame, keys: Optional[pd.Series] = None) -> "NeighborImputer":
+        """Ajuster sur ``X`` (colonnes numériques) ; ``keys`` identifie les lignes."""
+        self.columns = []
+        self.n_rows = 0
+        self._priorities = np.empty(0, dtype=np.uint64)
+        self._sample = np.empty((0, 0))
+
+        return self.partial_fit(X, keys)
+
+    def partial_fit(self, X: pd.DataFrame, keys: Optional[pd.Series] = None) -> "NeighborImputer":
+        """Ajouter un chunk à l'échantillon de donneurs.
+
+        Sans ``keys``, l'empreinte porte sur les valeurs de la ligne.
+        """
+        if not self.columns:
+            self.columns = list(X.columns)
+        values = X[self.columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        hashed = keys if keys is not None else X[self.columns]
+        priorities = pd.util.hash_pandas_object(hashed, index=False).to_numpy()
+
+        self.n_rows += len(values)
+        priorities = np.concatenate([self._priorities, priorities])
+        sample = np.vstack([self._sample.reshape(-1, len(self.columns)), values])
+
+        # Plus petites empreintes, triées : même échantillon quel que soit l'ordre
+        order = np.argsort(priorities, kind='stable')[:self.max_donors]
+        self._priorities = priorities[order]
+        self._sample = sample[order]
+        self._finalize()
+
+        return self
+
+    def transform(self, X: Union[pd.DataFrame, np.ndarray]) -> np.ndarray:
+        """Valeurs imputées (tableau de la forme de ``X[columns]``)."""
+        values = X[self.columns] if isinstance(X, pd.DataFrame) else X
+        values = np.array(values, dtype=np.float64)
+        if values.ndim == 1:
+            return self.transform(values.reshape(1, -1))[0]
+
+        missing = np.isnan(values)
+        incomplete = np.flatnonzero(missing.any(axis=1))
+        if len(incomplete) == 0:
+            return values
+
+        scaled = (values[incomplete] - self._center) / self._scale
+        patterns, inverse = np.unique(missing[incomplete], axis=0, return_inverse=True)
+
+        for pattern_id, pattern in enumerate(patterns):
+            rows = np.flatnonzero(inverse.ravel() == pattern_id)
+            observed = ~pattern & self._donor_columns
+            targets = incomplete[rows]
+
+            if not observed.any() or len(self._donors) < self.n_neighbors:
+                values[np.ix_(targets, pattern)] = self._fill_values[pattern]
+                continue
+
+            tree = self._tree(tuple(observed))
+            for start in range(0, len(rows), self.batch_size):
+                batch = slice(start, start + self.batch_size)
+                _, neighbors = tree.query(scaled[rows[batch]][:, observed], k=self.n_neighbors)
+                imputed = self._donors[neighbors].mean(axis=1)
+                values[np.ix_(targets[batch], pattern)] = imputed[:, pattern]
+
+        return values
+
+    def fit_transform(self, X: pd.DataFrame, keys: Optional[pd.Series] = None) -> np.ndarray:
+        return self.fit(X, keys).transform(X)
+
+    def _finalize(self):
+        """Donneurs, normalisation et valeurs de repli de l'échantillon courant."""
+        # Colonnes jamais observées : hors distances, remplies de 0
+        self._donor_columns = ~np.isnan(self._sample).all(axis=0)
+        sample = np.where(self._donor_columns, self._sample, 0.0)
+        self._donors = sample[~np.isnan(sample).any(axis=1)]
+
+        if len(self._donors):
+            self._center = self._donors.mean(axis=0)
+            scale = self._donors.std(axis=0)
+            self._scale = np.where(scale > 0, scale, 1.0)
+        else:
+            self._center = np.zeros(len(self.columns))
+            self._scale = np.ones(len(self.columns))
+        self._fill_values = np.nan_to_num(np.nanmedian(sample, axis=0)) if len(sample) else np.zeros(len(self.columns))
+        self._trees = {}
+
+    def _tree(self, observed: Tuple[bool, ...]) -> KDTree:
+        """KD-tree des donneurs sur les colonnes observées d'un motif."""
+        if observed not in self._trees:
+            mask = np.array(observed)
+            self._trees[observed] = KDTree((self._donors[:, mask] - self._center[mask]) / self._scale[mask])
+        return self._trees[observed]
@@ -0,0 +1,261 @@
+"""
+Instrumentation des étapes du pipeline ETL.
+
+``StageProfiler`` mesure chaque étape (durée murale et CPU, lignes et octets
+en entrée et en sortie, pic mémoire) et agrège les mesures par chemin
+d'appel : ``run_full_pipeline;transform_employee_data;handle_missing_values``.
+Les étapes imbriquées forment un arbre exportable en JSON, au format texte
+Prometheus ou en résumé de type flame graph.
+"""
+
+import functools
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - indisponible sous Windows
+    resource = None
+
+MB = 1024 ** 2
+
+def _rss_peak_bytes() -> Optional[int]:
+    """Pic de mémoire résidente du processus depuis son démarrage."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss est en kilo-octets sous Linux, en octets sous macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+class StageProbe:
+    """Mesures d'un appel d'étape en cours."""
+
+    def __init__(self, profiler: "StageProfiler", path: str, inputs: Any):
+        self.profiler = profiler
+        self.path = path
+        self.rows_in, self.bytes_in = profiler._frame_size(inputs)
+        self.rows_out = self.bytes_out = None
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+        self.start_traced = 0
+        self.peak_traced = 0
+
+    def output(self, result: Any):
+        """Enregistrer le résultat de l'étape (DataFrame ou tuple en contenant un)."""
+        if isinstance(result, tuple):
+            result = next((item for item in result if isinstance(item, pd.DataFrame)), None)
+        self.rows_out, self.bytes_out = self.profiler._frame_size(result)
+
+class StageProfiler:
+    """Profileur d'étapes agrégé par chemin d'appel.
+
+    Chaque thread a sa propre pile d'étapes. ``memory=True`` active
+    ``tracemalloc`` (pic d'allocation Python par étape) et la taille
+    mémoire profonde des DataFrames : plus précis, mais nettement plus lent.
+    Le temps CPU est celui de tout le processus (threads compris, hors
+    processus enfants).
+    """
+
+    def __init__(self, memory: bool = False):
+        self.memory = memory
+        self.stages: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._started_tracing = False
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock'], state['_local']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextmanager
+    def stage(self, name: str, inputs: Any = None) -> Iterator[StageProbe]:
+        """Mesurer un bloc ; ``inputs`` est le DataFrame d'entrée éventuel."""
+        stack = self._stack()
+        path = f"{stack[-1].path};{name}" if stack else name
+
+        with self._lock:
+            if path not in self.stages:
+                self.stages[path] = {
+                    'path': path, 'stage': name, 'depth': len(stack), 'calls': 0, 'errors': 0,
+                    'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'rows_in': None, 'rows_out': None,
+                    'bytes_in': None, 'bytes_out': None, 'peak_memory_bytes': None,
+                    'rss_peak_bytes': None
+                }
+
+        if self.memory and not stack and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+        probe = StageProbe(self, path, inputs)
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            if stack:
+                # Le pic du parent avant cette étape serait perdu par reset_peak
+                stack[-1].peak_traced = max(stack[-1].peak_traced, peak)
+            tracemalloc.reset_peak()
+            probe.start_traced = probe.peak_traced = current
+
+        stack.append(probe)
+        failed = False
+        try:
+            yield probe
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            stack.pop()
+            self._record(probe, stack[-1] if stack else None, failed)
+            if self._started_tracing and not stack:
+                tracemalloc.stop()
+                self._started_tracing = False
+
+    def as_dict(self) -> List[Dict]:
+        """Mesures agrégées par chemin, dans l'ordre du premier appel (JSON)."""
+        with self._lock:
+            return [dict(record) for record in self.stages.values()]
+
+    def to_prometheus(self, prefix: str = "ubisoft_etl") -> str:
+        """Mesures au format texte d'exposition Prometheus."""
+        metrics = [
+            ('stage_calls_total', 'calls', 'counter', "Nombre d'appels de l'étape"),
+            ('stage_errors_total', 'errors', 'counter', "Nombre d'appels de l'étape en échec"),
+            ('stage_wall_seconds', 'wall_seconds', 'gauge', "Durée murale cumulée de l'étape"),
+            ('stage_cpu_seconds', 'cpu_seconds', 'gauge', "Temps CPU cumulé du processus pendant l'étape"),
+            ('stage_rows_in', 'rows_in', 'gauge', "Lignes reçues par l'étape"),
+            ('stage_rows_out', 'rows_out', 'gauge', "Lignes produites par l'étape"),
+            ('stage_bytes_in', 'bytes_in', 'gauge', "Taille mémoire des DataFrames reçus"),
+            ('stage_bytes_out', 'bytes_out', 'gauge', "Taille mémoire des DataFrames produits"),
+            ('stage_peak_memory_bytes', 'peak_memory_bytes', 'gauge', "Pic d'allocation Python pendant l'étape"),
+            ('stage_rss_peak_bytes', 'rss_peak_bytes', 'gauge', "Pic de mémoire résidente à la fin de l'étape")
+        ]
+        records = self.as_dict()
+        lines = []
+
+        for suffix, key, metric_type, description in metrics:
+            samples = [record for record in records if record[key] is not None]
+            if not samples:
+                continue
+            name = f"{prefix}_{suffix}"
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for record in samples:
+                labels = f'stage="{_escape_label(record["stage"])}",path="{_escape_label(record["path"])}"'
+                lines.append(f"{name}{{{labels}}} {record[key]}")
+
+        return "\n".join(lines) + "\n"
+
+    def format_summary(self, width: int = 30) -> str:
+        """Résumé arborescent de type flame graph (durées inclusives)."""
+        records = self.as_dict()
+        if not records:
+            return "Aucune étape mesurée"
+
+        total = sum(record['wall_seconds'] for record in records if record['depth'] == 0) or 1.0
+        lines = [f"{'étape':<48} {'appels':>6} {'mur (s)':>9} {'cpu (s)':>9} {'%':>6}  "
+                 f"{'lignes':>21} {'pic MB':>8}"]
+
+        for record in self._tree_order(records):
+            share = record['wall_seconds'] / total
+            rows = (f"{_format_count(record['rows_in'])} → {_format_count(record['rows_out'])}"
+                    if record['rows_in'] is not None or record['rows_out'] is not None else "")
+            peak = record['peak_memory_bytes']
+            peak = f"{peak / MB:8.1f}" if peak is not None else f"{'':>8}"
+            label = ("  " * record['depth'] + record['stage'])[:48]
+            lines.append(f"{label:<48} {record['calls']:>6} {record['wall_seconds']:>9.3f} "
+                         f"{record['cpu_seconds']:>9.3f} {share:>6.1%}  {rows:>21} {peak}  "
+                         f"{'█' * max(1, round(share * width))}")
+
+        return "\n".join(lines)
+
+    def reset(self):
+        """Effacer les mesures."""
+        with self._lock:
+            self.stages.clear()
+
+    def _stack(self) -> List[StageProbe]:
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def _frame_size(self, frame: Any):
+        """(lignes, octets) d'un DataFrame ; octets seulement si ``memory``."""
+        if not isinstance(frame, pd.DataFrame):
+            return None, None
+        return len(frame), int(frame.memory_usage(deep=True).sum()) if self.memory else None
+
+    def _record(self, probe: StageProbe, parent: Optional[StageProbe], failed: bool):
+        peak_memory = None
+        if tracemalloc.is_tracing():
+            probe.peak_traced = max(probe.peak_traced, tracemalloc.get_traced_memory()[1])
+            peak_memory = probe.peak_traced - probe.start_traced
+            if parent is not None:
+                parent.peak_traced = max(parent.peak_traced, probe.peak_traced)
+
+        with self._lock:
+            record = self.stages[probe.path]
+            record['calls'] += 1
+            record['errors'] += int(failed)
+            record['wall_seconds'] += time.perf_counter() - probe.start_wall
+            record['cpu_seconds'] += time.process_time() - probe.start_cpu
+            for key in ('rows_in', 'rows_out', 'bytes_in', 'bytes_out'):
+                value = getattr(probe, key)
+                if value is not None:
+                    record[key] = (record[key] or 0) + value
+            for key, value in (('peak_memory_bytes', peak_memory), ('rss_peak_bytes', _rss_peak_bytes())):
+                if value is not None:
+                    record[key] = max(record[key] or 0, value)
+
+    @staticmethod
+    def _tree_order(records: List[Dict]) -> List[Dict]:
+        """Parents avant enfants, frères dans l'ordre du premier appel."""
+        children: Dict[Optional[str], List[Dict]] = {}
+        for record in records:
+            parent = record['path'].rpartition(';')[0] or None
+            children.setdefault(parent, []).append(record)
+
+        ordered = []
+        def visit(parent):
+            for record in children.get(parent, []):
+                ordered.append(record)
+                visit(record['path'])
+        visit(None)
+
+        return ordered
+
+def profiled(method):
+    """Mesurer une méthode avec le ``profiler`` de son instance (si défini).
+
+    Le premier DataFrame positionnel est l'entrée de l'étape, la valeur de
+    retour sa sortie.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        profiler = getattr(self, 'profiler', None)
+        if profiler is None:
+            return method(self, *args, **kwargs)
+
+        inputs = next((arg for arg in args if isinstance(arg, pd.DataFrame)), None)
+        with profiler.stage(method.__name__, inputs) as probe:
+            result = method(self, *args, **kwargs)
+            probe.output(result)
+        return result
+
+    return wrapper
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_count(value: Optional[int]) -> str:
+    return "-" if value is None else f"{value:,}".replace(',', ' ')
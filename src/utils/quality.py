@@ -0,0 +1,317 @@
+"""
+Profil et qualité des données en une passe.
+
+``DataProfile`` calcule toutes les statistiques de colonnes d'un DataFrame
+en un seul balayage vectorisé par colonne : valeurs manquantes, valeurs
+distinctes (empreintes, puis HyperLogLog au-delà de ``max_exact_distinct``),
+moments et quantiles des colonnes numériques, fréquences des autres
+colonnes. Les doublons de lignes sont comptés sur une empreinte par
+ligne, combinée à partir de celles des valeurs. Un profil se met à jour chunk par chunk (``update``) et se fusionne
+avec un autre (``merge``) : celui d'un dataset découpé est celui du
+dataset complet.
+
+``profile_data`` met en cache les profils par empreinte du contenu : le
+même DataFrame validé plusieurs fois au cours d'un run n'est profilé
+qu'une fois.
+"""
+
+import hashlib
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from src.utils.sketches import DistinctCounter, QuantileSketch, RunningMoments
+
+MB = 1024 ** 2
+# Profils gardés en cache (empreinte du contenu -> profil)
+PROFILE_CACHE_SIZE = 4
+# Au-delà, la taille des chaînes est estimée sur un échantillon
+MEMORY_SAMPLE_SIZE = 1000
+_NULL_HASH = np.uint64(0x9E3779B97F4A7C15)
+_ROW_HASH_SEED = np.uint64(0xCBF29CE484222325)
+_ROW_HASH_MULTIPLIER = np.uint64(0x100000001B3)
+
+class ColumnProfile:
+    """Statistiques fusionnables d'une colonne."""
+
+    def __init__(self, dtype: str, numeric: bool, max_exact_distinct: Optional[int],
+                 max_tracked_values: int, precision: int):
+        self.dtype = dtype
+        self.numeric = numeric
+        self.max_tracked_values = max_tracked_values
+        self.count = 0
+        self.null_count = 0
+        self.memory_bytes = 0
+        self.distinct = DistinctCounter(max_exact_distinct, precision)
+        self.moments = RunningMoments() if numeric else None
+        self.quantiles = QuantileSketch(max_exact=max_exact_distinct) if numeric else None
+        self.value_counts: Optional[pd.Series] = None if numeric else pd.Series(dtype=np.int64)
+        # Fréquences tronquées aux ``max_tracked_values`` plus fréquentes
+        self.counts_exact = True
+
+    def update(self, series: pd.Series) -> np.ndarray:
+        """Ajouter les valeurs d'un chunk ; renvoie l'empreinte de chaque valeur."""
+        self.memory_bytes += _series_memory_bytes(series)
+
+        if self.numeric:
+            # float64 : même valeur, même empreinte quel que soit le dtype du chunk
+            values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            valid = values[~np.isnan(values)]
+            self.null_count += len(values) - len(valid)
+            self.count += len(valid)
+            self.moments.update(valid)
+            self.quantiles.update(valid)
+            hashes = pd.util.hash_array(values, categorize=False)
+            self.distinct.update(hashes[~np.isnan(values)])
+            return hashes
+
+        # Une factorisation donne manquants, fréquences et empreintes
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        observed = codes[codes >= 0]
+        self.null_count += len(codes) - len(observed)
+        self.count += len(observed)
+        unique_hashes = pd.util.hash_array(np.asarray(uniques, dtype=object), categorize=False)
+        self.distinct.update(unique_hashes)
+        self._add_counts(pd.Series(np.bincount(observed, minlength=len(uniques)), index=uniques))
+
+        return np.append(unique_hashes, _NULL_HASH)[codes]
+
+    def merge(self, other: "ColumnProfile"):
+        self.count += other.count
+        self.null_count += other.null_count
+        self.memory_bytes += other.memory_bytes
+        self.distinct.merge(other.distinct)
+        if self.numeric and other.numeric:
+            self.moments.merge(other.moments)
+            self.quantiles.merge(other.quantiles)
+        elif not self.numeric and not other.numeric:
+            self.counts_exact &= other.counts_exact
+            self._add_counts(other.value_counts)
+
+    def _add_counts(self, counts: pd.Series):
+        if len(self.value_counts):
+            counts = self.value_counts.add(counts, fill_value=0).astype(np.int64)
+        self.value_counts = counts
+        if len(counts) > 2 * self.max_tracked_values:
+            # Fréquentes seulement (type Space-Saving) : le mode reste exact s'il est fréquent
+            self.value_counts = counts.nlargest(self.max_tracked_values)
+            self.counts_exact = False
+
+    def most_frequent(self):
+        """Valeur la plus fréquente (la plus petite en cas d'égalité, comme ``mode``) et son effectif."""
+        if self.value_counts is None or not len(self.value_counts):
+            return None, 0
+        top = self.value_counts.max()
+        candidates = self.value_counts.index[self.value_counts.to_numpy() == top]
+        try:
+            value = candidates.sort_values()[0]
+        except TypeError:
+            value = candidates[0]
+        return value, int(top)
+
+class DataProfile:
+    """Profil fusionnable d'un DataFrame (ou d'une suite de chunks).
+
+    Les distincts sont exacts jusqu'à ``max_exact_distinct`` valeurs par
+    colonne, puis estimés (HyperLogLog, ``precision``) ; les médianes
+    suivent ``QuantileSketch`` avec le même seuil. Les doublons de lignes
+    restent exacts (une empreinte de 8 octets par ligne distincte).
+    """
+
+    def __init__(self, max_exact_distinct: Optional[int] = 100000,
+                 max_tracked_values: int = 10000, precision: int = 14):
+        self.max_exact_distinct = max_exact_distinct
+        self.max_tracked_values = max_tracked_values
+        self.precision = precision
+        self.n_rows = 0
+        self.index_bytes = 0
+        self.columns: Dict[Any, ColumnProfile] = {}
+        self.rows = DistinctCounter(max_exact=None)
+
+    def update(self, df: pd.DataFrame) -> "DataProfile":
+        """Ajouter un chunk."""
+        self.n_rows += len(df)
+        self.index_bytes += int(df.index.memory_usage())
+        row_hashes = np.full(len(df), _ROW_HASH_SEED, dtype=np.uint64)
+
+        for col in df.columns:
+            series = df[col]
+            if col not in self.columns:
+                self.columns[col] = ColumnProfile(
+                    str(series.dtype), _is_numeric(series.dtype), self.max_exact_distinct,
+                    self.max_tracked_values, self.precision
+                )
+            # Empreinte de ligne combinée colonne par colonne (NaN == NaN, comme ``duplicated``)
+            row_hashes ^= self.columns[col].update(series)
+            row_hashes *= _ROW_HASH_MULTIPLIER
+
+        self.rows.update(row_hashes)
+
+        return self
+
+    def merge(self, other: "DataProfile") -> "DataProfile":
+        """Fusionner un autre profil dans celui-ci (l'autre n'est pas modifié)."""
+        self.n_rows += other.n_rows
+        self.index_bytes += other.index_bytes
+        self.rows.merge(other.rows)
+
+        for col, column in other.columns.items():
+            if col not in self.columns:
+                self.columns[col] = ColumnProfile(
+                    column.dtype, column.numeric, self.max_exact_distinct,
+                    self.max_tracked_values, self.precision
+                )
+            self.columns[col].merge(column)
+
+        return self
+
+    @property
+    def duplicate_rows(self) -> int:
+        return self.n_rows - int(self.rows.count)
+
+    def quality_report(self) -> Dict[str, Union[bool, float, int]]:
+        """Rapport de ``validate_data_quality``."""
+        n_cells = self.n_rows * len(self.columns)
+        null_cells = sum(column.null_count for column in self.columns.values())
+        memory_bytes = self.index_bytes + sum(column.memory_bytes for column in self.columns.values())
+
+        report = {
+            'total_rows': self.n_rows,
+            'total_columns': len(self.columns),
+            'missing_values_pct': null_cells / n_cells * 100 if n_cells else 0.0,
+            'duplicate_rows': self.duplicate_rows,
+            'duplicate_rows_pct': self.duplicate_rows / self.n_rows * 100 if self.n_rows else 0.0,
+            'numeric_columns': sum(column.numeric for column in self.columns.values()),
+            'categorical_columns': sum(_is_categorical(column.dtype) for column in self.columns.values()),
+            'memory_usage_mb': memory_bytes / MB,
+            'data_quality_score': 0.0
+        }
+
+        # Calculer un score de qualité
+        score = 100
+        score -= report['missing_values_pct'] * 2  # -2 points par % manquant
+        score -= report['duplicate_rows_pct'] * 3  # -3 points par % dupliqué
+        report['data_quality_score'] = max(0, min(100, score))
+
+        return report
+
+    def to_frame(self) -> pd.DataFrame:
+        """Profil par colonne de ``create_data_profile``."""
+        profile = []
+
+        for col, column in self.columns.items():
+            unique_count = int(round(column.distinct.count))
+            col_info = {
+                'column': col,
+                'dtype': column.dtype,
+                'non_null_count': column.count,
+                'null_count': column.null_count,
+                'null_percentage': column.null_count / self.n_rows * 100 if self.n_rows else 0.0,
+                'unique_count': unique_count,
+                'unique_percentage': unique_count / self.n_rows * 100 if self.n_rows else 0.0,
+                'unique_count_exact': column.distinct.exact
+            }
+
+            if column.numeric:
+                moments = column.moments
+                col_info.update({
+                    'mean': moments.mean if moments.count else np.nan,
+                    'median': column.quantiles.quantile(0.5),
+                    'std': moments.std,
+                    'min': moments.min if moments.count else np.nan,
+                    'max': moments.max if moments.count else np.nan,
+                    'skewness': moments.skewness,
+                    'kurtosis': moments.kurtosis
+                })
+            else:
+                value, count = column.most_frequent()
+                col_info.update({
+                    'most_frequent': value,
+                    'most_frequent_count': count
+                })
+
+            profile.append(col_info)
+
+        return pd.DataFrame(profile)
+
+_profile_cache: "OrderedDict[tuple, DataProfile]" = OrderedDict()
+_profile_cache_lock = threading.Lock()
+
+def profile_data(df: pd.DataFrame, use_cache: bool = True) -> DataProfile:
+    """Profil d'un DataFrame, mis en cache par empreinte de son contenu.
+
+    Le profil renvoyé est partagé : le fusionner dans un nouveau
+    ``DataProfile`` plutôt que le modifier.
+    """
+    if not use_cache:
+        return DataProfile().update(df)
+
+    key = _fingerprint(df)
+    with _profile_cache_lock:
+        if key in _profile_cache:
+            _profile_cache.move_to_end(key)
+            return _profile_cache[key]
+
+    profile = DataProfile().update(df)
+    with _profile_cache_lock:
+        _profile_cache[key] = profile
+        while len(_profile_cache) > PROFILE_CACHE_SIZE:
+            _profile_cache.popitem(last=False)
+
+    return profile
+
+def clear_profile_cache():
+    """Vider le cache de ``profile_data``."""
+    with _profile_cache_lock:
+        _profile_cache.clear()
+
+def _fingerprint(df: pd.DataFrame) -> str:
+    """Empreinte du contenu : octets des tableaux numpy ou Arrow (codes et
+    catégories d'une colonne ``category``), valeurs sinon."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((list(map(str, df.columns)), list(map(str, df.dtypes)), len(df))).encode())
+
+    for i in range(df.shape[1]):
+        series = df.iloc[:, i]
+        values, dtype = series.array, series.dtype
+        if isinstance(dtype, np.dtype) and dtype.kind in 'biufcmM':
+            digest.update(np.ascontiguousarray(series.to_numpy()).view(np.uint8))
+        elif isinstance(dtype, pd.CategoricalDtype):
+            digest.update(np.ascontiguousarray(values.codes).view(np.uint8))
+            digest.update(pd.util.hash_array(np.asarray(dtype.categories, dtype=object), categorize=False))
+        elif hasattr(values, '__arrow_array__') and getattr(dtype, 'storage', 'pyarrow') == 'pyarrow':
+            arrow = values.__arrow_array__()
+            for chunk in getattr(arrow, 'chunks', [arrow]):
+                digest.update(repr((chunk.offset, len(chunk))).encode())
+                for buffer in chunk.buffers():
+                    if buffer is not None:
+                        digest.update(buffer)
+        else:
+            digest.update(pd.util.hash_array(np.asarray(values, dtype=object), categorize=False))
+
+    return digest.hexdigest()
+
+def _is_numeric(dtype) -> bool:
+    return pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+
+def _is_categorical(dtype) -> bool:
+    """Colonnes retenues par ``select_dtypes(include=['object', 'category'])`` (chaînes comprises)."""
+    return dtype in ('object', 'str', 'category') or dtype.startswith('string')
+
+def _series_memory_bytes(series: pd.Series) -> int:
+    """Taille mémoire de ``memory_usage(deep=True)``, estimée sur un échantillon pour les objets Python."""
+    dtype = series.dtype
+    python_objects = dtype == object or (
+        isinstance(dtype, pd.StringDtype) and dtype.storage == 'python'
+    )
+    if not python_objects or len(series) <= MEMORY_SAMPLE_SIZE:
+        return int(series.memory_usage(index=False, deep=True))
+
+    step = len(series) // MEMORY_SAMPLE_SIZE
+    sample = series.to_numpy(dtype=object)[::step][:MEMORY_SAMPLE_SIZE]
+    average = sum(sys.getsizeof(value) for value in sample) / len(sample)
+    return int(series.memory_usage(index=False, deep=False) + average * len(series))
@@ -0,0 +1,355 @@
+"""
+Statistiques fusionnables pour les traitements par chunks.
+
+Chaque structure se met à jour chunk par chunk (``update``) et se combine
+avec une autre (``merge``) : les statistiques d'un dataset découpé en
+chunks, en partitions parallèles ou en lots incrémentaux sont celles du
+dataset complet.
+"""
+
+import math
+from typing import List, Optional
+
+import numpy as np
+
+class RunningMoments:
+    """Effectif, moyenne, variance, asymétrie et aplatissement (Welford/Chan/Pébay), minimum et maximum."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.m4 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values: np.ndarray) -> "RunningMoments":
+        """Ajouter des valeurs (les NaN sont ignorés)."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+
+        other = RunningMoments()
+        other.count = len(values)
+        other.mean = float(values.mean())
+        centered = values - other.mean
+        squared = centered ** 2
+        other.m2 = float(squared.sum())
+        other.m3 = float((squared * centered).sum())
+        other.m4 = float((squared ** 2).sum())
+        other.min = float(values.min())
+        other.max = float(values.max())
+
+        return self.merge(other)
+
+    def merge(self, other: "RunningMoments") -> "RunningMoments":
+        """Fusionner un autre accumulateur dans celui-ci."""
+        if other.count == 0:
+            return self
+
+        n_a, n_b = self.count, other.count
+        count = n_a + n_b
+        delta = other.mean - self.mean
+        # Ordre : m4 puis m3 utilisent les m2/m3 avant fusion
+        self.m4 += (other.m4 + delta ** 4 * n_a * n_b * (n_a ** 2 - n_a * n_b + n_b ** 2) / count ** 3
+                    + 6 * delta ** 2 * (n_a ** 2 * other.m2 + n_b ** 2 * self.m2) / count ** 2
+                    + 4 * delta * (n_a * other.m3 - n_b * self.m3) / count)
+        self.m3 += (other.m3 + delta ** 3 * n_a * n_b * (n_a - n_b) / count ** 2
+                    + 3 * delta * (n_a * other.m2 - n_b * self.m2) / count)
+        self.m2 += other.m2 + delta ** 2 * n_a * n_b / count
+        self.mean += delta * n_b / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+        return self
+
+    @property
+    def variance(self) -> float:
+        """Variance empirique (ddof=1, comme pandas)."""
+        return self.m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance) if self.count > 1 else math.nan
+
+    @property
+    def skewness(self) -> float:
+        """Asymétrie corrigée du biais (comme ``pd.Series.skew``)."""
+        n = self.count
+        if n < 3:
+            return math.nan
+        if self.m2 <= 1e-14 * n * max(self.mean ** 2, 1.0):
+            return 0.0
+        return n * math.sqrt(n - 1) / (n - 2) * self.m3 / self.m2 ** 1.5
+
+    @property
+    def kurtosis(self) -> float:
+        """Aplatissement excédentaire corrigé du biais (comme ``pd.Series.kurtosis``)."""
+        n = self.count
+        if n < 4:
+            return math.nan
+        if self.m2 <= 1e-14 * n * max(self.mean ** 2, 1.0):
+            return 0.0
+        return (n * (n + 1) * (n - 1) * self.m4 / ((n - 2) * (n - 3) * self.m2 ** 2)
+                - 3 * (n - 1) ** 2 / ((n - 2) * (n - 3)))
+
+class QuantileSketch:
+    """Sketch de quantiles fusionnable.
+
+    Exact (poids par valeur distincte) tant que le nombre de valeurs
+    distinctes ne dépasse pas ``max_exact`` : les quantiles sont alors
+    identiques à ``pd.Series.quantile`` (interpolation linéaire). Au-delà,
+    les valeurs sont résumées en centroïdes de type t-digest (fonction
+    d'échelle arcsin, précise aux extrémités) : l'erreur de rang est de
+    l'ordre de ``1 / compression``. ``max_exact=None`` garde le sketch
+    exact quelle que soit sa taille.
+    """
+
+    def __init__(self, compression: int = 500, max_exact: Optional[int] = 4096):
+        self.compression = compression
+        self.max_exact = max_exact
+        self.exact = True
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._values = np.empty(0, dtype=np.float64)
+        self._weights = np.empty(0, dtype=np.float64)
+
+    def update(self, values: np.ndarray, weight: float = 1.0) -> "QuantileSketch":
+        """Ajouter des valeurs (les NaN sont ignorés)."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+
+        unique, counts = np.unique(values, return_counts=True)
+        self._absorb(unique, counts * float(weight))
+
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Fusionner un autre sketch dans celui-ci."""
+        if other.count == 0:
+            return self
+
+        if not other.exact:
+            self.exact = False
+        self._absorb(other._values, other._weights, other.min, other.max)
+
+        return self
+
+    def quantile(self, q: float) -> float:
+        """Quantile ``q`` (NaN si le sketch est vide)."""
+        if self.count == 0:
+            return math.nan
+
+        if self.exact:
+            # Interpolation linéaire entre les rangs encadrants, comme pandas
+            cumulative = np.cumsum(self._weights)
+            position = (self.count - 1) * q
+            lower = math.floor(position)
+            lower_value = self._values[np.searchsorted(cumulative, lower, side='right')]
+            upper_value = self._values[np.searchsorted(cumulative, min(lower + 1, self.count - 1), side='right')]
+            return float(lower_value + (position - lower) * (upper_value - lower_value))
+
+        centers, means = self._centers()
+        return float(np.interp(q * self.count, centers, means))
+
+    def count_below(self, x: float) -> float:
+        """Nombre (estimé en mode t-digest) de valeurs strictement inférieures à ``x``."""
+        if self.exact:
+            return float(self._weights[self._values < x].sum())
+
+        centers, means = self._centers()
+        return float(np.interp(x, means, centers)) if x > self.min else 0.0
+
+    def count_above(self, x: float) -> float:
+        """Nombre (estimé en mode t-digest) de valeurs strictement supérieures à ``x``."""
+        if self.exact:
+            return float(self._weights[self._values > x].sum())
+
+        centers, means = self._centers()
+        return float(self.count - np.interp(x, means, centers)) if x < self.max else 0.0
+
+    def median_absolute_deviation(self) -> float:
+        """Écart absolu médian (MAD) autour de la médiane.
+
+        Exact en mode exact (identique à ``np.median(|x - médiane|)``) ; en
+        mode t-digest, plus petit rayon autour de la médiane contenant la
+        moitié des poids, trouvé par dichotomie sur ``count_below`` et
+        ``count_above``.
+        """
+        if self.count == 0:
+            return math.nan
+
+        median = self.quantile(0.5)
+        if self.exact:
+            deviations = QuantileSketch(max_exact=None)
+            deviations._absorb(np.abs(self._values - median), self._weights)
+            return deviations.quantile(0.5)
+
+        low, high = 0.0, max(median - self.min, self.max - median)
+        for _ in range(60):
+            radius = (low + high) / 2
+            inside = self.count - self.count_below(median - radius) - self.count_above(median + radius)
+            if inside >= self.count / 2:
+                high = radius
+            else:
+                low = radius
+
+        return high
+
+    def _absorb(self, values: np.ndarray, weights: np.ndarray,
+                minimum: Optional[float] = None, maximum: Optional[float] = None):
+        """Ajouter des couples (valeur, poids) triés ou non."""
+        self.count += float(weights.sum())
+        self.min = min(self.min, float(values.min()) if minimum is None else minimum)
+        self.max = max(self.max, float(values.max()) if maximum is None else maximum)
+
+        merged = np.concatenate([self._values, values])
+        merged_weights = np.concatenate([self._weights, weights])
+
+        if self.exact:
+            unique, inverse = np.unique(merged, return_inverse=True)
+            self._values = unique
+            self._weights = np.bincount(inverse, weights=merged_weights)
+            if self.max_exact is not None and len(self._values) > self.max_exact:
+                self.exact = False
+                self._compress(self._values, self._weights)
+        else:
+            order = np.argsort(merged, kind='stable')
+            self._compress(merged[order], merged_weights[order])
+
+    def _compress(self, means: np.ndarray, weights: np.ndarray):
+        """Fusionner les centroïdes voisins selon la fonction d'échelle k1.
+
+        Un centroïde regroupe les valeurs triées dont le rang du centre
+        tombe dans la même unité de ``k`` : chacun couvre environ une unité
+        d'échelle, sans boucle Python.
+        """
+        scale = self.compression / (2 * math.pi)
+        cumulative = np.cumsum(weights)
+        quantiles = np.clip((cumulative - weights / 2) / cumulative[-1], 0.0, 1.0)
+        buckets = np.floor(scale * np.arcsin(2 * quantiles - 1))
+        starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+
+        new_weights = np.add.reduceat(weights, starts)
+        self._values = np.add.reduceat(means * weights, starts) / new_weights
+        self._weights = new_weights
+
+    def _centers(self):
+        """Rangs des centres des centroïdes, bornés par le min et le max."""
+        centers = np.cumsum(self._weights) - self._weights / 2
+        centers = np.concatenate([[0.0], centers, [self.count]])
+        means = np.concatenate([[self.min], self._values, [self.max]])
+
+        return centers, means
+
+class DistinctCounter:
+    """Nombre de valeurs distinctes à partir d'empreintes 64 bits.
+
+    Exact (empreintes distinctes conservées) jusqu'à ``max_exact`` valeurs
+    distinctes, puis HyperLogLog à ``2 ** precision`` registres : erreur
+    relative de l'ordre de ``1.04 / sqrt(2 ** precision)`` (0,8 % par
+    défaut) en mémoire constante. ``max_exact=None`` reste exact. Les
+    empreintes doivent être bien mélangées (``hash_pandas_object``).
+    """
+
+    def __init__(self, max_exact: Optional[int] = 100000, precision: int = 14):
+        self.max_exact = max_exact
+        self.precision = precision
+        self._hashes: List[np.ndarray] = []
+        self._pending = 0
+        self._collapsed = 0
+        self._registers: Optional[np.ndarray] = None
+
+    @property
+    def exact(self) -> bool:
+        return self._registers is None
+
+    def update(self, hashes: np.ndarray) -> "DistinctCounter":
+        """Ajouter des empreintes (doublons autorisés)."""
+        hashes = _sorted_unique(np.asarray(hashes, dtype=np.uint64))
+        if not self.exact:
+            self._add_to_registers(hashes)
+            return self
+
+        self._hashes.append(hashes)
+        self._pending += len(hashes)
+        # Dédoublonnage différé : coût amorti linéaire sur les chunks
+        if self._pending > 2 * max(self._collapsed, 65536) or (
+                self.max_exact is not None and self._pending > self.max_exact):
+            self._collapse()
+
+        return self
+
+    def merge(self, other: "DistinctCounter") -> "DistinctCounter":
+        """Fusionner un autre compteur (même ``precision``) dans celui-ci."""
+        if other.exact:
+            for hashes in other._hashes:
+                self.update(hashes)
+            return self
+
+        if self.exact:
+            self._to_registers()
+        np.maximum(self._registers, other._registers, out=self._registers)
+
+        return self
+
+    @property
+    def count(self) -> float:
+        """Nombre (estimé en mode HyperLogLog) de valeurs distinctes."""
+        if self.exact:
+            self._collapse()
+            return float(self._collapsed)
+
+        m = len(self._registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m ** 2 / np.ldexp(1.0, -self._registers.astype(np.int64)).sum()
+        zeros = int((self._registers == 0).sum())
+        if estimate <= 2.5 * m and zeros:
+            # Correction petites cardinalités (comptage linéaire)
+            estimate = m * math.log(m / zeros)
+
+        return float(estimate)
+
+    def _collapse(self):
+        unique = _sorted_unique(np.concatenate(self._hashes)) if self._hashes else np.empty(0, dtype=np.uint64)
+        self._hashes = [unique]
+        self._pending = self._collapsed = len(unique)
+        if self.max_exact is not None and len(unique) > self.max_exact:
+            self._to_registers()
+
+    def _to_registers(self):
+        """Passer en mode HyperLogLog avec les empreintes exactes déjà vues."""
+        hashes = np.concatenate(self._hashes) if self._hashes else np.empty(0, dtype=np.uint64)
+        self._registers = np.zeros(1 << self.precision, dtype=np.uint8)
+        self._hashes = []
+        self._pending = self._collapsed = 0
+        self._add_to_registers(hashes)
+
+    def _add_to_registers(self, hashes: np.ndarray):
+        """Registre = rang du premier bit à 1 des ``64 - precision`` bits bas."""
+        low_bits = 64 - self.precision
+        buckets = (hashes >> np.uint64(low_bits)).astype(np.intp)
+        rest = hashes & np.uint64((1 << low_bits) - 1)
+
+        # Longueur binaire exacte de ``rest`` par dichotomie
+        length = np.zeros(len(rest), dtype=np.uint8)
+        for shift in (32, 16, 8, 4, 2, 1):
+            high = rest >> np.uint64(shift)
+            wide = high > 0
+            rest = np.where(wide, high, rest)
+            length += wide.astype(np.uint8) * np.uint8(shift)
+        length += (rest > 0).astype(np.uint8)
+
+        np.maximum.at(self._registers, buckets, (low_bits + 1 - length).astype(np.uint8))
+
+def _sorted_unique(values: np.ndarray) -> np.ndarray:
+    """``np.unique`` par tri (son chemin par table de hachage est lent sur uint64)."""
+    values = np.sort(values)
+    if len(values) < 2:
+        return values
+    return values[np.concatenate(([True], values[1:] != values[:-1]))]
@@ -8,11 +8,22 @@ import numpy as np
 from fastapi.testclient import TestClient
 from unittest.mock import patch, MagicMock
 import json
+import asyncio
 
 from src.api.endpoints import app
 
 client = TestClient(app)
 
+@pytest.fixture
+def forest_model():
+    """Petit modèle réel sur les features de l'API."""
+    from sklearn.ensemble import RandomForestClassifier
+    
+    rng = np.random.RandomState(0)
+    X = np.column_stack([rng.uniform(0, 100, 200), rng.randint(1, 11, 200)])
+    y = ((X[:, 0] > 60) & (X[:, 1] > 5)).astype(int)
+    return RandomForestClassifier(n_estimators=10, random_state=42).fit(X, y)
+
 class TestHealthEndpoint:
     """Tests pour l'endpoint health."""
     
@@ -100,12 +111,609 @@ class TestPredictionEndpoint:
         """Test erreur du modèle."""
         mock_model = MagicMock()
         mock_model.predict.side_effect = Exception("Erreur modèle")
+        mock_model.predict_proba.side_effect = Exception("Erreur modèle")
         
         with patch('src.api.endpoints.model', mock_model):
             response = client.post("/api/v1/predict/adhd", 
                                  json=valid_employee_data)
             
             assert response.status_code == 500
+    
+    def test_predict_adhd_preprocessor_error(self, mock_model, valid_employee_data):
+        """Une erreur du préprocesseur donne la même réponse 500 formatée."""
+        failing = MagicMock()
+        failing.transform.side_effect = ValueError("colonne inconnue")
+        
+        with patch('src.api.endpoints.model', mock_model), \
+             patch('src.api.endpoints.preprocessor', failing):
+            response = client.post("/api/v1/predict/adhd", json=valid_employee_data)
+        
+        assert response.status_code == 500
+        assert response.json()["error"] == "Erreur de prédiction: colonne inconnue"
+
+class TestBatchPredictionEndpoint:
+    """Tests pour l'endpoint de prédiction batch."""
+    
+    @pytest.fixture
+    def batch_records(self):
+        """Lot d'employés avec une ligne invalide au milieu."""
+        return [
+            {"employee_id": "E001", "creative_score": 85.0, "burnout_scale": 7},
+            {"employee_id": "E002", "creative_score": 150, "burnout_scale": 3},
+            {"employee_id": "E003", "creative_score": 40.0, "burnout_scale": 2},
+        ]
+    
+    def test_batch_json_array(self, forest_model, batch_records):
+        """Test batch JSON : ordre conservé et erreurs par ligne."""
+        with patch('src.api.endpoints.model', forest_model):
+            response = client.post("/api/v1/predict/adhd/batch", json=batch_records)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 3
+        assert data["scored"] == 2
+        assert data["failed"] == 1
+        
+        results = data["results"]
+        assert [r["index"] for r in results] == [0, 1, 2]
+        assert results[0]["prediction"]["employee_id"] == "E001"
+        assert results[2]["prediction"]["employee_id"] == "E003"
+        assert results[1]["prediction"] is None
+        assert results[1]["employee_id"] == "E002"
+        assert any("creative_score" in err for err in results[1]["errors"])
+    
+    def test_batch_prepared_off_event_loop(self, forest_model, batch_records):
+        """Test décodage, validation et matrice de features sur un thread de travail."""
+        from src.api import endpoints
+        
+        offloaded = []
+        original = endpoints.run_in_threadpool
+        
+        async def recording(func, *args, **kwargs):
+            offloaded.append(func)
+            return await original(func, *args, **kwargs)
+        
+        with patch('src.api.endpoints.model', forest_model), \
+             patch('src.api.endpoints.run_in_threadpool', side_effect=recording):
+            response = client.post("/api/v1/predict/adhd/batch", json=batch_records)
+        
+        assert response.status_code == 200
+        assert response.json()["scored"] == 2
+        assert endpoints.prepare_batch in offloaded
+    
+    def test_batch_matches_single_prediction(self, forest_model, batch_records):
+        """Test cohérence entre batch et prédiction unitaire."""
+        with patch('src.api.endpoints.model', forest_model):
+            batch = client.post("/api/v1/predict/adhd/batch", json=batch_records).json()
+            single = client.post("/api/v1/predict/adhd", json=batch_records[0]).json()
+        
+        batch_prediction = batch["results"][0]["prediction"]
+        assert batch_prediction["adhd_risk"] == single["adhd_risk"]
+        assert batch_prediction["probability"] == pytest.approx(single["probability"])
+        assert batch_prediction["recommendations"] == single["recommendations"]
+    
+    def test_batch_ndjson(self, forest_model, batch_records):
+        """Test batch NDJSON avec une ligne illisible."""
+        lines = [json.dumps(batch_records[0]), "{not json", json.dumps(batch_records[2])]
+        
+        with patch('src.api.endpoints.model', forest_model):
+            response = client.post(
+                "/api/v1/predict/adhd/batch",
+                content="\n".join(lines),
+                headers={"Content-Type": "application/x-ndjson"}
+            )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["scored"] == 2
+        assert data["results"][1]["errors"][0].startswith("JSON invalide")
+    
+    def test_batch_chunked_scoring(self, forest_model):
+        """Test découpage en chunks : un appel predict_proba par chunk."""
+        from src.api.endpoints import predict_risk_probabilities
+        
+        X = np.column_stack([np.linspace(0, 100, 25), np.tile(np.arange(1, 6), 5)])
+        spy = MagicMock(wraps=forest_model)
+        
+        probabilities = predict_risk_probabilities(spy, X, chunk_size=10)
+        
+        assert spy.predict_proba.call_count == 3
+        np.testing.assert_allclose(probabilities, forest_model.predict_proba(X)[:, 1])
+    
+    def test_batch_not_a_list(self, forest_model):
+        """Test corps JSON qui n'est pas un tableau."""
+        with patch('src.api.endpoints.model', forest_model):
+            response = client.post("/api/v1/predict/adhd/batch", json={"employee_id": "E001"})
+        
+        assert response.status_code == 422
+
+class TestStreamingExport:
+    """Tests pour l'export NDJSON des scores."""
+    
+    @pytest.fixture
+    def etl_engine(self, tmp_path):
+        """Base SQLite avec une table de sortie de l'ETL."""
+        from sqlalchemy import create_engine
+        
+        engine = create_engine(f"sqlite:///{tmp_path / 'analytics.db'}")
+        rng = np.random.RandomState(1)
+        pd.DataFrame({
+            'employee_id': [f"E{i:04d}" for i in range(50)],
+            'department': np.tile(['design', 'programming'], 25),
+            'creative_score': rng.uniform(0, 100, 50),
+            'burnout_scale': rng.randint(1, 11, 50),
+            'productivity_score': rng.uniform(0, 100, 50)
+        }).to_sql('daily_employee_analytics', engine, index=False)
+        
+        with patch('src.api.endpoints.get_analytics_engine', return_value=engine):
+            yield engine
+    
+    @staticmethod
+    def read_stream(response):
+        """Séparer les lignes de scores et la ligne de résumé."""
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        return lines[:-1], lines[-1]['summary']
+    
+    def test_stream_all_employees(self, forest_model, etl_engine):
+        """Test export complet en plusieurs chunks."""
+        with patch('src.api.endpoints.model', forest_model):
+            response = client.get("/api/v1/predict/adhd/stream", params={"chunk_size": 7})
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        
+        records, summary = self.read_stream(response)
+        assert [r["employee_id"] for r in records] == [f"E{i:04d}" for i in range(50)]
+        assert summary == {"rows": 50, "next_cursor": None}
+        
+        df = pd.read_sql("SELECT * FROM daily_employee_analytics ORDER BY employee_id", etl_engine)
+        expected = forest_model.predict_proba(df[['creative_score', 'burnout_scale']].to_numpy())[:, 1]
+        np.testing.assert_allclose([r["probability"] for r in records], expected)
+    
+    def test_stream_department_filter_and_resume(self, forest_model, etl_engine):
+        """Test filtre par département et reprise par curseur."""
+        with patch('src.api.endpoints.model', forest_model):
+            first = client.get("/api/v1/predict/adhd/stream", params={
+                "department": "design", "limit": 10, "chunk_size": 4
+            })
+            records, summary = self.read_stream(first)
+            
+            assert len(records) == 10
+            assert {r["department"] for r in records} == {"design"}
+            assert summary["next_cursor"] == records[-1]["employee_id"]
+            
+            rest = client.get("/api/v1/predict/adhd/stream", params={
+                "department": "design", "cursor": summary["next_cursor"]
+            })
+            rest_records, rest_summary = self.read_stream(rest)
+        
+        ids = [r["employee_id"] for r in records + rest_records]
+        assert ids == [f"E{i:04d}" for i in range(0, 50, 2)]
+        assert rest_summary["next_cursor"] is None
+    
+    def test_stream_applies_preprocessor(self, etl_engine):
+        """Test colonnes du préprocesseur lues et transformées avant scoring."""
+        from sklearn.ensemble import RandomForestClassifier
+        from src.utils.data_processing import DataProcessor
+        
+        raw = pd.read_sql("SELECT * FROM daily_employee_analytics ORDER BY employee_id", etl_engine)
+        raw['adhd_risk'] = (raw['creative_score'] > 50).astype(int)
+        processor = DataProcessor()
+        X, y = processor.prepare_ml_dataset(raw, 'adhd_risk')
+        features = ['creative_score', 'creativity_burnout_ratio', 'productivity_score', 'department_encoded']
+        model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X[features].values, y)
+        transform = processor.export_transform(features)
+        
+        with patch('src.api.endpoints.model', model), patch('src.api.endpoints.preprocessor', transform):
+            response = client.get("/api/v1/predict/adhd/stream", params={"chunk_size": 16})
+        
+        assert response.status_code == 200
+        records, summary = self.read_stream(response)
+        assert summary["rows"] == 50
+        expected = model.predict_proba(transform.transform(raw.drop(columns='adhd_risk')))[:, 1]
+        np.testing.assert_allclose([r["probability"] for r in records], expected)
+    
+    def test_stream_unknown_table(self, forest_model, etl_engine):
+        """Test table source non autorisée ou absente."""
+        with patch('src.api.endpoints.model', forest_model):
+            assert client.get("/api/v1/predict/adhd/stream",
+                              params={"table": "employees"}).status_code == 422
+            assert client.get("/api/v1/predict/adhd/stream",
+                              params={"table": "processed_employee_data"}).status_code == 404
+
+class TestMicroBatcher:
+    """Tests pour le micro-batching des prédictions unitaires."""
+    
+    def test_concurrent_requests_are_coalesced(self):
+        """Test regroupement de requêtes concurrentes en un seul appel."""
+        from src.api.batching import MicroBatcher
+        
+        calls = []
+        
+        def score_fn(features):
+            calls.append(len(features))
+            return features[:, 0] * 2
+        
+        batcher = MicroBatcher(score_fn, max_batch_size=64, max_wait_ms=50)
+        
+        async def run():
+            rows = [np.array([[float(i), 1.0]]) for i in range(10)]
+            results = await asyncio.gather(*(batcher.submit(row) for row in rows))
+            await batcher.stop()
+            return results
+        
+        results = asyncio.run(run())
+        
+        assert calls == [10]
+        assert [float(r[0]) for r in results] == [2.0 * i for i in range(10)]
+        stats = batcher.get_stats()
+        assert stats['batches_processed'] == 1
+        assert stats['batch_size']['count'] == 1
+        assert stats['latency_ms']['count'] == 10
+    
+    def test_max_batch_size_splits_batches(self):
+        """Test découpage quand max_batch_size est atteint."""
+        from src.api.batching import MicroBatcher
+        
+        calls = []
+        
+        def score_fn(features):
+            calls.append(len(features))
+            return np.zeros(len(features))
+        
+        batcher = MicroBatcher(score_fn, max_batch_size=4, max_wait_ms=50)
+        
+        async def run():
+            await asyncio.gather(*(batcher.submit(np.ones((1, 2))) for _ in range(10)))
+            await batcher.stop()
+        
+        asyncio.run(run())
+        
+        assert calls == [4, 4, 2]
+    
+    def test_scoring_error_propagates_to_each_request(self):
+        """Test propagation d'une erreur de scoring à toutes les requêtes."""
+        from src.api.batching import MicroBatcher
+        
+        def score_fn(features):
+            raise RuntimeError("forêt indisponible")
+        
+        batcher = MicroBatcher(score_fn, max_wait_ms=10)
+        
+        async def run():
+            results = await asyncio.gather(
+                *(batcher.submit(np.ones((1, 2))) for _ in range(3)),
+                return_exceptions=True
+            )
+            await batcher.stop()
+            return results
+        
+        results = asyncio.run(run())
+        
+        assert all(isinstance(r, RuntimeError) for r in results)
+    
+    def test_mixed_widths_and_contexts_are_isolated(self):
+        """Test groupes par contexte et largeur, erreur limitée à son groupe."""
+        from src.api.batching import MicroBatcher
+        
+        calls = []
+        
+        def score_fn(features, context=None):
+            calls.append((context, features.shape))
+            if features.shape[1] == 3:
+                raise ValueError("largeur inattendue")
+            return features[:, 0] + (context or 0)
+        
+        batcher = MicroBatcher(score_fn, max_batch_size=64, max_wait_ms=50)
+        
+        async def run():
+            results = await asyncio.gather(
+                batcher.submit(np.ones((1, 2))),
+                batcher.submit(np.ones((1, 3))),
+                batcher.submit(np.ones((2, 2)), 10),
+                batcher.submit(np.ones((1, 2))),
+                return_exceptions=True
+            )
+            # Le worker survit à l'erreur et reprend la même file
+            results.append(await batcher.submit(np.full((1, 2), 5.0)))
+            await batcher.stop()
+            return results
+        
+        results = asyncio.run(run())
+        
+        assert isinstance(results[1], ValueError)
+        assert results[0].tolist() == [1.0] and results[3].tolist() == [1.0]
+        assert results[2].tolist() == [11.0, 11.0]
+        assert results[4].tolist() == [5.0]
+        assert sorted(calls[:3], key=str) == sorted([(None, (2, 2)), (None, (1, 3)), (10, (2, 2))], key=str)
+    
+    def test_metrics_endpoint(self):
+        """Test exposition des histogrammes du micro-batcher."""
+        response = client.get("/api/v1/metrics")
+        
+        assert response.status_code == 200
+        stats = response.json()["micro_batching"]
+        assert "batch_size" in stats
+        assert "queue_depth_at_dispatch" in stats
+        assert "+Inf" in stats["batch_size"]["buckets"]
+
+class TestModelHotReload:
+    """Tests pour le rechargement à chaud du modèle."""
+    
+    @staticmethod
+    def save_model(model_dir, n_estimators, version):
+        """Sauvegarder un modèle et ses métadonnées."""
+        import joblib
+        from sklearn.ensemble import RandomForestClassifier
+        
+        rng = np.random.RandomState(n_estimators)
+        X = np.column_stack([rng.uniform(0, 100, 100), rng.randint(1, 11, 100)])
+        y = (X[:, 0] > 50).astype(int)
+        model = RandomForestClassifier(n_estimators=n_estimators, random_state=0).fit(X, y)
+        
+        joblib.dump(model, model_dir / "random_forest.pkl")
+        with open(model_dir / "model_metadata.json", 'w') as f:
+            json.dump({'model_version': version, 'feature_names': ['creative_score', 'burnout_scale']}, f)
+    
+    def test_registry_swaps_and_drains(self, tmp_path):
+        """Test échange atomique et drainage de l'ancienne version."""
+        from src.api.registry import ModelRegistry
+        
+        swapped = []
+        registry = ModelRegistry(tmp_path, engine='sklearn', on_swap=swapped.append, drain_seconds=0)
+        
+        self.save_model(tmp_path, 5, "v1")
+        first = registry.reload()
+        assert first.version == "v1"
+        assert registry.reload() is None  # Rien n'a changé
+        
+        self.save_model(tmp_path, 7, "v2")
+        second = registry.reload()
+        
+        assert [v.version for v in swapped] == ["v1", "v2"]
+        assert registry.active is second
+        assert second.generation == 2
+        assert second.model.n_estimators == 7
+        assert [v.version for v in registry.draining] == ["v1"]
+        assert registry.release_drained() == 1
+        assert registry.draining == []
+    
+    def test_failed_reload_keeps_active_version(self, tmp_path):
+        """Test conservation de la version active si le rechargement échoue."""
+        from src.api.registry import ModelRegistry
+        
+        registry = ModelRegistry(tmp_path, engine='sklearn')
+        self.save_model(tmp_path, 5, "v1")
+        registry.reload()
+        
+        (tmp_path / "model_metadata.json").write_text("{corrompu")
+        
+        with pytest.raises(Exception):
+            registry.reload()
+        
+        assert registry.active.version == "v1"
+        assert registry.failed_reloads == 1
+    
+    def test_admin_reload_endpoint(self, tmp_path):
+        """Test rechargement via l'API et version active dans /model/info."""
+        from src.api import endpoints
+        from src.api.registry import ModelRegistry
+        
+        self.save_model(tmp_path, 5, "v1")
+        registry = ModelRegistry(
+            tmp_path, engine='sklearn', on_swap=endpoints.activate_model_version
+        )
+        
+        with patch.object(endpoints, 'model_registry', registry), \
+             patch.object(endpoints, 'model', None), \
+             patch.object(endpoints, 'metadata', None):
+            response = client.post("/api/v1/admin/model/reload")
+            assert response.status_code == 200
+            assert response.json()["reloaded"] is True
+            
+            prediction = client.post("/api/v1/predict/adhd", json={
+                "employee_id": "E001", "creative_score": 85.0, "burnout_scale": 5
+            })
+            assert prediction.status_code == 200
+            
+            info = client.get("/api/v1/model/info").json()
+            assert info["model_version"] == "v1"
+            assert info["registry"]["active_version"]["version"] == "v1"
+            assert "load_time_ms" in info["registry"]["active_version"]
+    
+    def test_preprocessor_loaded_with_model(self, tmp_path):
+        """Test préprocesseur du modèle appliqué aux champs bruts de la requête."""
+        import joblib
+        from sklearn.ensemble import RandomForestClassifier
+        from src.api import endpoints
+        from src.api.registry import ModelRegistry
+        from src.utils.data_processing import DataProcessor
+        
+        rng = np.random.RandomState(0)
+        raw = pd.DataFrame({
+            'employee_id': [f"E{i:03d}" for i in range(100)],
+            'creative_score': rng.uniform(0, 100, 100),
+            'burnout_scale': rng.randint(1, 11, 100).astype(float),
+            'department': rng.choice(['design', 'qa'], 100)
+        })
+        raw['adhd_risk'] = (raw['creative_score'] > 50).astype(int)
+        processor = DataProcessor()
+        X, y = processor.prepare_ml_dataset(raw, 'adhd_risk')
+        features = ['creative_score', 'creativity_burnout_ratio', 'department_encoded']
+        model = RandomForestClassifier(n_estimators=5, random_state=0).fit(X[features].values, y)
+        
+        joblib.dump(model, tmp_path / "random_forest.pkl")
+        joblib.dump(processor.export_transform(features), tmp_path / "preprocessor.joblib")
+        with open(tmp_path / "model_metadata.json", 'w') as f:
+            json.dump({'model_version': 'v1', 'feature_names': features, 'preprocessor': 'preprocessor.joblib'}, f)
+        
+        registry = ModelRegistry(tmp_path, engine='sklearn', on_swap=endpoints.activate_model_version)
+        employee = {"employee_id": "E001", "creative_score": 85.0, "burnout_scale": 5, "department": "Design"}
+        
+        with patch.object(endpoints, 'model', None), \
+             patch.object(endpoints, 'metadata', None), \
+             patch.object(endpoints, 'preprocessor', None):
+            version = registry.reload()
+            assert version.preprocessor is not None
+            
+            response = client.post("/api/v1/predict/adhd", json=employee)
+            assert response.status_code == 200
+            
+            row = raw.iloc[:1].drop(columns='adhd_risk').assign(**employee)
+            expected = model.predict_proba(version.preprocessor.transform(row))[0, 1]
+            assert response.json()["probability"] == pytest.approx(expected)
+
+    def test_request_scored_with_its_snapshot(self):
+        """Test features et modèle d'une même version malgré un rechargement."""
+        from src.api import endpoints
+        
+        class FixedModel:
+            def __init__(self, width, probability):
+                self.width, self.probability = width, probability
+            
+            def predict_proba(self, X):
+                assert X.shape[1] == self.width
+                return np.column_stack([1 - np.full(len(X), self.probability), np.full(len(X), self.probability)])
+        
+        old = FixedModel(2, 0.25)
+        with patch.object(endpoints, 'model', old), patch.object(endpoints, 'preprocessor', None):
+            snapshot = endpoints.serving_snapshot()
+        features = endpoints.build_feature_matrix([endpoints.EmployeeData(
+            employee_id="E001", creative_score=85.0, burnout_scale=5
+        )], snapshot.preprocessor)
+        
+        async def run():
+            # Rechargement vers un modèle à 3 features après l'arrivée de la requête
+            with patch.object(endpoints, 'model', FixedModel(3, 0.75)):
+                results = [
+                    await endpoints.score_with_cache(features, score, snapshot)
+                    for score in (endpoints.score_single, endpoints.score_batch)
+                ]
+            await endpoints.micro_batcher.stop()
+            return results
+        
+        for probabilities in asyncio.run(run()):
+            assert probabilities.tolist() == [0.25]
+
+class TestPredictionCache:
+    """Tests pour le cache des prédictions."""
+    
+    class FakeRedis:
+        """Stub minimal du client Redis."""
+        
+        def __init__(self, fail=False):
+            self.store = {}
+            self.fail = fail
+        
+        def mget(self, keys):
+            if self.fail:
+                raise ConnectionError("redis indisponible")
+            return [self.store.get(key) for key in keys]
+        
+        def pipeline(self, transaction=True):
+            return self
+        
+        def set(self, key, value, ex=None):
+            self.store[key] = str(value).encode()
+        
+        def execute(self):
+            if self.fail:
+                raise ConnectionError("redis indisponible")
+    
+    def test_lru_hit_miss_and_eviction(self):
+        """Test succès, défauts et éviction LRU."""
+        from src.api.cache import PredictionCache
+        
+        cache = PredictionCache(max_size=2)
+        keys = cache.make_keys(np.array([[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]]), "v1")
+        
+        assert len(set(keys)) == 3
+        assert cache.make_keys(np.array([[1, 2]]), "v1")[0] == keys[0]
+        assert cache.make_keys(np.array([[1, 2]]), "v2")[0] != keys[0]
+        
+        assert cache.get_many(keys[:1]) == [None]
+        cache.set_many(keys, [0.1, 0.2, 0.3])
+        
+        assert cache.get_many(keys) == [None, 0.2, 0.3]
+        stats = cache.get_stats()
+        assert stats['hits'] == 2
+        assert stats['misses'] == 2
+        assert stats['evictions'] == 1
+    
+    def test_ttl_expiration(self):
+        """Test expiration des entrées."""
+        from src.api.cache import PredictionCache
+        
+        cache = PredictionCache(ttl_seconds=60)
+        keys = cache.make_keys(np.array([[1.0, 2.0]]), "v1")
+        cache.set_many(keys, [0.4])
+        
+        with patch('src.api.cache.time.monotonic', return_value=1e12):
+            assert cache.get_many(keys) == [None]
+        assert cache.get_stats()['size'] == 0
+    
+    def test_redis_tier_and_fallback(self):
+        """Test lecture Redis, remplissage local et repli sur erreur."""
+        from src.api.cache import PredictionCache
+        
+        shared = self.FakeRedis()
+        writer, reader = PredictionCache(), PredictionCache()
+        writer._redis = reader._redis = shared
+        
+        keys = writer.make_keys(np.array([[1.0, 2.0]]), "v1")
+        writer.set_many(keys, [0.75])
+        
+        assert reader.get_many(keys) == [0.75]
+        assert reader.get_stats()['redis_hits'] == 1
+        assert reader.get_many(keys) == [0.75]
+        assert reader.get_stats()['hits'] == 1
+        
+        broken = PredictionCache()
+        broken._redis = self.FakeRedis(fail=True)
+        assert broken.get_many(keys) == [None]
+        assert broken.get_stats()['redis_errors'] == 1
+        assert not broken._redis_available()
+    
+    def test_endpoint_uses_cache_and_invalidates_on_swap(self, tmp_path):
+        """Test réutilisation des scores et invalidation au changement de modèle."""
+        from src.api import endpoints
+        from src.api.cache import PredictionCache
+        from src.api.registry import ModelRegistry
+        
+        TestModelHotReload.save_model(tmp_path, 5, "v1")
+        registry = ModelRegistry(
+            tmp_path, engine='sklearn', on_swap=endpoints.activate_model_version
+        )
+        cache = PredictionCache()
+        records = [
+            {"employee_id": f"E{i:03d}", "creative_score": float(i), "burnout_scale": 5}
+            for i in range(10)
+        ]
+        
+        with patch.object(endpoints, 'model_registry', registry), \
+             patch.object(endpoints, 'prediction_cache', cache), \
+             patch.object(endpoints, 'model', None), \
+             patch.object(endpoints, 'metadata', None):
+            registry.reload()
+            first = client.post("/api/v1/predict/adhd/batch", json=records).json()
+            
+            with patch.object(registry.active.model, 'predict_proba',
+                              side_effect=AssertionError("scoré deux fois")):
+                second = client.post("/api/v1/predict/adhd/batch", json=records).json()
+                single = client.post("/api/v1/predict/adhd", json=records[3])
+            
+            probabilities = [r["prediction"]["probability"] for r in first["results"]]
+            assert [r["prediction"]["probability"] for r in second["results"]] == probabilities
+            assert single.json()["probability"] == probabilities[3]
+            
+            stats = client.get("/api/v1/metrics").json()["prediction_cache"]
+            assert stats["hits"] == 11
+            assert stats["misses"] == 10
+            
+            TestModelHotReload.save_model(tmp_path, 7, "v2")
+            registry.reload()
+            assert cache.get_stats()['size'] == 0
+            assert cache.get_stats()['invalidations'] == 2
 
 class TestTeamAnalyticsEndpoint:
     """Tests pour l'endpoint d'analytics d'équipe."""
@@ -208,6 +816,7 @@ class TestErrorHandling:
         """Test erreur serveur interne."""
         with patch('src.api.endpoints.model') as mock_model:
             mock_model.predict.side_effect = Exception("Erreur critique")
+            mock_model.predict_proba.side_effect = Exception("Erreur critique")
             
             valid_data = {
                 "employee_id": "E001",
@@ -10,8 +10,12 @@ import tempfile
 import os
 from unittest.mock import patch, MagicMock
 import sqlite3
+import json
+import joblib
+import tracemalloc
 
-from src.etl import UbisoftETLPipeline, ETLConfig
+from src.etl import UbisoftETLPipeline, ETLConfig, content_hashes, run_daily_etl
+from src.loaders import BulkLoader, CsvChecksumWriter, CsvStream, ParquetChunkWriter, PostgresCopyLoader, SQLiteBulkLoader, get_bulk_loader
 from src.utils.data_processing import DataProcessor
 
 class TestDataProcessor:
@@ -133,6 +137,12 @@ class TestETLPipeline:
         assert len(employees_df) == 3
         assert 'employee_id' in employees_df.columns
         assert 'department' in employees_df.columns
+        
+        # Lecture limitée aux colonnes d'un plan de transformation
+        pruned = pipeline.extract_from_csv(temp_config.raw_data_path / 'employees.csv',
+                                           columns=['employee_id', 'department'])
+        assert list(pruned.columns) == ['employee_id', 'department']
+        pd.testing.assert_frame_equal(pruned, employees_df[['employee_id', 'department']])
     
     def test_extract_hr_data(self, temp_config, sample_csv_data):
         """Test extraction complète des données RH."""
@@ -164,6 +174,17 @@ class TestETLPipeline:
         # Vérifier qu'il n'y a pas de valeurs manquantes
         assert transformed_data.isnull().sum().sum() == 0
     
+    def test_transform_leaves_extracted_data_untouched(self, temp_config, sample_csv_data):
+        """Test chaîne sans copies intermédiaires : données extraites intactes."""
+        pipeline = UbisoftETLPipeline(temp_config)
+        raw_data = pipeline.extract_hr_data(source_type="csv")
+        snapshot = raw_data.copy()
+        
+        transformed_data = pipeline.transform_employee_data(raw_data)
+        
+        pd.testing.assert_frame_equal(raw_data, snapshot)
+        assert transformed_data['department'].tolist() == ['design', 'dev', 'qa']
+    
     def test_load_to_database(self, temp_config, sample_csv_data):
         """Test chargement en base de données."""
         pipeline = UbisoftETLPipeline(temp_config)
@@ -221,6 +242,939 @@ class TestETLPipeline:
         verification_df = pd.read_sql('SELECT * FROM test_employee_data', pipeline.engine)
         assert len(verification_df) >= 3
 
+class TestChunkedETL:
+    """Tests pour le mode ETL par chunks."""
+    
+    @pytest.fixture
+    def chunked_config(self, tmp_path):
+        """Configuration en mode chunks avec des fichiers CSV de test."""
+        config = ETLConfig(
+            database_url=f"sqlite:///{tmp_path}/test.db",
+            raw_data_path=tmp_path / "raw",
+            processed_data_path=tmp_path / "processed",
+            batch_size=40,
+            validation_threshold=0.5,
+            backup_enabled=False,
+            chunked=True
+        )
+        config.raw_data_path.mkdir()
+        
+        n = 100
+        rng = np.random.RandomState(0)
+        ids = [f"E{i:03d}" for i in range(n)]
+        pd.DataFrame({
+            'employee_id': ids,
+            'department': rng.choice(['Design', 'Dev', 'QA'], n),
+            'hire_date': '2020-01-15',
+            'status': 'active'
+        }).to_csv(config.raw_data_path / 'employees.csv', index=False)
+        pd.DataFrame({
+            'employee_id': list(rng.permutation(ids)),
+            'creative_score': rng.uniform(0, 100, n),
+            'burnout_scale': rng.randint(1, 11, n),
+            'communication_style': rng.choice(['visual', 'social'], n)
+        }).to_csv(config.raw_data_path / 'assessments.csv', index=False)
+        pd.DataFrame({
+            'employee_id': ids[:60],
+            'productivity_score': rng.uniform(0, 100, 60)
+        }).to_csv(config.raw_data_path / 'performance.csv', index=False)
+        
+        return config
+    
+    def test_chunked_extraction_matches_in_memory_join(self, chunked_config):
+        """Test jointure par lookup identique à la jointure en mémoire."""
+        pipeline = UbisoftETLPipeline(chunked_config)
+        
+        chunks = list(pipeline.iter_hr_data_chunks("csv"))
+        
+        assert [len(chunk) for chunk in chunks] == [40, 40, 20]
+        pd.testing.assert_frame_equal(
+            pd.concat(chunks, ignore_index=True),
+            pipeline.extract_hr_data("csv")
+        )
+    
+    def test_transform_chunks_drops_cross_chunk_duplicates(self, chunked_config):
+        """Test suppression des doublons répartis sur plusieurs chunks."""
+        pipeline = UbisoftETLPipeline(chunked_config)
+        chunks = list(pipeline.iter_hr_data_chunks("csv"))
+        chunks.append(chunks[0].head(5))
+        
+        transformed = pd.concat(pipeline.transform_chunks(chunks), ignore_index=True)
+        
+        assert len(transformed) == 100
+        assert transformed['employee_id'].is_unique
+        details = pipeline.get_pipeline_status()['last_execution']['details']
+        assert details['input_rows'] == 105
+        # Rapport de qualité global des chunks bruts, doublons entre chunks compris
+        assert details['data_quality']['total_rows'] == 105
+        assert details['data_quality']['duplicate_rows'] == 5
+    
+    def test_drop_seen_duplicates_within_and_across_chunks(self, chunked_config):
+        """Test doublons internes au chunk et entre chunks, première occurrence gardée."""
+        pipeline = UbisoftETLPipeline(chunked_config)
+        chunks = [
+            pd.DataFrame({'employee_id': ['A', 'B', 'A', 'C'], 'score': [1, 2, 3, 4]}),
+            pd.DataFrame({'employee_id': ['B', 'C'], 'score': [5, 6]}),
+            pd.DataFrame({'employee_id': ['D', 'B', 'D'], 'score': [7, 8, 9]})
+        ]
+        
+        kept = list(pipeline._drop_seen_duplicates(chunks))
+        
+        assert len(kept) == 2
+        assert kept[0]['score'].tolist() == [1, 2, 4]
+        assert kept[1]['employee_id'].tolist() == ['D'] and kept[1]['score'].tolist() == [7]
+    
+    def test_run_chunked_pipeline(self, chunked_config):
+        """Test pipeline complet en streaming vers la base et le CSV."""
+        pipeline = UbisoftETLPipeline(chunked_config)
+        
+        result = pipeline.run_full_pipeline(source_type="csv", output_table="chunked_data")
+        
+        assert result['status'] == 'success'
+        assert result['input_rows'] == 100
+        assert result['output_rows'] == 100
+        
+        loaded = pd.read_sql('SELECT * FROM chunked_data', pipeline.engine)
+        backup = pd.read_csv(result['backup_file'])
+        assert len(loaded) == len(backup) == 100
+        assert loaded['creative_score'].notnull().all()
+
+    def test_extraction_converts_low_cardinality_columns(self, chunked_config):
+        """Test colonnes 'category' à l'extraction et mémoire avant/après."""
+        pipeline = UbisoftETLPipeline(chunked_config)
+        
+        df = pipeline.extract_hr_data("csv")
+        
+        assert isinstance(df['department'].dtype, pd.CategoricalDtype)
+        assert isinstance(df['communication_style'].dtype, pd.CategoricalDtype)
+        assert not isinstance(df['employee_id'].dtype, pd.CategoricalDtype)
+        details = pipeline.get_pipeline_status()['last_execution']['details']
+        assert 'department' in details['columns']
+        assert details['memory_usage_mb_after'] < details['memory_usage_mb_before']
+        
+        transformed = pipeline.transform_employee_data(df)
+        assert list(transformed['department'].cat.categories) == ['design', 'dev', 'qa']
+        assert transformed['department_encoded'].tolist() == transformed['department'].cat.codes.tolist()
+        
+        pipeline.config.categorical_extraction = False
+        assert pipeline.extract_hr_data("csv")['department'].dtype == 'str'
+
+class TestFittedStatistics:
+    """Tests pour les statistiques globales ajustées en deux passes."""
+    
+    @staticmethod
+    def make_config(tmp_path, n, batch_size, decimals=1):
+        """Sources CSV avec valeurs manquantes, en mode chunks."""
+        config = ETLConfig(
+            database_url="sqlite://",
+            raw_data_path=tmp_path / "raw",
+            processed_data_path=tmp_path / "processed",
+            batch_size=batch_size,
+            validation_threshold=0.5,
+            backup_enabled=False,
+            chunked=True
+        )
+        config.raw_data_path.mkdir()
+        
+        rng = np.random.RandomState(0)
+        ids = [f"E{i:05d}" for i in range(n)]
+        department = rng.choice(['Design', 'Dev', 'QA', 'Art'], n).astype(object)
+        department[rng.rand(n) < 0.02] = None
+        creative = rng.uniform(0, 100, n).round(decimals)
+        creative[rng.rand(n) < 0.05] = np.nan
+        pd.DataFrame({
+            'employee_id': ids,
+            'department': department,
+            'hire_date': pd.Timestamp('2015-01-01') + pd.to_timedelta(rng.randint(0, 3000, n), unit='D')
+        }).to_csv(config.raw_data_path / 'employees.csv', index=False)
+        pd.DataFrame({
+            'employee_id': list(rng.permutation(ids)),
+            'creative_score': creative,
+            'burnout_scale': rng.randint(1, 11, n),
+            'communication_style': rng.choice(['visual', 'analytical', 'social'], n)
+        }).to_csv(config.raw_data_path / 'assessments.csv', index=False)
+        
+        return config
+    
+    @staticmethod
+    def in_memory_and_chunked(config):
+        """Transformer les mêmes données en mémoire puis par chunks."""
+        pipeline = UbisoftETLPipeline(config)
+        in_memory = pipeline.transform_employee_data(pipeline.extract_hr_data("csv"))
+        
+        pipeline.data_processor.fit_statistics(
+            lambda: pipeline._drop_seen_duplicates(pipeline.iter_hr_data_chunks("csv"))
+        )
+        chunked = pd.concat(pipeline.transform_chunks(pipeline.iter_hr_data_chunks("csv")))
+        
+        return in_memory.reset_index(drop=True), chunked.reset_index(drop=True)
+    
+    @pytest.mark.parametrize("n,batch_size", [(600, 150), (3000, 700)])
+    def test_chunked_matches_in_memory(self, tmp_path, n, batch_size):
+        """Test résultats identiques (données gardées en mémoire puis relues)."""
+        config = self.make_config(tmp_path, n, batch_size)
+        
+        in_memory, chunked = self.in_memory_and_chunked(config)
+        
+        # tenure_years dépend de l'heure d'exécution
+        pd.testing.assert_frame_equal(in_memory, chunked, rtol=1e-9)
+    
+    def test_donor_sample_matches_in_memory(self, tmp_path):
+        """Test échantillon de donneurs plus petit que les données."""
+        config = self.make_config(tmp_path, 3000, 700)
+        
+        with patch('src.utils.data_processing.NEIGHBOR_IMPUTATION_MAX_DONORS', 400):
+            in_memory, chunked = self.in_memory_and_chunked(config)
+        
+        pd.testing.assert_frame_equal(in_memory, chunked, rtol=1e-9)
+    
+    @pytest.mark.parametrize("method", ["zscore", "mad"])
+    def test_outlier_methods_chunked_match_in_memory(self, tmp_path, method):
+        """Test bornes zscore et MAD issues des sketches, comme en mémoire."""
+        config = self.make_config(tmp_path, 600, 150)
+        config.outlier_method = method
+    
+        in_memory, chunked = self.in_memory_and_chunked(config)
+    
+        pd.testing.assert_frame_equal(in_memory, chunked, rtol=1e-9)
+    
+    def test_imputer_persisted_for_inference(self, tmp_path):
+        """Test imputeur sauvegardé et réutilisable sur une ligne."""
+        config = self.make_config(tmp_path, 1500, 400)
+        pipeline = UbisoftETLPipeline(config)
+        
+        result = pipeline.run_full_pipeline("csv", "imputed_table")
+        
+        imputer = joblib.load(result['imputer_file'])
+        assert imputer.columns == ['creative_score', 'burnout_scale']
+        row = imputer.transform(np.array([np.nan, 4.0]))
+        assert 0 <= row[0] <= 100 and row[1] == 4.0
+    
+    def test_sketch_tolerance_on_continuous_values(self, tmp_path):
+        """Test tolérance quand les quantiles viennent du t-digest."""
+        config = self.make_config(tmp_path, 12000, 2500, decimals=6)
+        
+        in_memory, chunked = self.in_memory_and_chunked(config)
+        
+        assert list(in_memory.columns) == list(chunked.columns)
+        for col in ['creative_score_high', 'creative_score_low']:
+            assert (in_memory[col] != chunked[col]).mean() < 0.005
+        # Médiane d'imputation à ~1e-3 en rang près, soit ~0.1 point sur [0, 100]
+        for col in ['creative_score', 'creativity_vs_dept_avg']:
+            np.testing.assert_allclose(in_memory[col], chunked[col], atol=0.2)
+    
+    def test_unseen_categories_after_fit(self):
+        """Test application à des données absentes de l'ajustement."""
+        processor = DataProcessor()
+        fit_data = pd.DataFrame({
+            'employee_id': ['E1', 'E2', 'E3', 'E4'],
+            'department': ['design', 'dev', 'design', 'dev'],
+            'creative_score': [80.0, 60.0, 70.0, 50.0],
+            'burnout_scale': [2, 4, 6, 8]
+        })
+        processor.fit_statistics(lambda: [fit_data])
+        
+        new_data = pd.DataFrame({
+            'employee_id': ['E5'],
+            'department': ['qa'],
+            'creative_score': [90.0],
+            'burnout_scale': [5]
+        })
+        result = processor.encode_categorical_variables(processor.engineer_features(new_data))
+        
+        assert result['department_encoded'].iloc[0] == -1
+        assert result['creativity_vs_dept_avg'].iloc[0] == pytest.approx(90.0 - 65.0)
+        assert result['creative_score_high'].iloc[0] == 1
+
+class TestBulkLoaders:
+    """Tests pour les stratégies de chargement en masse."""
+    
+    @pytest.fixture
+    def frame(self):
+        return pd.DataFrame({
+            'employee_id': ['E001', 'E002', 'E003', 'E"4'],
+            'score': [1.5, np.nan, 3.0, 4.25],
+            'level': [1, 2, 3, 4],
+            'active': [True, False, True, True],
+            'hire_date': pd.to_datetime(['2020-01-15', None, '2021-06-01 12:30:00', '2019-03-03 00:00:00'], format='mixed'),
+            'note': ['a,b', None, 'c\nd', '']
+        })
+    
+    def test_sqlite_loader_matches_to_sql(self, tmp_path, frame):
+        """executemany charge les mêmes valeurs que to_sql."""
+        from sqlalchemy import create_engine
+        engine = create_engine(f"sqlite:///{tmp_path / 'bulk.db'}")
+        
+        assert BulkLoader(engine, batch_size=3).load(frame, 'reference', 'replace') == 4
+        assert SQLiteBulkLoader(engine, batch_size=3).load(frame, 'bulk', 'replace') == 4
+        
+        reference = pd.read_sql("SELECT * FROM reference", engine)
+        loaded = pd.read_sql("SELECT * FROM bulk", engine)
+        pd.testing.assert_frame_equal(loaded, reference)
+        
+        # append conserve les lignes existantes, les pragmas sont restaurés
+        SQLiteBulkLoader(engine, batch_size=3).load(frame, 'bulk', 'append')
+        assert pd.read_sql("SELECT COUNT(*) AS n FROM bulk", engine)['n'].iloc[0] == 8
+        with engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA synchronous").scalar() != 0
+    
+    def test_get_bulk_loader_selects_by_dialect(self):
+        from sqlalchemy import create_engine
+        
+        assert isinstance(get_bulk_loader(create_engine("sqlite://")), SQLiteBulkLoader)
+        
+        postgres = MagicMock()
+        postgres.dialect.name, postgres.dialect.driver = 'postgresql', 'psycopg2'
+        assert isinstance(get_bulk_loader(postgres), PostgresCopyLoader)
+        
+        postgres.dialect.driver = 'asyncpg'
+        assert type(get_bulk_loader(postgres)) is BulkLoader
+        assert type(get_bulk_loader(create_engine("sqlite://"), strategy='to_sql')) is BulkLoader
+        
+        with pytest.raises(ValueError):
+            get_bulk_loader(postgres, strategy='unknown')
+    
+    def test_csv_stream(self, frame):
+        """Le flux produit le même CSV quelle que soit la taille des lectures."""
+        batches = lambda: (frame.iloc[i:i + 2] for i in range(0, len(frame), 2))
+        expected = CsvStream(batches()).read()
+        
+        stream = CsvStream(batches())
+        pieces = []
+        while True:
+            piece = stream.read(7)
+            if not piece:
+                break
+            pieces.append(piece)
+        
+        assert b"".join(pieces) == expected
+        assert expected.decode().splitlines()[0] == 'E001,1.5,1,True,2020-01-15 00:00:00.000000,"a,b"'
+        assert '"E""4"' in expected.decode()
+    
+    def test_postgres_copy_loader(self, frame):
+        """COPY FROM STDIN reçoit tout le CSV dans une seule transaction."""
+        engine = MagicMock()
+        cursor = engine.raw_connection.return_value.cursor.return_value
+        received = {}
+        cursor.copy_expert.side_effect = lambda sql, stream: received.update(sql=sql, data=stream.read())
+        cursor.rowcount = 4
+        
+        loader = PostgresCopyLoader(engine, batch_size=2)
+        with patch.object(PostgresCopyLoader, 'create_table') as create_table:
+            assert loader.load(frame, 'employees', 'replace') == 4
+        
+        create_table.assert_called_once()
+        assert received['sql'].startswith('COPY "employees" ("employee_id", "score"')
+        assert received['sql'].endswith('FROM STDIN WITH (FORMAT csv)')
+        assert received['data'].decode().count('\n') == 5
+        engine.raw_connection.return_value.commit.assert_called_once()
+    
+    def test_pipeline_uses_bulk_loader(self, tmp_path):
+        config = ETLConfig(
+            database_url=f"sqlite:///{tmp_path / 'etl.db'}",
+            raw_data_path=tmp_path,
+            processed_data_path=tmp_path,
+            backup_enabled=False
+        )
+        pipeline = UbisoftETLPipeline(config)
+        df = pd.DataFrame({'employee_id': [f"E{i:03d}" for i in range(50)], 'value': range(50)})
+        
+        pipeline.load_to_database(df, 'employees')
+        
+        assert pipeline.execution_log[-1]['details']['load_strategy'] == 'sqlite_executemany'
+        assert len(pd.read_sql("SELECT * FROM employees", pipeline.engine)) == 50
+
+class TestStagingSwap:
+    """Tests pour le remplacement par table de staging."""
+    
+    @pytest.fixture
+    def pipeline(self, tmp_path):
+        config = ETLConfig(
+            database_url=f"sqlite:///{tmp_path / 'swap.db'}",
+            raw_data_path=tmp_path,
+            processed_data_path=tmp_path,
+            batch_size=2
+        )
+        return UbisoftETLPipeline(config)
+    
+    @staticmethod
+    def tables(pipeline):
+        from sqlalchemy import inspect
+        return set(inspect(pipeline.engine).get_table_names())
+    
+    def test_swap_keeps_previous_generation(self, pipeline):
+        first = pd.DataFrame({'employee_id': ['E001', 'E002'], 'score': [1, 2]})
+        second = pd.DataFrame({'employee_id': ['E003', 'E004', 'E005'], 'score': [3, 4, 5]})
+        
+        pipeline.load_to_database(first, 'employees')
+        pipeline.load_chunks_to_database([second.iloc[:2], second.iloc[2:]], 'employees')
+        
+        assert self.tables(pipeline) == {'employees', 'employees_previous'}
+        assert pd.read_sql("SELECT * FROM employees", pipeline.engine)['employee_id'].tolist() == ['E003', 'E004', 'E005']
+        assert pd.read_sql("SELECT * FROM employees_previous", pipeline.engine)['employee_id'].tolist() == ['E001', 'E002']
+        
+        from sqlalchemy import inspect
+        indexes = inspect(pipeline.engine).get_indexes('employees')
+        assert [index['column_names'] for index in indexes] == [['employee_id']]
+        assert pipeline.execution_log[-1]['details']['previous_table'] == 'employees_previous'
+    
+    def test_live_table_untouched_until_swap(self, pipeline):
+        """Pendant le chargement puis après un échec, la table courante reste lisible et complète."""
+        pipeline.load_to_database(pd.DataFrame({'employee_id': ['E001'], 'score': [1]}), 'employees')
+        seen_during_load = []
+        
+        def chunks():
+            yield pd.DataFrame({'employee_id': ['E002'], 'score': [2]})
+            seen_during_load.append(pd.read_sql("SELECT * FROM employees", pipeline.engine)['employee_id'].tolist())
+            raise RuntimeError("source interrompue")
+        
+        with pytest.raises(RuntimeError):
+            pipeline.load_chunks_to_database(chunks(), 'employees')
+        
+        assert seen_during_load == [['E001']]
+        assert pd.read_sql("SELECT * FROM employees", pipeline.engine)['employee_id'].tolist() == ['E001']
+        assert self.tables(pipeline) == {'employees'}
+    
+    def test_without_backup_previous_is_dropped(self, pipeline):
+        pipeline.config.backup_enabled = False
+        df = pd.DataFrame({'employee_id': ['E001'], 'score': [1]})
+        
+        pipeline.load_to_database(df, 'employees')
+        pipeline.load_to_database(df, 'employees')
+        
+        assert self.tables(pipeline) == {'employees'}
+
+class TestIncrementalETL:
+    """Tests pour le mode incrémental (CDC)."""
+    
+    @pytest.fixture
+    def sources(self, tmp_path):
+        (tmp_path / "raw").mkdir()
+        n = 60
+        rng = np.random.RandomState(0)
+        ids = [f"E{i:03d}" for i in range(n)]
+        employees = pd.DataFrame({
+            'employee_id': ids,
+            'department': rng.choice(['design', 'qa', 'art'], n),
+            'hire_date': '2020-01-15',
+            'status': 'active'
+        })
+        assessments = pd.DataFrame({
+            'employee_id': ids,
+            'creative_score': rng.uniform(0, 100, n).round(1),
+            'burnout_scale': rng.randint(1, 11, n),
+            'communication_style': rng.choice(['visual', 'social'], n),
+            'assessment_date': '2025-01-15'
+        })
+        employees.to_csv(tmp_path / "raw" / "employees.csv", index=False)
+        assessments.to_csv(tmp_path / "raw" / "assessments.csv", index=False)
+        
+        config = ETLConfig(
+            database_url=f"sqlite:///{tmp_path / 'incremental.db'}",
+            raw_data_path=tmp_path / "raw",
+            processed_data_path=tmp_path / "processed",
+            batch_size=25,
+            incremental=True
+        )
+        return config, employees, assessments
+    
+    @staticmethod
+    def run(config):
+        pipeline = UbisoftETLPipeline(config)
+        return pipeline, pipeline.run_full_pipeline(source_type="csv", output_table="employees_out")
+    
+    def test_only_changed_rows_are_upserted(self, sources):
+        config, employees, assessments = sources
+        
+        _, first = self.run(config)
+        assert first['full_refresh'] is True
+        assert first['output_rows'] == 60
+        
+        # Sources inchangées : rien n'est relu
+        _, second = self.run(config)
+        assert second['input_rows'] == 0 and second['changed_rows'] == 0
+        
+        # Fichier réécrit à l'identique : relu, mais aucune ligne modifiée
+        assessments.to_csv(config.raw_data_path / "assessments.csv", index=False)
+        _, rewritten = self.run(config)
+        assert rewritten['input_rows'] == 60 and rewritten['changed_rows'] == 0
+        
+        pipeline = UbisoftETLPipeline(config)
+        before = pd.read_sql("SELECT * FROM employees_out", pipeline.engine).set_index('employee_id')
+        
+        assessments.loc[assessments['employee_id'] == 'E007', 'burnout_scale'] = 9
+        assessments.to_csv(config.raw_data_path / "assessments.csv", index=False)
+        employees.iloc[:-1].to_csv(config.raw_data_path / "employees.csv", index=False)
+        pipeline, third = self.run(config)
+        
+        assert third['full_refresh'] is False
+        assert (third['changed_rows'], third['output_rows'], third['deleted_rows']) == (1, 1, 1)
+        
+        after = pd.read_sql("SELECT * FROM employees_out", pipeline.engine).set_index('employee_id')
+        assert 'E059' not in after.index
+        assert after.loc['E007', 'burnout_scale'] == 9
+        assert after.loc['E007', 'creativity_burnout_ratio'] == pytest.approx(after.loc['E007', 'creative_score'] / 10)
+        
+        unchanged = before.drop(index=['E007', 'E059']).drop(columns=['tenure_years'])
+        pd.testing.assert_frame_equal(after.drop(index='E007').drop(columns=['tenure_years']), unchanged)
+    
+    def test_database_source_uses_assessment_watermark(self, sources, tmp_path):
+        config, employees, assessments = sources
+        source = sqlite3.connect(tmp_path / "incremental.db")
+        # WAL : lecture en streaming et écritures simultanées sur le même fichier
+        source.execute("PRAGMA journal_mode = WAL")
+        employees.to_sql('employees', source, index=False)
+        assessments.to_sql('assessments', source, index=False)
+        pd.DataFrame({'employee_id': employees['employee_id'], 'productivity_score': 50.0,
+                      'innovation_index': 5.0}).to_sql('performance', source, index=False)
+        source.commit()
+        
+        pipeline = UbisoftETLPipeline(config)
+        first = pipeline.run_full_pipeline(source_type="database", output_table="employees_out")
+        assert first['full_refresh'] is True
+        
+        source.execute("UPDATE assessments SET creative_score = 12.5, assessment_date = '2025-02-01' "
+                       "WHERE employee_id = 'E003'")
+        source.commit()
+        source.close()
+        
+        second = UbisoftETLPipeline(config).run_full_pipeline(source_type="database", output_table="employees_out")
+        
+        assert (second['input_rows'], second['changed_rows']) == (1, 1)
+        out = pd.read_sql("SELECT * FROM employees_out", pipeline.engine).set_index('employee_id')
+        assert out.loc['E003', 'creative_score'] == 12.5
+        watermark = pd.read_sql("SELECT watermark FROM etl_watermarks", pipeline.engine)['watermark'].iloc[0]
+        assert watermark == '2025-02-01'
+    
+    def test_integer_ids_keep_unchanged_rows(self, sources):
+        """Identifiants entiers : les clés relues en texte correspondent aux lignes source."""
+        config, employees, assessments = sources
+        employees['employee_id'] = range(1, len(employees) + 1)
+        assessments['employee_id'] = range(1, len(assessments) + 1)
+        employees.to_csv(config.raw_data_path / "employees.csv", index=False)
+        assessments.to_csv(config.raw_data_path / "assessments.csv", index=False)
+    
+        _, first = self.run(config)
+        assert first['output_rows'] == 60
+    
+        # Fichier réécrit à l'identique : aucune ligne modifiée ni supprimée
+        assessments.to_csv(config.raw_data_path / "assessments.csv", index=False)
+        pipeline, second = self.run(config)
+        assert (second['input_rows'], second['changed_rows'], second['deleted_rows']) == (60, 0, 0)
+        assert pd.read_sql("SELECT COUNT(*) AS n FROM employees_out", pipeline.engine)['n'].iloc[0] == 60
+    
+        employees.iloc[:-1].to_csv(config.raw_data_path / "employees.csv", index=False)
+        pipeline, third = self.run(config)
+        assert (third['changed_rows'], third['deleted_rows']) == (0, 1)
+        out = pd.read_sql("SELECT employee_id FROM employees_out", pipeline.engine)
+        assert sorted(out['employee_id']) == list(range(1, 60))
+    
+    def test_content_hashes_ignore_chunk_dtypes(self):
+        """Une colonne entière dans un chunk et flottante dans l'autre donne la même empreinte."""
+        as_int = pd.DataFrame({'employee_id': ['E1'], 'burnout_scale': [3], 'style': ['visual']})
+        as_float = pd.DataFrame({'style': ['visual'], 'employee_id': ['E1'], 'burnout_scale': [3.0]})
+        changed = as_int.assign(burnout_scale=4)
+        
+        assert content_hashes(as_int).iloc[0] == content_hashes(as_float).iloc[0]
+        assert content_hashes(as_int).iloc[0] != content_hashes(changed).iloc[0]
+
+class TestLoadVerification:
+    """Tests pour la vérification des chargements sans relecture."""
+    
+    @pytest.fixture
+    def pipeline(self, tmp_path):
+        config = ETLConfig(
+            database_url=f"sqlite:///{tmp_path / 'verify.db'}",
+            raw_data_path=tmp_path,
+            processed_data_path=tmp_path,
+            batch_size=2,
+            backup_enabled=False
+        )
+        return UbisoftETLPipeline(config)
+    
+    @pytest.fixture
+    def frame(self):
+        return pd.DataFrame({'employee_id': ['E001', 'E002', 'E003'], 'note': ['a', 'b\nc', None]})
+    
+    def test_no_reread_by_default(self, pipeline, frame, tmp_path):
+        with patch('src.etl.pd.read_sql') as read_sql, patch('src.loaders.pd.read_csv') as read_csv:
+            pipeline.load_to_database(frame, 'employees')
+            pipeline.load_to_csv(frame, tmp_path / 'out.csv')
+            list(pipeline._write_csv_chunks([frame.iloc[:2], frame.iloc[2:]], tmp_path / 'chunks.csv'))
+        
+        read_sql.assert_not_called()
+        read_csv.assert_not_called()
+        
+        details = pipeline.execution_log[-1]['details']
+        assert details['rows_saved'] == 3
+        assert details['bytes_written'] == (tmp_path / 'chunks.csv').stat().st_size
+        assert details['checksum'] == pipeline.execution_log[-2]['details']['checksum']
+        pd.testing.assert_frame_equal(pd.read_csv(tmp_path / 'chunks.csv'), pd.read_csv(tmp_path / 'out.csv'))
+    
+    def test_paranoid_mode_rereads(self, pipeline, frame, tmp_path):
+        pipeline.config.paranoid_verification = True
+        
+        with patch.object(pipeline, '_verify_table_count', wraps=pipeline._verify_table_count) as verify:
+            pipeline.load_to_database(frame, 'employees')
+        verify.assert_called_once()
+        
+        with patch('src.loaders.pd.read_csv', wraps=pd.read_csv) as read_csv:
+            pipeline.load_to_csv(frame, tmp_path / 'out.csv')
+        read_csv.assert_called_once()
+    
+    def test_driver_count_mismatch_raises(self, pipeline, frame):
+        with patch.object(pipeline.bulk_loader, '_insert', return_value=2):
+            with pytest.raises(ValueError, match="incohérent"):
+                pipeline.load_to_database(frame, 'employees')
+    
+    def test_checksum_writer_detects_tampering(self, tmp_path, frame):
+        path = tmp_path / 'out.csv'
+        with CsvChecksumWriter(path) as writer:
+            writer.write(frame)
+        writer.verify(paranoid=True)
+        
+        # Même taille, contenu différent : seule la relecture le détecte
+        path.write_bytes(path.read_bytes().replace(b'E001', b'E009'))
+        writer.verify()
+        with pytest.raises(ValueError, match="Empreinte"):
+            writer.verify(paranoid=True)
+        
+        path.write_bytes(path.read_bytes()[:-1])
+        with pytest.raises(ValueError, match="Taille"):
+            writer.verify()
+
+class TestParquetIO:
+    """Tests pour les entrées/sorties Parquet."""
+    
+    @pytest.fixture
+    def frame(self):
+        return pd.DataFrame({
+            'employee_id': [f"E{i:03d}" for i in range(6)],
+            'department': ['design', 'qa', 'design', 'art', 'qa', 'design'],
+            'hire_date': pd.to_datetime(['2020-01-15'] * 6),
+            'burnout_scale': [1, 2, 3, 4, 5, 6],
+            'creative_score': [10.5, 20.0, np.nan, 40.0, 50.0, 60.0]
+        })
+    
+    def test_partitioned_writer_one_file_per_partition(self, tmp_path, frame):
+        with ParquetChunkWriter(tmp_path / 'dataset', ['department']) as writer:
+            writer.write(frame.iloc[:3])
+            writer.write(frame.iloc[3:])
+        writer.verify(paranoid=True)
+        
+        assert writer.rows == 6
+        assert sorted(p.parent.name for p in writer.files) == ['department=art', 'department=design', 'department=qa']
+        
+        # Projection et filtre de partition : seules les données utiles sont lues
+        pipeline = UbisoftETLPipeline(ETLConfig(
+            database_url="sqlite://", raw_data_path=tmp_path, processed_data_path=tmp_path
+        ))
+        design = pipeline.extract_from_parquet(
+            tmp_path / 'dataset', columns=['employee_id', 'burnout_scale'],
+            filters=[('department', '==', 'design')]
+        )
+        assert list(design.columns) == ['employee_id', 'burnout_scale']
+        assert design.sort_values('employee_id')['burnout_scale'].tolist() == [1, 3, 6]
+        assert design['burnout_scale'].dtype == np.int64
+    
+    def test_schema_is_fixed_by_first_frame(self, tmp_path, frame):
+        with ParquetChunkWriter(tmp_path / 'out.parquet') as writer:
+            writer.write(frame.iloc[:3])
+            writer.write(frame.iloc[3:][list(reversed(frame.columns))].assign(burnout_scale=[4.0, np.nan, 6.0]))
+        writer.verify()
+        
+        loaded = pd.read_parquet(tmp_path / 'out.parquet')
+        assert list(loaded.columns) == list(frame.columns)
+        assert loaded['hire_date'].dtype.kind == 'M'
+        assert loaded['burnout_scale'].isna().sum() == 1
+    
+    def test_pipeline_parquet_source_and_output(self, tmp_path):
+        raw = tmp_path / "raw"
+        raw.mkdir()
+        employees = pd.DataFrame({
+            'employee_id': [f"E{i:03d}" for i in range(40)],
+            'department': ['design', 'qa'] * 20,
+            'hire_date': '2020-01-15',
+            'status': 'active'
+        })
+        assessments = pd.DataFrame({
+            'employee_id': employees['employee_id'],
+            'creative_score': np.linspace(10, 90, 40),
+            'burnout_scale': np.tile([2, 5, 8, 3], 10)
+        })
+        for name, df in (('employees', employees), ('assessments', assessments)):
+            df.to_csv(raw / f"{name}.csv", index=False)
+            df.to_parquet(raw / f"{name}.parquet", index=False)
+        
+        results = {}
+        for chunked in (False, True):
+            config = ETLConfig(
+                database_url=f"sqlite:///{tmp_path / f'parquet_{chunked}.db'}",
+                raw_data_path=raw,
+                processed_data_path=tmp_path / f"processed_{chunked}",
+                batch_size=15,
+                chunked=chunked,
+                output_format="parquet"
+            )
+            pipeline = UbisoftETLPipeline(config)
+            summary = pipeline.run_full_pipeline(source_type="parquet", output_table="out")
+            
+            dataset = Path(summary['backup_file'])
+            assert {p.name.split('=')[0] for p in dataset.iterdir()} == {'run_date'}
+            results[chunked] = pipeline.extract_from_parquet(dataset).sort_values('employee_id').reset_index(drop=True)
+        
+        csv_pipeline = UbisoftETLPipeline(config)
+        pd.testing.assert_frame_equal(
+            csv_pipeline.extract_hr_data("parquet"), csv_pipeline.extract_hr_data("csv"), check_dtype=False
+        )
+        pd.testing.assert_frame_equal(
+            results[False].drop(columns='tenure_years'), results[True].drop(columns='tenure_years'),
+            check_exact=False
+        )
+        assert set(results[False]['department'].astype(str)) == {'design', 'qa'}
+
+class TestParallelExtraction:
+    """Tests pour l'extraction simultanée des sources."""
+    
+    @pytest.fixture
+    def sources(self, tmp_path):
+        n = 30
+        employees = pd.DataFrame({
+            'employee_id': [f"E{i:03d}" for i in range(n)],
+            'department': ['design', 'qa', 'art'] * 10,
+            'hire_date': '2020-01-15',
+            'status': ['active'] * (n - 2) + ['inactive'] * 2
+        })
+        assessments = pd.DataFrame({
+            'employee_id': [f"E{i:03d}" for i in range(0, n, 2)],
+            'creative_score': np.arange(15, dtype=float),
+            'burnout_scale': np.arange(15) % 10 + 1,
+            'communication_style': 'visual',
+            'assessment_date': '2025-01-15'
+        })
+        performance = pd.DataFrame({
+            'employee_id': [f"E{i:03d}" for i in range(0, n, 3)],
+            'productivity_score': np.arange(10, dtype=float),
+            'innovation_index': np.arange(10, dtype=float) / 10
+        })
+        for name, df in (('employees', employees), ('assessments', assessments), ('performance', performance)):
+            df.to_csv(tmp_path / f"{name}.csv", index=False)
+        
+        return tmp_path, {'employees': employees, 'assessments': assessments, 'performance': performance}
+    
+    def make_pipeline(self, tmp_path, **kwargs):
+        return UbisoftETLPipeline(ETLConfig(
+            database_url=f"sqlite:///{tmp_path / 'source.db'}",
+            raw_data_path=tmp_path,
+            processed_data_path=tmp_path,
+            **kwargs
+        ))
+    
+    def test_csv_sources_read_concurrently(self, sources):
+        import threading
+        tmp_path, _ = sources
+        sequential = self.make_pipeline(tmp_path, extract_workers=1).extract_hr_data("csv")
+        
+        pipeline = self.make_pipeline(tmp_path)
+        threads = set()
+        original = pipeline.extract_from_csv
+        def recording(path):
+            threads.add(threading.current_thread().name)
+            return original(path)
+        
+        with patch.object(pipeline, 'extract_from_csv', side_effect=recording):
+            parallel = pipeline.extract_hr_data("csv")
+        
+        pd.testing.assert_frame_equal(parallel, sequential)
+        assert all(name.startswith("etl-extract") for name in threads)
+        
+        step = [s for s in pipeline.execution_log if s['step'] == 'extract_sources'][-1]
+        assert step['details']['workers'] == 3
+        assert set(step['details']['sources']) == {'employees', 'assessments', 'performance'}
+        assert step['details']['sources']['assessments']['rows'] == 15
+        assert step['details']['sources']['employees']['duration_seconds'] >= 0
+    
+    def test_parallel_database_extraction_matches_join_query(self, sources):
+        tmp_path, frames = sources
+        with sqlite3.connect(tmp_path / 'source.db') as conn:
+            for name, df in frames.items():
+                df.to_sql(name, conn, index=False)
+        
+        joined = self.make_pipeline(tmp_path).extract_hr_data("database")
+        parallel = self.make_pipeline(tmp_path, parallel_db_extraction=True).extract_hr_data("database")
+        
+        assert len(parallel) == 28
+        pd.testing.assert_frame_equal(
+            parallel.sort_values('employee_id').reset_index(drop=True),
+            joined.sort_values('employee_id').reset_index(drop=True)
+        )
+
+class TestParallelTransform:
+    """Tests pour la transformation parallèle par département."""
+    
+    @staticmethod
+    def raw_data(n, seed=0):
+        rng = np.random.RandomState(seed)
+        df = pd.DataFrame({
+            'employee_id': [f"E{i:05d}" for i in range(n)],
+            'department': rng.choice([' Design', 'QA ', 'art', 'production'], n).astype(object),
+            'hire_date': pd.Timestamp('2015-01-01') + pd.to_timedelta(rng.randint(0, 3000, n), unit='D'),
+            'status': 'active',
+            'creative_score': rng.normal(60, 20, n).round(1),
+            'burnout_scale': rng.randint(1, 11, n).astype(float),
+            'communication_style': rng.choice(['visual', 'analytical', 'social'], n).astype(object),
+            'productivity_score': rng.uniform(0, 100, n)
+        })
+        df.loc[rng.rand(n) < 0.05, 'creative_score'] = np.nan
+        df.loc[rng.rand(n) < 0.05, 'department'] = np.nan
+        # Doublon dont la seconde occurrence change de département
+        return pd.concat([df, df.iloc[:2].assign(department='qa')], ignore_index=True)
+    
+    @pytest.mark.parametrize("n", [300, 3000])
+    def test_parallel_matches_serial(self, tmp_path, n):
+        """KNN (petit volume) comme médiane : résultat identique au mode série."""
+        raw = self.raw_data(n)
+        
+        serial = UbisoftETLPipeline(ETLConfig(
+            database_url="sqlite://", raw_data_path=tmp_path, processed_data_path=tmp_path
+        ))
+        parallel = UbisoftETLPipeline(ETLConfig(
+            database_url="sqlite://", raw_data_path=tmp_path, processed_data_path=tmp_path,
+            transform_workers=2, parallel_transform_min_rows=0
+        ))
+        
+        expected = serial.transform_employee_data(raw)
+        result = parallel.transform_employee_data(raw)
+        
+        assert parallel.execution_log[-1]['details']['partitions'] > 4
+        assert parallel.data_processor.statistics is None
+        # Ancienneté : date de référence différente entre les deux exécutions
+        pd.testing.assert_frame_equal(result.drop(columns='tenure_years'),
+                                      expected.drop(columns='tenure_years'))
+        np.testing.assert_allclose(result['tenure_years'], expected['tenure_years'], atol=1e-3)
+    
+    def test_small_input_stays_serial(self, tmp_path):
+        pipeline = UbisoftETLPipeline(ETLConfig(
+            database_url="sqlite://", raw_data_path=tmp_path, processed_data_path=tmp_path,
+            transform_workers=4
+        ))
+        
+        with patch('src.etl.ProcessPoolExecutor') as pool:
+            pipeline.transform_employee_data(self.raw_data(100))
+        
+        pool.assert_not_called()
+        assert pipeline.execution_log[-1]['details']['partitions'] == 1
+
+class TestStageProfiling:
+    """Tests pour l'instrumentation des étapes du pipeline."""
+    
+    @pytest.fixture
+    def raw_dir(self, tmp_path):
+        raw_dir = tmp_path / "data" / "raw"
+        raw_dir.mkdir(parents=True)
+        pd.DataFrame({
+            'employee_id': ['E001', 'E002', 'E003'],
+            'department': ['Design', 'Dev', 'QA'],
+            'hire_date': ['2020-01-15', '2021-03-10', '2019-11-20'],
+            'status': ['active', 'active', 'active']
+        }).to_csv(raw_dir / 'employees.csv', index=False)
+        pd.DataFrame({
+            'employee_id': ['E001', 'E002', 'E003'],
+            'creative_score': [85.0, 72.0, np.nan],
+            'burnout_scale': [3, 6, 2]
+        }).to_csv(raw_dir / 'assessments.csv', index=False)
+        
+        return raw_dir
+    
+    def make_pipeline(self, raw_dir, **overrides):
+        return UbisoftETLPipeline(ETLConfig(
+            database_url=f"sqlite:///{raw_dir.parent / 'test.db'}",
+            raw_data_path=raw_dir,
+            processed_data_path=raw_dir.parent / "processed",
+            backup_enabled=False,
+            **overrides
+        ))
+    
+    def test_stages_in_pipeline_status(self, raw_dir):
+        pipeline = self.make_pipeline(raw_dir)
+        pipeline.run_full_pipeline("csv", "profiled_table")
+        
+        status = pipeline.get_pipeline_status()
+        stages = {stage['path']: stage for stage in status['stages']}
+        
+        assert list(stages)[0] == 'run_full_pipeline'
+        transform = stages['run_full_pipeline;transform_employee_data']
+        assert (transform['calls'], transform['rows_in'], transform['rows_out']) == (1, 3, 3)
+        imputation = stages['run_full_pipeline;transform_employee_data;handle_missing_values']
+        assert imputation['depth'] == 2
+        assert imputation['wall_seconds'] <= transform['wall_seconds'] <= stages['run_full_pipeline']['wall_seconds']
+        assert stages['run_full_pipeline;load_to_database']['rows_in'] == 3
+        # Sans profile_memory : pas de tracemalloc ni de taille des DataFrames
+        assert transform['bytes_in'] is None and transform['peak_memory_bytes'] is None
+        json.dumps(status)
+    
+    def test_memory_profiling(self, raw_dir):
+        pipeline = self.make_pipeline(raw_dir, profile_memory=True)
+        pipeline.run_full_pipeline("csv", "profiled_table")
+        
+        stages = {stage['path']: stage for stage in pipeline.get_pipeline_status()['stages']}
+        transform = stages['run_full_pipeline;transform_employee_data']
+        
+        assert transform['bytes_in'] > 0 and transform['bytes_out'] > 0
+        assert 0 < transform['peak_memory_bytes'] <= stages['run_full_pipeline']['peak_memory_bytes']
+        assert not tracemalloc.is_tracing()
+    
+    def test_failed_stage_counted(self, raw_dir):
+        pipeline = self.make_pipeline(raw_dir)
+        
+        with patch.object(pipeline.data_processor, 'engineer_features', side_effect=ValueError("boom")):
+            with pytest.raises(Exception):
+                pipeline.run_full_pipeline("csv", "profiled_table")
+        
+        stages = {stage['path']: stage for stage in pipeline.get_pipeline_status()['stages']}
+        assert stages['run_full_pipeline']['errors'] == 1
+        assert stages['run_full_pipeline;transform_employee_data']['errors'] == 1
+    
+    def test_prometheus_metrics(self, raw_dir):
+        pipeline = self.make_pipeline(raw_dir)
+        pipeline.run_full_pipeline("csv", "profiled_table")
+        
+        metrics = pipeline.get_prometheus_metrics()
+        
+        assert "# TYPE ubisoft_etl_stage_wall_seconds gauge" in metrics
+        assert ('ubisoft_etl_stage_calls_total{stage="clean_employee_data",'
+                'path="run_full_pipeline;transform_employee_data;clean_employee_data"} 1') in metrics
+        assert "ubisoft_etl_stage_bytes_in" not in metrics
+    
+    def test_profiling_disabled(self, raw_dir):
+        pipeline = self.make_pipeline(raw_dir, profiling=False)
+        pipeline.run_full_pipeline("csv", "profiled_table")
+        
+        assert pipeline.data_processor.profiler is None
+        assert pipeline.get_pipeline_status()['stages'] == []
+        assert pipeline.get_prometheus_metrics() == ""
+    
+    def test_run_daily_etl_reports(self, raw_dir, monkeypatch, caplog):
+        monkeypatch.chdir(raw_dir.parent.parent)
+        monkeypatch.setenv("DATABASE_URL", f"sqlite:///{raw_dir.parent / 'daily.db'}")
+        metrics_file = raw_dir.parent / "etl.prom"
+        
+        with caplog.at_level("INFO", logger="src.etl"):
+            run_daily_etl(profile=True, prometheus_file=metrics_file)
+        
+        assert "ubisoft_etl_stage_wall_seconds" in metrics_file.read_text()
+        summary = next(record.message for record in caplog.records if "Profil des étapes" in record.message)
+        assert "\n  transform_employee_data" in summary
+        assert "\n    handle_missing_values" in summary
+        assert "stage_peak_memory_bytes" not in metrics_file.read_text()
+        
+        # Mesure mémoire demandée en paramètre, sans toucher à l'environnement
+        monkeypatch.delenv("ETL_PROFILE_MEMORY", raising=False)
+        run_daily_etl(prometheus_file=metrics_file, profile_memory=True)
+        
+        assert "ubisoft_etl_stage_peak_memory_bytes" in metrics_file.read_text()
+        assert "ETL_PROFILE_MEMORY" not in os.environ
+
 class TestETLValidation:
     """Tests de validation des données ETL."""
     
@@ -135,6 +135,33 @@ class TestADHDPredictor:
         assert result['confidence'] in ['faible', 'modérée', 'élevée', 'très_élevée']
         assert isinstance(result['recommendations'], list)
     
+    def test_predict_with_explanation_columnar(self, temp_model_dir, sample_model_data):
+        """Test mode colonnaire : mêmes résultats que le mode par ligne."""
+        predictor = ADHDPredictor(temp_model_dir)
+        X, _ = sample_model_data
+        
+        records = predictor.predict_with_explanation(X)
+        columnar = predictor.predict_with_explanation(X, output='columnar')
+        
+        results = columnar['results']
+        assert len(results) == len(X)
+        assert set(columnar['feature_importance']) == set(X.columns)
+        
+        for record, (_, row) in zip(records, results.iterrows()):
+            assert record['prediction'] == row['prediction']
+            assert record['probability_risk'] == pytest.approx(row['probability_risk'])
+            assert record['confidence'] == row['confidence']
+            assert record['recommendations'] == columnar['recommendation_sets'][row['recommendation_set']]
+    
+    def test_confidence_buckets(self):
+        """Test bornes des niveaux de confiance."""
+        predictor = ADHDPredictor()
+        probabilities = np.array([[0.5, 0.5], [0.3, 0.7], [0.2, 0.8], [0.1, 0.9], [0.95, 0.05]])
+        
+        levels = [predictor._calculate_confidence(p) for p in probabilities]
+        
+        assert levels == ['faible', 'modérée', 'élevée', 'très_élevée', 'très_élevée']
+    
     def test_predict_missing_features(self, temp_model_dir):
         """Test prédiction avec features manquantes."""
         predictor = ADHDPredictor(temp_model_dir)
@@ -158,6 +185,158 @@ class TestADHDPredictor:
         with pytest.raises(ValueError, match="Aucun modèle chargé"):
             predictor.predict(X_test)
 
+class TestCompiledForest:
+    """Tests de parité du moteur compilé avec scikit-learn."""
+    
+    @pytest.fixture
+    def forest_data(self):
+        """Données et forêt comparable au modèle de production."""
+        rng = np.random.RandomState(0)
+        X = pd.DataFrame(rng.uniform(0, 100, (500, 5)), columns=[
+            'creative_score', 'burnout_scale', 'creativity_burnout_ratio',
+            'high_creativity', 'high_burnout'
+        ])
+        y = pd.Series(((X['creative_score'] + rng.normal(0, 20, 500)) > 60).astype(int))
+        
+        model = RandomForestClassifier(
+            n_estimators=50, max_depth=10, min_samples_leaf=2,
+            class_weight='balanced', random_state=42
+        ).fit(X, y)
+        
+        return X, model
+    
+    @pytest.fixture
+    def pickled_model_dir(self, forest_data, tmp_path):
+        """Modèle picklé avec ses métadonnées."""
+        X, model = forest_data
+        joblib.dump(model, tmp_path / "random_forest.pkl")
+        with open(tmp_path / "model_metadata.json", 'w') as f:
+            json.dump({'feature_names': list(X.columns)}, f)
+        
+        return tmp_path
+    
+    def test_compiled_matches_pickled_model(self, forest_data, pickled_model_dir):
+        """Test probabilités identiques bit à bit au modèle picklé."""
+        X, _ = forest_data
+        sklearn_predictor = ADHDPredictor(pickled_model_dir, engine='sklearn')
+        compiled_predictor = ADHDPredictor(pickled_model_dir, engine='compiled')
+        
+        assert sklearn_predictor.compiled_model is None
+        assert compiled_predictor.compiled_model is not None
+        
+        X_new = pd.DataFrame(
+            np.random.RandomState(1).uniform(-10, 110, (1000, 5)), columns=X.columns
+        )
+        np.testing.assert_array_equal(
+            compiled_predictor.predict_proba(X_new), sklearn_predictor.predict_proba(X_new)
+        )
+        np.testing.assert_array_equal(
+            compiled_predictor.predict(X_new), sklearn_predictor.predict(X_new)
+        )
+    
+    def test_compiled_single_row(self, forest_data):
+        """Test parité sur une seule ligne (cas de l'API)."""
+        from src.inference import CompiledForest
+        
+        X, model = forest_data
+        compiled = CompiledForest.from_sklearn(model)
+        
+        for i in range(10):
+            row = X.values[i:i + 1]
+            np.testing.assert_array_equal(compiled.predict_proba(row), model.predict_proba(row))
+    
+    def test_compiled_multiclass_with_missing_values(self):
+        """Test parité multi-classes avec valeurs manquantes."""
+        from src.inference import CompiledForest
+        
+        rng = np.random.RandomState(3)
+        X = rng.uniform(0, 1, (400, 4))
+        X[rng.rand(*X.shape) < 0.1] = np.nan
+        y = rng.randint(0, 3, 400)
+        model = RandomForestClassifier(n_estimators=20, random_state=0).fit(X, y)
+        
+        compiled = CompiledForest.from_sklearn(model)
+        
+        np.testing.assert_array_equal(compiled.predict_proba(X), model.predict_proba(X))
+    
+    def test_large_batches_use_sklearn_fallback(self, forest_data):
+        """Test délégation à sklearn au-delà de fallback_min_rows."""
+        from src.inference import CompiledForest
+        
+        X, model = forest_data
+        compiled = CompiledForest.from_sklearn(model, fallback_min_rows=100)
+        
+        with patch.object(compiled, '_predict_chunk', wraps=compiled._predict_chunk) as spy:
+            compiled.predict_proba(X.values[:10])
+            compiled.predict_proba(X.values[:200])
+        
+        assert spy.call_count == 1
+    
+    def test_saved_artifact_is_memory_mapped(self, forest_data, tmp_path):
+        """Test artefact .npy émis par save_best_model et préféré au chargement."""
+        from src.config import COMPILED_FALLBACK_ROWS
+        
+        X, model = forest_data
+        model_result = {
+            'model': model,
+            'scaler': None,
+            'feature_names': list(X.columns),
+            'best_params': {},
+            'test_metrics': {'f1_score': 0.9},
+            'cv_scores': np.array([0.9, 0.9])
+        }
+        
+        saved_path = ModelTrainer().save_best_model(model_result, tmp_path / "model")
+        
+        with open(saved_path / "model_metadata.json") as f:
+            metadata = json.load(f)
+        assert metadata['compiled_forest']['n_estimators'] == 50
+        assert (saved_path / "forest" / "value.npy").exists()
+        
+        # Gros batchs compris : aucun worker ne charge sa copie du pickle
+        large = np.resize(X.values, (COMPILED_FALLBACK_ROWS + 10, X.shape[1]))
+        with patch('src.inference.joblib.load') as mock_load:
+            predictor = ADHDPredictor(saved_path, engine='auto')
+            probabilities = predictor.predict_proba(X.iloc[:20])
+            explanation = predictor.predict_with_explanation(X.iloc[:1])
+            large_probabilities = predictor.compiled_model.predict_proba(large)
+        
+        mock_load.assert_not_called()
+        assert predictor.compiled_model.fallback is None
+        np.testing.assert_array_equal(large_probabilities, model.predict_proba(large))
+        assert predictor.compiled_model.get_info()['memory_mapped'] is True
+        np.testing.assert_array_equal(probabilities, model.predict_proba(X.iloc[:20].values))
+        assert set(explanation['feature_importance']) == set(X.columns)
+        
+        sklearn_predictor = ADHDPredictor(saved_path, engine='sklearn')
+        assert sklearn_predictor.compiled_model is None
+    
+    def test_corrupted_artifact_falls_back_to_pickle(self, forest_data, pickled_model_dir):
+        """Test repli sur le pickle si l'artefact est incohérent."""
+        from src.inference import CompiledForest
+        
+        X, model = forest_data
+        artifact = CompiledForest.from_sklearn(model).save(pickled_model_dir)
+        artifact['arrays']['value']['shape'] = [1, 2]
+        with open(pickled_model_dir / "model_metadata.json", 'w') as f:
+            json.dump({'feature_names': list(X.columns), 'compiled_forest': artifact}, f)
+        
+        predictor = ADHDPredictor(pickled_model_dir, engine='auto')
+        
+        assert predictor.compiled_model is None
+        assert isinstance(predictor.model, RandomForestClassifier)
+    
+    def test_compile_unsupported_model_falls_back(self):
+        """Test repli sur sklearn pour un modèle non compilable."""
+        from sklearn.linear_model import LogisticRegression
+        from src.inference import compile_model
+        
+        model = LogisticRegression().fit([[0.0], [1.0]], [0, 1])
+        
+        assert compile_model(model, 'compiled') is None
+        with pytest.raises(ValueError, match="Moteur d'inférence non supporté"):
+            compile_model(model, 'onnx')
+
 class TestModelTrainer:
     """Tests pour la classe ModelTrainer."""
     
@@ -268,6 +447,50 @@ class TestModelTrainer:
             assert metadata['model_type'] == 'adhd_classifier'
             assert metadata['feature_names'] == list(X.columns)
             assert metadata['test_metrics']['f1_score'] == 0.85
+    
+    def test_save_best_model_with_preprocessor(self, tmp_path):
+        """Test préprocesseur sauvegardé avec le modèle et prédiction sur données brutes."""
+        from src.utils.data_processing import DataProcessor
+        
+        rng = np.random.RandomState(0)
+        raw = pd.DataFrame({
+            'employee_id': [f"E{i:04d}" for i in range(200)],
+            'creative_score': rng.uniform(0, 100, 200),
+            'burnout_scale': rng.randint(1, 11, 200).astype(float),
+            'department': rng.choice(['Design', 'QA'], 200)
+        })
+        raw.loc[::7, 'burnout_scale'] = np.nan
+        raw['adhd_risk'] = (raw['creative_score'] > 50).astype(int)
+        
+        processor = DataProcessor()
+        X, y = processor.prepare_ml_dataset(raw, 'adhd_risk')
+        features = ['creative_score', 'burnout_scale', 'creativity_burnout_ratio', 'department_encoded']
+        model = RandomForestClassifier(n_estimators=10, random_state=0).fit(X[features], y)
+        model_result = {
+            'model': model,
+            'scaler': None,
+            'feature_names': features,
+            'best_params': {},
+            'test_metrics': {'f1_score': 0.9},
+            'cv_scores': np.array([0.9, 0.9])
+        }
+        
+        trainer = ModelTrainer()
+        with pytest.raises(ValueError, match="préprocesseur"):
+            trainer.save_best_model(model_result, tmp_path / "bad", processor.export_transform(features[:2]))
+        saved_path = trainer.save_best_model(model_result, tmp_path / "model", processor.export_transform(features))
+        
+        with open(saved_path / "model_metadata.json") as f:
+            assert json.load(f)['preprocessor'] == "preprocessor.joblib"
+        
+        predictor = ADHDPredictor(saved_path, engine='sklearn')
+        records = raw.drop(columns='adhd_risk').to_dict('records')
+        expected = model.predict_proba(X[features].values)
+        
+        np.testing.assert_allclose(predictor.predict_proba(records), expected)
+        np.testing.assert_allclose(predictor.predict_proba(records[3]), expected[3:4])
+        np.testing.assert_allclose(predictor.predict_proba(raw), expected)
+        np.testing.assert_allclose(predictor.predict_proba(X[features]), expected)
 
 class TestModelValidator:
     """Tests pour la classe ModelValidator."""
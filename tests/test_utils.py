@@ -70,6 +70,586 @@ class TestDataProcessingUtils:
         dept_row = profile_df[profile_df['column'] == 'department'].iloc[0]
         assert 'most_frequent' in dept_row
 
+class TestSketches:
+    """Tests pour les statistiques fusionnables."""
+    
+    def test_quantile_sketch_exact_matches_pandas(self):
+        """Test quantiles exacts sur peu de valeurs distinctes, par fusion."""
+        from src.utils.sketches import QuantileSketch
+        
+        values = np.random.RandomState(0).randint(1, 11, 1000).astype(float)
+        sketch = QuantileSketch()
+        for part in np.array_split(values, 7):
+            sketch.merge(QuantileSketch().update(part))
+        
+        assert sketch.exact
+        for q in [0.01, 0.25, 0.5, 0.75, 0.99]:
+            assert sketch.quantile(q) == pd.Series(values).quantile(q)
+        assert sketch.count_below(3) == (values < 3).sum()
+    
+    def test_quantile_sketch_tdigest_rank_error(self):
+        """Test erreur de rang du mode t-digest."""
+        from src.utils.sketches import QuantileSketch
+        
+        values = np.random.RandomState(1).lognormal(0, 1, 50000)
+        sketch = QuantileSketch()
+        for part in np.array_split(values, 20):
+            sketch.update(part)
+        
+        assert not sketch.exact
+        for q in [0.01, 0.25, 0.5, 0.75, 0.99]:
+            assert abs((values < sketch.quantile(q)).mean() - q) < 2e-3
+    
+    def test_running_moments_merge(self):
+        """Test moyenne et écart-type par fusion de partitions."""
+        from src.utils.sketches import RunningMoments
+        
+        values = np.random.RandomState(2).normal(50, 10, 1001)
+        moments = RunningMoments()
+        for part in np.array_split(values, 9):
+            moments.merge(RunningMoments().update(part))
+        
+        assert moments.count == len(values)
+        assert moments.mean == pytest.approx(values.mean())
+        assert moments.std == pytest.approx(values.std(ddof=1))
+        assert moments.min == values.min()
+    
+    def test_running_moments_shape(self):
+        """Test asymétrie et aplatissement par fusion, comme pandas."""
+        from src.utils.sketches import RunningMoments
+        
+        values = np.random.RandomState(3).lognormal(0, 1, 2001)
+        moments = RunningMoments()
+        for part in np.array_split(values, 11):
+            moments.merge(RunningMoments().update(part))
+        
+        assert moments.skewness == pytest.approx(pd.Series(values).skew())
+        assert moments.kurtosis == pytest.approx(pd.Series(values).kurtosis())
+        assert RunningMoments().update(np.full(5, 2.0)).skewness == 0.0
+    
+    def test_distinct_counter_exact_then_hyperloglog(self):
+        """Test comptage exact sous le seuil, HyperLogLog au-delà, par fusion."""
+        from src.utils.sketches import DistinctCounter
+        
+        hashes = pd.util.hash_array(np.arange(300000))
+        small = DistinctCounter(max_exact=1000)
+        for part in np.array_split(np.concatenate([hashes[:800], hashes[:500]]), 4):
+            small.update(part)
+        assert small.exact and small.count == 800
+        
+        left, right = DistinctCounter(max_exact=1000), DistinctCounter(max_exact=1000)
+        left.update(hashes[:200000])
+        right.update(hashes[100000:])
+        merged = left.merge(right)
+        assert not merged.exact
+        assert merged.count == pytest.approx(300000, rel=0.03)
+    
+    def test_median_absolute_deviation(self):
+        """Test MAD exact comme numpy, approché en mode t-digest."""
+        from src.utils.sketches import QuantileSketch
+        
+        values = np.random.RandomState(4).standard_t(3, 50000)
+        exact = QuantileSketch(max_exact=None).update(values[:5001])
+        digest = QuantileSketch().update(values)
+        
+        sample = values[:5001]
+        assert exact.median_absolute_deviation() == pytest.approx(np.median(np.abs(sample - np.median(sample))))
+        assert not digest.exact
+        assert digest.median_absolute_deviation() == pytest.approx(np.median(np.abs(values - np.median(values))), rel=1e-2)
+
+class TestNeighborImputer:
+    """Tests pour l'imputation par plus proches voisins sur KD-tree."""
+    
+    @staticmethod
+    def make_data(n, seed=0):
+        rng = np.random.RandomState(seed)
+        x = rng.normal(50, 10, n)
+        df = pd.DataFrame({
+            'a': x,
+            'b': 2 * x + rng.normal(0, 1, n),
+            'c': rng.randint(1, 11, n).astype(float)
+        })
+        df = df.mask(rng.rand(n, 3) < 0.1)
+        keys = pd.Series([f"E{i:06d}" for i in range(n)])
+        return df, keys
+    
+    def test_chunked_fit_matches_full_fit(self):
+        """Test échantillon de donneurs indépendant du découpage et de l'ordre."""
+        from src.utils.imputation import NeighborImputer
+        
+        df, keys = self.make_data(5000)
+        full = NeighborImputer(max_donors=1000).fit(df, keys)
+        
+        order = np.random.RandomState(1).permutation(len(df))
+        chunked = NeighborImputer(max_donors=1000)
+        for part in np.array_split(order, 7):
+            chunked.partial_fit(df.iloc[part], keys.iloc[part])
+        
+        assert len(chunked._sample) == 1000
+        np.testing.assert_array_equal(full.transform(df), chunked.transform(df))
+    
+    def test_imputes_from_nearest_neighbors(self):
+        """Test moyenne des k voisins sur les colonnes observées."""
+        from src.utils.imputation import NeighborImputer
+        
+        df, keys = self.make_data(3000)
+        imputed = NeighborImputer().fit(df, keys).transform(df)
+        
+        assert not np.isnan(imputed).any()
+        np.testing.assert_array_equal(imputed[df.notna().to_numpy()], df.to_numpy()[df.notna().to_numpy()])
+        # b ≈ 2a : les voisins sur a donnent b bien mieux que la médiane
+        only_b = df['b'].isna() & df['a'].notna()
+        errors = np.abs(imputed[only_b.to_numpy(), 1] - 2 * df.loc[only_b, 'a'])
+        assert errors.mean() < 3
+    
+    def test_fallbacks_and_single_row(self):
+        """Test ligne vide, colonne vide, ligne seule et pickle."""
+        import pickle
+        from src.utils.imputation import NeighborImputer
+        
+        df = pd.DataFrame({'a': [1.0, 2.0, 3.0, 4.0, 5.0, 6.0], 'empty': np.nan})
+        imputer = NeighborImputer(n_neighbors=2).fit(df)
+        
+        np.testing.assert_array_equal(imputer.transform(np.array([[np.nan, np.nan]])), [[3.5, 0.0]])
+        np.testing.assert_array_equal(imputer.transform(np.array([1.2, np.nan])), [1.2, 0.0])
+        
+        restored = pickle.loads(pickle.dumps(imputer))
+        assert restored._trees == {}
+        np.testing.assert_array_equal(restored.transform(pd.DataFrame({'a': [5.9], 'empty': [np.nan]})), [[5.9, 0.0]])
+        
+        processor = DataProcessor()
+        result = processor.handle_missing_values(df.assign(b=[np.nan, 2.0, 4.0, 6.0, 8.0, 10.0]))
+        assert isinstance(processor.imputers['neighbor_numeric'], NeighborImputer)
+        assert result.notna().all().all()
+
+class TestDataProfile:
+    """Tests pour le profil de données en une passe."""
+    
+    @staticmethod
+    def make_data(n, seed=0):
+        rng = np.random.RandomState(seed)
+        df = pd.DataFrame({
+            'employee_id': [f"E{i:05d}" for i in rng.randint(0, n, n)],
+            'department': rng.choice(['design', 'qa', 'art', None], n),
+            'creative_score': np.where(rng.rand(n) < 0.1, np.nan, rng.uniform(0, 100, n).round(1)),
+            'burnout_scale': rng.randint(1, 11, n)
+        })
+        return pd.concat([df, df.iloc[:n // 10]], ignore_index=True)
+    
+    def test_matches_pandas(self):
+        """Test mêmes statistiques que les scans pandas colonne par colonne."""
+        from src.utils.quality import DataProfile
+        
+        df = self.make_data(2000)
+        profile = DataProfile().update(df)
+        report = profile.quality_report()
+        frame = profile.to_frame().set_index('column')
+        
+        assert report['duplicate_rows'] == df.duplicated().sum()
+        assert report['missing_values_pct'] == pytest.approx(df.isnull().sum().sum() / df.size * 100)
+        assert report['memory_usage_mb'] == pytest.approx(df.memory_usage(deep=True).sum() / 1024**2)
+        for col in df.columns:
+            assert frame.loc[col, 'unique_count'] == df[col].nunique()
+            assert frame.loc[col, 'null_count'] == df[col].isnull().sum()
+        for col in ['creative_score', 'burnout_scale']:
+            for stat, expected in [('mean', df[col].mean()), ('median', df[col].median()),
+                                   ('std', df[col].std()), ('skewness', df[col].skew()),
+                                   ('kurtosis', df[col].kurtosis())]:
+                assert frame.loc[col, stat] == pytest.approx(expected)
+        assert frame.loc['department', 'most_frequent'] == df['department'].mode().iloc[0]
+        assert frame.loc['department', 'most_frequent_count'] == df['department'].value_counts().iloc[0]
+    
+    def test_chunks_merge_to_full_profile(self):
+        """Test fusion de chunks identique au profil complet (doublons entre chunks compris)."""
+        from src.utils.quality import DataProfile
+        
+        df = self.make_data(3000)
+        merged = DataProfile()
+        for part in np.array_split(np.arange(len(df)), 7):
+            merged.merge(DataProfile().update(df.iloc[part]))
+        full = DataProfile().update(df)
+        
+        # Seule la mémoire dépend du découpage (index et tampons par chunk)
+        merged_report, full_report = merged.quality_report(), full.quality_report()
+        assert merged_report.pop('memory_usage_mb') == pytest.approx(full_report.pop('memory_usage_mb'), rel=0.05)
+        assert merged_report == full_report
+        pd.testing.assert_frame_equal(merged.to_frame(), full.to_frame())
+    
+    def test_approximate_distinct_and_cache(self):
+        """Test distincts estimés au-delà du seuil et cache invalidé par une modification."""
+        from src.utils.quality import DataProfile, profile_data
+        
+        df = pd.DataFrame({'employee_id': [f"E{i:06d}" for i in range(50000)], 'score': np.arange(50000.0)})
+        profile = DataProfile(max_exact_distinct=1000).update(df).to_frame().set_index('column')
+        assert not profile.loc['employee_id', 'unique_count_exact']
+        assert profile.loc['employee_id', 'unique_count'] == pytest.approx(50000, rel=0.03)
+        
+        first = profile_data(df)
+        assert profile_data(df.copy()) is first
+        df.loc[3, 'score'] = np.nan
+        assert profile_data(df) is not first
+        assert validate_data_quality(df)['missing_values_pct'] == pytest.approx(100 / df.size)
+
+class TestFeatureTransform:
+    """Tests pour l'artefact de transformation figé."""
+    
+    @staticmethod
+    def make_raw(n, seed=0):
+        rng = np.random.RandomState(seed)
+        df = pd.DataFrame({
+            'employee_id': [f"E{i:05d}" for i in range(n)],
+            'creative_score': rng.uniform(-5, 105, n),
+            'burnout_scale': rng.randint(0, 12, n).astype(float),
+            'productivity_score': rng.uniform(0, 100, n),
+            'department': rng.choice([' Design', 'QA ', 'art', None], n),
+            'hire_date': pd.Timestamp('2015-01-01') + pd.to_timedelta(rng.randint(0, 3000, n), unit='D'),
+            'adhd_risk': rng.randint(0, 2, n)
+        })
+        df['hire_date'] = df['hire_date'].dt.strftime('%Y-%m-%d')
+        for col in ['creative_score', 'burnout_scale', 'productivity_score']:
+            df.loc[rng.rand(n) < 0.1, col] = np.nan
+        return df
+    
+    def test_matches_prepare_ml_dataset(self):
+        """Test features identiques en ligne (dict), en lot et en DataFrame."""
+        raw = self.make_raw(400)
+        processor = DataProcessor()
+        X, y = processor.prepare_ml_dataset(raw, 'adhd_risk')
+        features = X.select_dtypes(include=[np.number]).columns.tolist()
+        transform = processor.export_transform(features)
+        
+        expected = X[features].to_numpy(dtype=np.float64)
+        records = raw.drop(columns='adhd_risk').to_dict('records')
+        
+        np.testing.assert_allclose(transform.transform(raw), expected, rtol=1e-12)
+        np.testing.assert_allclose(transform.transform(records), expected, rtol=1e-12)
+        np.testing.assert_allclose(transform.transform(records[7]), expected[7:8], rtol=1e-12)
+        
+        # Pas de réajustement : un lot d'une autre distribution ne change rien
+        processor.prepare_ml_dataset(self.make_raw(50, seed=1), 'adhd_risk')
+        np.testing.assert_allclose(transform.transform(records[:3]), expected[:3], rtol=1e-12)
+    
+    def test_pickle_and_unknown_values(self):
+        """Test sérialisation, catégorie inconnue et colonnes absentes."""
+        import pickle
+        
+        processor = DataProcessor()
+        X, _ = processor.prepare_ml_dataset(self.make_raw(200), 'adhd_risk')
+        transform = pickle.loads(pickle.dumps(processor.export_transform(['creative_score', 'department_encoded'])))
+        
+        row = transform.transform({'department': 'Nouveau', 'creative_score': 150})
+        assert row.shape == (1, 2)
+        # Code -1 (catégorie inconnue), standardisé comme à l'entraînement
+        position = transform.scaled_columns.index('department_encoded')
+        assert row[0, 1] == pytest.approx((-1 - transform.scale_mean[position]) / transform.scale_std[position])
+        assert not np.isnan(transform.transform([{}])).any()
+        
+        with pytest.raises(ValueError, match="Features non reproductibles"):
+            processor.export_transform(['creative_score', 'absente'])
+        with pytest.raises(ValueError, match="prepare_ml_dataset"):
+            DataProcessor().export_transform(['creative_score'])
+
+    def test_training_statistics_not_left_frozen(self):
+        """Test étapes appelées après l'entraînement ajustées sur leurs données."""
+        processor = DataProcessor()
+        processor.prepare_ml_dataset(self.make_raw(200), 'adhd_risk')
+        assert processor.statistics is None
+        assert processor.training_statistics is not None
+        
+        other = pd.DataFrame({'employee_id': ['A', 'B', 'C'], 'score': [1.0, np.nan, 3.0]})
+        imputed = processor.handle_missing_values(other, strategy='median')
+        assert imputed['score'].tolist() == [1.0, 2.0, 3.0]
+        
+        # Statistiques figées auparavant : rétablies
+        frozen = processor.training_statistics
+        processor.statistics = frozen
+        processor.prepare_ml_dataset(self.make_raw(100, seed=2), 'adhd_risk')
+        assert processor.statistics is frozen
+        assert processor.training_statistics is not frozen
+
+class TestTransformPlan:
+    """Tests pour le plan de transformation limité aux features du modèle."""
+    
+    @staticmethod
+    def make_raw(n=400, seed=0):
+        df = TestFeatureTransform.make_raw(n, seed)
+        rng = np.random.RandomState(seed + 1)
+        df['communication_style'] = rng.choice(['Visual', 'written', None], n)
+        df['notes'] = [f"note {i}" for i in range(n)]
+        return df
+    
+    def test_pruned_dataset_matches_full_chain(self):
+        """Test mêmes valeurs que la chaîne complète sur les seules colonnes utiles."""
+        raw = self.make_raw()
+        features = ['creative_score', 'creativity_burnout_ratio', 'burnout_scale_high',
+                    'creativity_vs_dept_avg', 'tenure_years', 'department_encoded']
+        
+        processor = DataProcessor()
+        X, y = processor.prepare_ml_dataset(raw, 'adhd_risk', feature_names=features)
+        plan = processor.transform_plan
+        assert plan.source_columns == ['employee_id', 'creative_score', 'burnout_scale',
+                                       'department', 'hire_date', 'adhd_risk']
+        
+        X_full, y_full = DataProcessor().prepare_ml_dataset(raw[plan.source_columns], 'adhd_risk')
+        pd.testing.assert_frame_equal(X, X_full[features])
+        pd.testing.assert_series_equal(y, y_full)
+        
+        # Colonnes inutiles jamais ajustées ni attendues à l'inférence
+        assert 'communication_style' not in processor.training_statistics.categories
+        transform = processor.export_transform(features)
+        assert transform.numeric_columns == ['creative_score', 'burnout_scale']
+        assert transform.categorical_columns == ['department', 'hire_date']
+        np.testing.assert_allclose(transform.transform(raw), X.to_numpy(dtype=np.float64), rtol=1e-12)
+    
+    def test_unneeded_stages_and_columns_dropped(self):
+        """Test étapes sautées, colonnes élaguées et feature inconnue."""
+        from src.utils.data_processing import plan_transform
+        
+        raw = self.make_raw(200)
+        
+        plan = plan_transform(['creative_score'], raw.dtypes, 'adhd_risk')
+        assert plan.methods == ['clean_employee_data', 'handle_missing_values']
+        assert plan.source_columns == ['employee_id', 'creative_score', 'adhd_risk']
+        
+        # Sans feature numérique, aucune colonne numérique n'est lue
+        X_full, _ = DataProcessor().prepare_ml_dataset(raw, 'adhd_risk')
+        processor = DataProcessor()
+        X, _ = processor.prepare_ml_dataset(raw, 'adhd_risk', feature_names=['communication_style_encoded'])
+        assert processor.transform_plan.source_columns == ['employee_id', 'adhd_risk', 'communication_style']
+        assert 'engineer_features' not in processor.transform_plan.methods
+        pd.testing.assert_frame_equal(X, X_full[['communication_style_encoded']])
+        
+        with pytest.raises(ValueError, match="Features non reproductibles"):
+            plan_transform(['notes_ratio'], raw.dtypes, 'adhd_risk')
+
+class TestOutlierEngine:
+    """Tests pour la détection et le plafonnement vectorisés des outliers."""
+    
+    @staticmethod
+    def make_frame(n=2000, seed=0):
+        rng = np.random.RandomState(seed)
+        df = pd.DataFrame({
+            'normal': rng.normal(50, 10, n),
+            'heavy': rng.standard_t(2, n),
+            'count': rng.randint(0, 100, n),
+            'label': rng.choice(['a', 'b'], n),
+            'empty': np.nan
+        })
+        df.loc[rng.rand(n) < 0.1, 'heavy'] = np.nan
+        df.loc[:4, 'count'] = 1000
+        return df
+    
+    def test_masks_match_pandas(self):
+        """Test masques identiques aux calculs pandas colonne par colonne."""
+        df = self.make_frame()
+        processor = DataProcessor()
+        
+        for method in ['iqr', 'zscore']:
+            outliers = processor.detect_outliers(df, method)
+            for col in ['normal', 'heavy', 'count', 'empty']:
+                series = df[col]
+                if method == 'iqr':
+                    q1, q3 = series.quantile(0.25), series.quantile(0.75)
+                    expected = (series < q1 - 1.5 * (q3 - q1)) | (series > q3 + 1.5 * (q3 - q1))
+                else:
+                    expected = np.abs((series - series.mean()) / series.std()) > 3
+                mask = outliers.get(col, np.zeros(len(df), dtype=bool))
+                assert mask.dtype == bool
+                np.testing.assert_array_equal(mask, expected.to_numpy())
+        
+        assert 'empty' not in outliers and 'label' not in outliers
+        with pytest.raises(ValueError):
+            processor.detect_outliers(df, 'unknown')
+    
+    def test_handle_outliers_matches_detect_then_cap(self):
+        """Test détection et plafonnement en une passe, dtypes conservés."""
+        df = self.make_frame()
+        processor = DataProcessor()
+        
+        expected = processor.cap_outliers(df.copy(), processor.detect_outliers(df))
+        capped, outliers = processor.handle_outliers(df.copy())
+        
+        pd.testing.assert_frame_equal(capped, expected)
+        assert capped['count'].dtype == np.int64
+        assert capped['count'].max() == df['count'].quantile(0.99)
+        # Outliers trop fréquents (queues épaisses) : pas de plafonnement
+        assert outliers['heavy'].sum() > len(df) * 0.05
+        pd.testing.assert_series_equal(capped['heavy'], df['heavy'])
+    
+    def test_mad_with_frozen_statistics(self):
+        """Test méthode MAD robuste, identique par chunks avec des sketches exacts."""
+        from src.utils.data_processing import FittedStatistics
+        from src.utils.sketches import QuantileSketch
+        
+        df = self.make_frame()
+        processor = DataProcessor()
+        full = processor.detect_outliers(df, 'mad')
+        
+        median = df['heavy'].median()
+        mad = (df['heavy'] - median).abs().median()
+        expected = (0.6745 * (df['heavy'] - median).abs() / mad > 3.5).to_numpy()
+        np.testing.assert_array_equal(full['heavy'], expected)
+        
+        sketches = {col: QuantileSketch(max_exact=None) for col in ['normal', 'heavy', 'count']}
+        parts = [df.iloc[rows] for rows in np.array_split(np.arange(len(df)), 5)]
+        for part in parts:
+            for col, sketch in sketches.items():
+                sketch.update(part[col].to_numpy())
+        processor.statistics = FittedStatistics(n_rows=len(df), outlier_sketches=sketches)
+        
+        for part in parts:
+            chunk = processor.detect_outliers(part, 'mad')
+            for col in sketches:
+                np.testing.assert_array_equal(
+                    chunk.get(col, np.zeros(len(part), dtype=bool)),
+                    full.get(col, np.zeros(len(df), dtype=bool))[part.index]
+                )
+
+class TestCategoricalPipeline:
+    """Tests pour les colonnes 'category' (nettoyage et encodage sur les catégories)."""
+    
+    @staticmethod
+    def make_raw(n=400, seed=0):
+        rng = np.random.RandomState(seed)
+        df = pd.DataFrame({
+            'employee_id': [f"E{i:05d}" for i in range(n)],
+            'department': rng.choice([' Design', 'design ', 'QA', 'Art', None], n),
+            'communication_style': rng.choice(['visual', 'Social'], n),
+            'hire_date': (pd.Timestamp('2015-01-01') + pd.to_timedelta(rng.randint(0, 60, n), unit='D')).strftime('%Y-%m-%d'),
+            'creative_score': rng.uniform(0, 100, n),
+            'burnout_scale': rng.randint(1, 11, n).astype(float)
+        })
+        df.loc[rng.rand(n) < 0.1, 'creative_score'] = np.nan
+        return df
+    
+    @staticmethod
+    def chain(processor, df):
+        df = processor.clean_employee_data(df)
+        df = processor.handle_missing_values(df, 'median')
+        df = processor.engineer_features(df)
+        return processor.encode_categorical_variables(df)
+    
+    def test_categorize_columns(self):
+        """Test conversion des seules colonnes texte peu variées."""
+        from src.utils.data_processing import categorize_columns
+        
+        df = self.make_raw()
+        df['comment'] = [f"note {i}" for i in range(len(df))]
+        memory_before = validate_data_quality(df)['memory_usage_mb']
+        
+        converted = categorize_columns(df)
+        
+        assert converted == ['department', 'communication_style', 'hire_date']
+        assert isinstance(df['department'].dtype, pd.CategoricalDtype)
+        assert df['employee_id'].dtype != 'category' and df['comment'].dtype != 'category'
+        assert validate_data_quality(df)['memory_usage_mb'] < memory_before
+    
+    def test_chain_matches_string_columns(self):
+        """Test résultats identiques aux colonnes de chaînes, encodage compris."""
+        from src.utils.data_processing import categorize_columns
+        
+        raw = self.make_raw()
+        categorized = raw.copy()
+        categorize_columns(categorized)
+        
+        expected = self.chain(DataProcessor(), raw)
+        processor = DataProcessor()
+        result = self.chain(processor, categorized)
+        
+        assert list(result['department'].cat.categories) == ['art', 'design', 'qa']
+        assert list(processor.encoders['department'].classes_) == ['art', 'design', 'qa']
+        for col in expected.columns:
+            np.testing.assert_array_equal(np.asarray(result[col], dtype=object), np.asarray(expected[col], dtype=object))
+    
+    def test_frozen_categories_shared_by_chunks(self):
+        """Test chunks au même dtype avec statistiques figées, inconnues à -1."""
+        from src.utils.data_processing import categorize_columns
+        
+        raw = self.make_raw()
+        processor = DataProcessor()
+        processor.fit_statistics(lambda: [raw.iloc[:200], raw.iloc[200:]], strategy='median')
+        
+        chunks = [raw.iloc[:200].copy(), raw.iloc[200:].copy()]
+        chunks[1].loc[chunks[1].index[:3], 'department'] = 'Audio'
+        for chunk in chunks:
+            categorize_columns(chunk)
+        results = [self.chain(processor, chunk) for chunk in chunks]
+        
+        assert results[0]['communication_style'].dtype == results[1]['communication_style'].dtype
+        assert list(results[1]['department'].cat.categories) == ['art', 'design', 'qa', 'audio']
+        assert (results[1]['department_encoded'].iloc[:3] == -1).all()
+        assert pd.concat(results)['communication_style'].dtype == 'category'
+
+class TestCopyFreeChain:
+    """Tests pour la chaîne de transformation sans copies intermédiaires."""
+    
+    @staticmethod
+    def make_raw(n=5000, seed=0):
+        rng = np.random.RandomState(seed)
+        df = pd.DataFrame({
+            'employee_id': [f"E{i:05d}" for i in range(n)],
+            'department': rng.choice(['Design', 'QA ', 'art', None], n),
+            'hire_date': (pd.Timestamp('2015-01-01') + pd.to_timedelta(rng.randint(0, 3000, n), unit='D')).strftime('%Y-%m-%d'),
+            'creative_score': rng.uniform(-5, 105, n),
+            'burnout_scale': rng.randint(1, 11, n),
+            **{f'signal_{i}': rng.rand(n) for i in range(8)}
+        })
+        df.loc[rng.rand(n) < 0.1, 'creative_score'] = np.nan
+        return pd.concat([df, df.head(10)], ignore_index=True)
+    
+    @staticmethod
+    def chain(processor, df, copy):
+        df = processor.clean_employee_data(df)
+        df = processor.handle_missing_values(df, 'median', copy=copy)
+        df = processor.engineer_features(df, copy=copy)
+        return processor.encode_categorical_variables(df, copy=copy)
+    
+    def test_results_unchanged_and_input_untouched(self):
+        """Test résultats identiques avec et sans copies, entrée intacte."""
+        raw = self.make_raw()
+        snapshot = raw.copy()
+        processor = DataProcessor()
+        
+        expected = self.chain(processor, raw, copy=True)
+        processor.reset_statistics()
+        result = self.chain(processor, raw, copy=False)
+        
+        pd.testing.assert_frame_equal(result, expected)
+        pd.testing.assert_frame_equal(raw, snapshot)
+        
+        for strategy in ['median', 'auto']:
+            imputed = DataProcessor().handle_missing_values(raw, strategy)
+            assert imputed['creative_score'].notnull().all()
+            assert imputed['burnout_scale'].dtype == np.float64
+        pd.testing.assert_frame_equal(raw, snapshot)
+    
+    def test_columns_shared_and_lower_peak_memory(self):
+        """Test colonnes inchangées partagées et pic mémoire réduit."""
+        import tracemalloc
+        from src.utils.data_processing import _copy_on_write
+        
+        if not _copy_on_write():
+            pytest.skip("copy-on-write inactif")
+        raw = self.make_raw(n=20000).drop_duplicates(subset=['employee_id'])
+        
+        result = self.chain(DataProcessor(), raw, copy=False)
+        assert np.shares_memory(result['signal_0'].to_numpy(), raw['signal_0'].to_numpy())
+        
+        def peak(function):
+            tracemalloc.start()
+            function()
+            peak_bytes = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return peak_bytes
+        
+        def with_copies():
+            processor, df = DataProcessor(), raw.copy(deep=True)
+            for stage in [processor.clean_employee_data, lambda d: processor.handle_missing_values(d, 'median'),
+                          processor.engineer_features, processor.encode_categorical_variables]:
+                df = stage(df.copy(deep=True))
+        
+        assert peak(lambda: self.chain(DataProcessor(), raw, copy=False)) < 0.85 * peak(with_copies)
+
 class TestMetricsUtils:
     """Tests pour les utilitaires de métriques."""
     